@@ -0,0 +1,479 @@
+#!/usr/bin/python
+
+## @file
+# Headless benchmarks of the server's per-frame hot paths.
+#
+# The framework modules are run against the pure-Python avango stand-in in benchmark/standin,
+# so no guacamole installation, display or tracking system is required. The hooks below are
+# driven with synthetic or recorded tracking data and timed by a FrameProfiler:
+#
+#   - InputMapping.mf_rel_input_values_changed and InputMapping.evaluate (navigation steps)
+#   - GroundFollowing.evaluate, including the TerrainHeightCache lookups
+#   - RayPointer.create_candidate_list
+#   - PickingService.frame_callback (Intersection requests, e.g. screen proxy picking)
+#   - ApplicationManager.evaluate (portal transit checks)
+#   - Frustum.update_all and Frustum.points_inside_frustums (frustum checks of points in front of the user)
+#
+# The timings include the stand-in's field and matrix overhead instead of avango's, so they are
+# meant for comparing revisions of the framework on the same machine, not as absolute numbers.
+#
+# Not everything runs the real framework code:
+#   - RayPointer.evaluate is replaced by a no-op. Only create_candidate_list, with the real picking
+#     through the PickingService and the real frustum checks, is driven every frame. User
+#     assignment, ray and intersection geometry updates and object highlighting are not measured.
+#   - The ray pointer's tool representations, user and user representation are the Benchmark*
+#     classes below, not ToolRepresentation, User and UserRepresentation.
+#   - The navigations passed to ApplicationManager are BenchmarkNavigations around real InputMapping
+#     and GroundFollowing instances fed by BenchmarkDevices, and the portals are real
+#     VirtualDisplayGroups without clients.
+#
+# Usage: python3 benchmark/run_benchmarks.py [--frames N] [--tracking FILE] [--csv FILE] [--instances]
+#
+# A tracking file contains one frame per line: 16 floats of the station matrix in row-major
+# order, optionally followed by the 7 relative input values of the navigation device.
+
+# import python libraries
+import argparse
+import math
+import os
+import sys
+import time
+
+_directory = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [ os.path.join(_directory, "standin")
+               , os.path.join(_directory, "..", "configs")
+               , os.path.join(_directory, "..", "lib-server") ]
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+import avango.script
+
+# import framework libraries
+from ApplicationManager import ApplicationManager
+from DisplayGroup import VirtualDisplayGroup
+from FixedTimestep import FixedTimestep
+from FrameProfiler import FrameProfiler
+from Frustum import Frustum
+from GroundFollowing import GroundFollowing
+from InputMapping import InputMapping
+from PickingService import PickingService
+from RayPointer import RayPointer
+from User import UserRepresentation
+from VirtualDisplay import VirtualDisplay
+from scene_config import scenegraphs
+import Utilities
+
+## @var number_of_navigations
+# Number of navigations driven by the tracking data, each with its own InputMapping and GroundFollowing.
+number_of_navigations = 4
+
+## @var number_of_tool_representations
+# Number of ray pointer representations of the benchmark user.
+number_of_tool_representations = 4
+
+## @var number_of_portals
+# Number of transitable virtual display groups with one portal each.
+number_of_portals = 8
+
+## @var number_of_frustum_points
+# Number of points tested against the user's frustum per frame.
+number_of_frustum_points = 200
+
+## @var simulated_frame_time
+# Duration in seconds of a simulated frame, used as clock of the navigation steps so they do not depend on the benchmark speed.
+simulated_frame_time = 1.0 / 60.0
+
+## @var simulated_time
+# Current time of the simulated clock.
+simulated_time = 0.0
+
+
+## Synthetic device providing a station matrix and relative input values, like Device instances do.
+class BenchmarkDevice(avango.script.Script):
+
+  ## @var mf_dof
+  # The relative input values of the device.
+  mf_dof = avango.MFFloat()
+  mf_dof.value = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+  ## @var sf_station_mat
+  # The matrix of the tracked device.
+  sf_station_mat = avango.gua.SFMatrix4()
+  sf_station_mat.value = avango.gua.make_identity_mat()
+
+  ## Default constructor.
+  def __init__(self):
+    self.super(BenchmarkDevice).__init__()
+
+
+## Navigation exposing the fields and attributes ApplicationManager.evaluate reads for portal transits.
+class BenchmarkNavigation(avango.script.Script):
+
+  ## @var sf_abs_mat
+  # The absolute matrix of the navigation.
+  sf_abs_mat = avango.gua.SFMatrix4()
+  sf_abs_mat.value = avango.gua.make_identity_mat()
+
+  ## @var sf_scale
+  # The scaling factor of the navigation.
+  sf_scale = avango.SFFloat()
+  sf_scale.value = 1.0
+
+  ## Default constructor.
+  def __init__(self):
+    self.super(BenchmarkNavigation).__init__()
+
+  ## Custom constructor.
+  # @param DEVICE The BenchmarkDevice driving this navigation.
+  # @param INPUTMAPPING The InputMapping accumulating the device input.
+  def my_constructor(self, DEVICE, INPUTMAPPING):
+
+    self.device = DEVICE
+    self.inputmapping = INPUTMAPPING
+    self.reacts_on_portal_transit = True
+    self.trace = None
+
+    self.sf_abs_mat.connect_from(INPUTMAPPING.sf_abs_mat)
+    self.sf_scale.connect_from(INPUTMAPPING.sf_scale)
+
+
+## Minimal UserRepresentation with a head, one screen and its cached frustum.
+class BenchmarkUserRepresentation:
+
+  get_frustum = UserRepresentation.get_frustum
+
+  ## Custom constructor.
+  # @param PARENT_NODE The node to append the view transformation node to.
+  def __init__(self, PARENT_NODE):
+
+    self.connected_navigation_id = 0
+
+    self.view_transform_node = avango.gua.nodes.TransformNode(Name = "w0_dg0_u0")
+    PARENT_NODE.Children.value.append(self.view_transform_node)
+
+    self.head = avango.gua.nodes.TransformNode(Name = "head")
+    self.head.Transform.value = avango.gua.make_trans_mat(0.0, 1.7, 0.5)
+    self.view_transform_node.Children.value.append(self.head)
+
+    self.screen = avango.gua.nodes.ScreenNode(Name = "screen_0", Width = 4.0, Height = 2.5)
+    self.screen.Transform.value = avango.gua.make_trans_mat(0.0, 1.25, -1.0)
+    self.view_transform_node.Children.value.append(self.screen)
+
+    self.frustums = []
+    self.get_frustum(self.screen)
+
+  def is_in_virtual_display(self):
+    return False
+
+
+## Minimal ray pointer representation of the benchmark user.
+class BenchmarkToolRepresentation:
+
+  ## Custom constructor.
+  # @param USER_REPRESENTATION The BenchmarkUserRepresentation the tool is attached to.
+  # @param DISPLAY_GROUP The display group object the representation belongs to.
+  def __init__(self, USER_REPRESENTATION, DISPLAY_GROUP):
+
+    self.DISPLAY_GROUP = DISPLAY_GROUP
+    self.USER_REPRESENTATION = USER_REPRESENTATION
+    self.user_id = 0
+    self.active = True
+    self.in_virtual_display = False
+
+    self.tool_transform_node = avango.gua.nodes.TransformNode(Name = "pointer")
+    USER_REPRESENTATION.view_transform_node.Children.value.append(self.tool_transform_node)
+
+  def is_in_virtual_display(self):
+    return self.in_virtual_display
+
+  def get_world_transform(self):
+    return self.tool_transform_node.WorldTransform.value
+
+  def hide_intersection_geometry(self):
+    pass
+
+  def set_ray_distance(self, DISTANCE):
+    pass
+
+
+## User owning the benchmark ray pointer.
+class BenchmarkUser:
+
+  ## Custom constructor.
+  # @param USER_REPRESENTATION The single BenchmarkUserRepresentation of this user.
+  def __init__(self, USER_REPRESENTATION):
+
+    self.id = 0
+    self.user_representation = USER_REPRESENTATION
+
+  def get_user_representation_at(self, DISPLAY_GROUP):
+    return self.user_representation
+
+
+## Returns a list of (station matrix, input values) tuples, one per frame, moving on a smooth synthetic path.
+# @param NUMBER_OF_FRAMES Number of frames to be generated.
+def create_synthetic_tracking(NUMBER_OF_FRAMES):
+
+  _frames = []
+
+  for _frame in range(NUMBER_OF_FRAMES):
+
+    _time = _frame / 60.0
+
+    _station_mat = avango.gua.make_trans_mat(0.3 * math.sin(_time), 1.2 + 0.05 * math.sin(2.0 * _time), 0.3 * math.cos(_time)) * \
+                   avango.gua.make_rot_mat(20.0 * math.sin(0.5 * _time), 0, 1, 0) * \
+                   avango.gua.make_rot_mat(-30.0 + 10.0 * math.sin(_time), 1, 0, 0)
+
+    # walking speed of about 1.5 m/s at 60 fps with slow turns
+    _input_values = [ 0.1 * math.sin(0.3 * _time)
+                    , 0.0
+                    , -0.3 + 0.05 * math.cos(0.7 * _time)
+                    , 0.0
+                    , 0.5 * math.sin(0.2 * _time)
+                    , 0.0
+                    , 0.0 ]
+
+    _frames.append( (_station_mat, _input_values) )
+
+  return _frames
+
+
+## Reads a tracking file. Frames without input values move forward at constant speed.
+# @param FILENAME Path of the tracking file.
+def read_tracking_file(FILENAME):
+
+  _frames = []
+
+  with open(FILENAME, "r") as _file:
+
+    for _line in _file:
+
+      _values = [float(_value) for _value in _line.split()]
+
+      if len(_values) < 16:
+        continue
+
+      _input_values = _values[16:23]
+
+      if len(_input_values) < 7:
+        _input_values = [0.0, 0.0, -0.3, 0.0, 0.0, 0.0, 0.0]
+
+      _frames.append( (avango.gua.Mat4(_values[:16]), _input_values) )
+
+  return _frames
+
+
+## Replaces framework methods and functions by timing wrappers. Must be called before the objects are created.
+# @param PROFILER The FrameProfiler recording the measurements.
+def instrument_hooks(PROFILER):
+
+  for _class, _method_name in [ (InputMapping, "mf_rel_input_values_changed")
+                              , (InputMapping, "evaluate")
+                              , (GroundFollowing, "evaluate")
+                              , (RayPointer, "create_candidate_list")
+                              , (PickingService, "frame_callback")
+                              , (ApplicationManager, "evaluate") ]:
+
+    setattr(_class, _method_name, PROFILER.create_wrapper(_class.__name__ + "." + _method_name, _class.__dict__[_method_name]))
+
+  for _function_name in ["update_all", "points_inside_frustums"]:
+    setattr(Frustum, _function_name, staticmethod(create_function_wrapper(PROFILER, "Frustum." + _function_name, getattr(Frustum, _function_name))))
+
+
+## Returns a timing wrapper of a static function, which records the time of every call as one hook.
+# @param PROFILER The FrameProfiler recording the measurements.
+# @param HOOK_NAME The name under which the calls are recorded.
+# @param FUNCTION The function to be wrapped.
+def create_function_wrapper(PROFILER, HOOK_NAME, FUNCTION):
+
+  _clock = time.perf_counter
+
+  def _wrapper(*ARGUMENTS):
+
+    _start_time = _clock()
+
+    try:
+      return FUNCTION(*ARGUMENTS)
+    finally:
+      PROFILER.record(HOOK_NAME, Frustum, _clock() - _start_time)
+
+  return _wrapper
+
+
+## Creates the navigations, each with a device, an InputMapping and an activated GroundFollowing.
+def create_navigations():
+
+  _navigations = []
+
+  for _index in range(number_of_navigations):
+
+    _device = BenchmarkDevice()
+
+    _ground_following = GroundFollowing()
+    _ground_following.my_constructor(SF_STATION_MAT = _device.sf_station_mat, RAY_START_HEIGHT = 0.75)
+
+    _inputmapping = InputMapping()
+    _inputmapping.my_constructor(NAVIGATION = None
+                               , DEVICE_INSTANCE = _device
+                               , GROUND_FOLLOWING_INSTANCE = _ground_following
+                               , STARTING_MATRIX = avango.gua.make_trans_mat(_index * 2.0, 0.0, 0.0)
+                               , INVERT = False)
+    _inputmapping.activate_realistic_mode()
+
+    _navigation = BenchmarkNavigation()
+    _navigation.my_constructor(_device, _inputmapping)
+    _navigations.append(_navigation)
+
+  return _navigations
+
+
+## Creates a RayPointer with several representations for a single user, bypassing the workspace setup.
+# @param USER_REPRESENTATION The BenchmarkUserRepresentation holding the pointer.
+def create_ray_pointer(USER_REPRESENTATION):
+
+  _ray_pointer = RayPointer()
+
+  # only create_candidate_list is benchmarked, the pointer is not set up for the rest of its evaluation
+  _ray_pointer.evaluate = lambda: None
+
+  _ray_pointer.assigned_user = BenchmarkUser(USER_REPRESENTATION)
+  _ray_pointer.tool_representations = [BenchmarkToolRepresentation(USER_REPRESENTATION, _index) for _index in range(number_of_tool_representations)]
+  _ray_pointer.primary_tool_representations = []
+  _ray_pointer.ray_length = 10.0
+  _ray_pointer.picking_options = avango.gua.PickingOptions.PICK_ONLY_FIRST_OBJECT \
+                               | avango.gua.PickingOptions.GET_WORLD_POSITIONS \
+                               | avango.gua.PickingOptions.GET_WORLD_NORMALS
+  _ray_pointer.picking_mask = "man_pick_group"
+
+  return _ray_pointer
+
+
+## Creates an ApplicationManager checking the navigations for transits through a ring of portals.
+# @param NAVIGATIONS List of BenchmarkNavigations to be checked.
+# @param USER_REPRESENTATION The BenchmarkUserRepresentation standing in for the first user inside the portals.
+def create_application_manager(NAVIGATIONS, USER_REPRESENTATION):
+
+  _application_manager = ApplicationManager()
+  _application_manager.workspace_navigations = NAVIGATIONS
+  _application_manager.transit_display_groups = []
+  _application_manager.lf_nav_device_positions = {}
+  _application_manager.requestable_navigations = []
+  _application_manager.requestable_navigations_last_button_states = []
+  _application_manager.always_evaluate(True)
+
+  for _index in range(number_of_portals):
+
+    _angle = 360.0 * _index / number_of_portals
+    _entry_mat = avango.gua.make_rot_mat(_angle, 0, 1, 0) * \
+                 avango.gua.make_trans_mat(0.0, 1.5, -6.0)
+
+    _portal_navigation = BenchmarkNavigation()
+
+    _display_group = VirtualDisplayGroup(DISPLAY_LIST = [VirtualDisplay(ENTRY_MATRIX = _entry_mat, WIDTH = 1.0, HEIGHT = 1.0)]
+                                       , NAVIGATION_LIST = [_portal_navigation]
+                                       , VISIBILITY_TAG = "portal"
+                                       , VIEWING_MODE = "3D"
+                                       , CAMERA_MODE = "PERSPECTIVE"
+                                       , NEGATIVE_PARALLAX = "True"
+                                       , BORDER_MATERIAL = "data/materials/White.gmd"
+                                       , TRANSITABLE = True)
+    _display_group.add_virtual_display_nodes()
+
+    _application_manager.transit_display_groups.append( (_display_group, USER_REPRESENTATION) )
+
+  return _application_manager
+
+
+## Returns a grid of points in front of the user, some of them outside the frustum.
+def create_frustum_points():
+
+  _points = []
+  _columns = int(math.sqrt(number_of_frustum_points))
+
+  for _index in range(number_of_frustum_points):
+    _points.append(avango.gua.Vec3(-6.0 + 12.0 * (_index % _columns) / _columns
+                                 , -1.0 + 5.0 * (_index // _columns) / _columns
+                                 , -2.0 - 0.1 * _index))
+
+  return _points
+
+
+## Runs all benchmarks and prints the per-hook timings.
+def start():
+
+  _parser = argparse.ArgumentParser(description = "Headless benchmarks of the server's per-frame hot paths.")
+  _parser.add_argument("--frames", type = int, default = 600, help = "number of frames to be simulated")
+  _parser.add_argument("--tracking", default = None, help = "tracking file to be replayed instead of synthetic data")
+  _parser.add_argument("--csv", default = None, help = "CSV file to dump the statistics to")
+  _parser.add_argument("--instances", action = "store_true", help = "print per-instance statistics as well")
+  _arguments = _parser.parse_args()
+
+  if _arguments.tracking != None:
+    _tracking_frames = read_tracking_file(_arguments.tracking)
+  else:
+    _tracking_frames = create_synthetic_tracking(_arguments.frames)
+
+  if len(_tracking_frames) == 0:
+    print("No tracking frames to be replayed.")
+    return
+
+  _scenegraph = scenegraphs[0]
+  _scenegraph.height_function = lambda X, Z: 0.3 * math.sin(0.5 * X) * math.cos(0.5 * Z)
+
+  FixedTimestep.clock = lambda: simulated_time
+
+  _profiler = FrameProfiler(HISTORY_SIZE = _arguments.frames)
+  instrument_hooks(_profiler)
+
+  _navigations = create_navigations()
+  _user_repr = BenchmarkUserRepresentation(_scenegraph["/net"])
+  _ray_pointer = create_ray_pointer(_user_repr)
+  _application_manager = create_application_manager(_navigations, _user_repr)
+  _frustum_points = create_frustum_points()
+
+  _profiler.reset()
+  _scenegraph.number_of_ray_tests = 0
+  _start_time = time.perf_counter()
+
+  global simulated_time
+
+  for _frame in range(_arguments.frames):
+
+    _frame_start_time = time.perf_counter()
+    simulated_time += simulated_frame_time
+    _station_mat, _input_values = _tracking_frames[_frame % len(_tracking_frames)]
+
+    for _navigation in _navigations:
+      _navigation.device.sf_station_mat.value = _station_mat
+      _navigation.device.mf_dof.value = _input_values
+
+    _user_repr.head.Transform.value = avango.gua.make_trans_mat(_station_mat.get_translate() + avango.gua.Vec3(0.0, 0.5, 0.0))
+    _user_repr.view_transform_node.Transform.value = _navigations[0].sf_abs_mat.value
+
+    for _tool_repr in _ray_pointer.tool_representations:
+      _tool_repr.tool_transform_node.Transform.value = _station_mat
+
+    _ray_pointer.create_candidate_list()
+
+    Frustum.update_all(_user_repr.frustums)
+    Frustum.points_inside_frustums(_frustum_points, _user_repr.frustums)
+
+    avango.script.evaluate_frame()
+
+    _profiler.record("Frame", _profiler, time.perf_counter() - _frame_start_time)
+
+  _total_time = time.perf_counter() - _start_time
+
+  _profiler.frame_callback()
+  _profiler.print_statistics(_arguments.instances)
+
+  print("")
+  print(str(_arguments.frames) + " frames in " + str(round(_total_time, 3)) + " s, " + str(_scenegraph.number_of_ray_tests) + " ray tests.")
+
+  if _arguments.csv != None:
+    _profiler.dump_csv(_arguments.csv)
+
+
+if __name__ == '__main__':
+  start()
@@ -0,0 +1,254 @@
+#!/usr/bin/python
+
+## @file
+# Pure-Python stand-in for the avango core module, used by the headless benchmarks.
+#
+# Only the subset of the avango API used by the server framework is provided: fields with
+# connections and change notifications, lazily created node fields and the TimeSensor node.
+# Connected fields are updated synchronously on write, which is sufficient for timing the
+# framework's own Python code. It is not a substitute for avango when running the application.
+
+# import python libraries
+import time
+
+## Base class of all fields. Values are copied on read and write like avango's value semantics.
+class Field(object):
+
+  ## @var default_value
+  # Value of newly created fields of this type.
+  default_value = None
+
+  ## Custom constructor.
+  # @param VALUE Optional initial value, the type's default value otherwise.
+  def __init__(self, VALUE = None):
+
+    ## @var stored_value
+    # The current value of this field.
+    self.stored_value = self.copy_value(self.default_value if VALUE is None else VALUE)
+
+    ## @var owner
+    # The Script or node owning this field, None for class-level field declarations.
+    self.owner = None
+
+    ## @var input_field
+    # The field this field is connected from, None if not connected.
+    self.input_field = None
+
+    ## @var output_fields
+    # List of fields connected from this field.
+    self.output_fields = []
+
+    ## @var callbacks
+    # List of methods called whenever this field was written.
+    self.callbacks = []
+
+    ## @var propagating
+    # Boolean guarding against endless propagation in connection cycles.
+    self.propagating = False
+
+  ## Returns a copy of a value as stored by this field type.
+  # @param VALUE The value to be copied.
+  def copy_value(self, VALUE):
+    return VALUE
+
+  ## Returns a copy of the current value.
+  @property
+  def value(self):
+    return self.copy_value(self.stored_value)
+
+  ## Stores a copy of a value and notifies the owner, the callbacks and the connected fields.
+  @value.setter
+  def value(self, VALUE):
+    self.stored_value = self.copy_value(VALUE)
+    self.touch()
+
+  ## Notifies the owner, the callbacks and the connected fields about a write.
+  def touch(self):
+
+    if self.propagating:
+      return
+
+    self.propagating = True
+
+    try:
+      if self.owner != None:
+        self.owner.field_touched(self)
+
+      for _callback in self.callbacks:
+        _callback()
+
+      for _output_field in self.output_fields:
+        _output_field.value = self.stored_value
+
+    finally:
+      self.propagating = False
+
+  ## Connects this field from another one and takes over its current value.
+  # @param FIELD The field to be connected from.
+  def connect_from(self, FIELD):
+
+    self.disconnect()
+    self.input_field = FIELD
+    FIELD.output_fields.append(self)
+    self.value = FIELD.stored_value
+
+  ## Connects this field from another one. Weak connections are used to close feedback loops.
+  # @param FIELD The field to be connected from.
+  def connect_weak_from(self, FIELD):
+    self.connect_from(FIELD)
+
+  ## Removes the connection from the input field, if any.
+  def disconnect(self):
+
+    if self.input_field != None:
+      self.input_field.output_fields.remove(self)
+      self.input_field = None
+
+  ## Disconnects all fields connected from this field.
+  def disconnect_auditors(self):
+
+    for _output_field in list(self.output_fields):
+      _output_field.disconnect()
+
+  ## Returns a new unconnected field of the same type and value.
+  def clone(self):
+    return type(self)(self.stored_value)
+
+
+## Single-value field of a number, boolean, string or object.
+class SField(Field):
+  pass
+
+
+## Multi-value field. Values are stored as lists.
+class MField(Field):
+
+  default_value = []
+
+  ## Returns a shallow copy of a list.
+  # @param VALUE The list to be copied.
+  def copy_value(self, VALUE):
+    return list(VALUE)
+
+
+class SFFloat(SField):
+  default_value = 0.0
+
+class SFDouble(SField):
+  default_value = 0.0
+
+class SFInt(SField):
+  default_value = 0
+
+class SFUInt(SField):
+  default_value = 0
+
+class SFLong(SField):
+  default_value = 0
+
+class SFBool(SField):
+  default_value = False
+
+class SFString(SField):
+  default_value = ""
+
+class MFFloat(MField):
+  pass
+
+class MFDouble(MField):
+  pass
+
+class MFInt(MField):
+  pass
+
+class MFUInt(MField):
+  pass
+
+class MFBool(MField):
+  pass
+
+class MFString(MField):
+  pass
+
+
+## Base class of all stand-in nodes.
+#
+# Fields are created on first access. Known field names get the types listed in field_types,
+# all other names starting with an upper case letter get generic fields, so that node types
+# not modelled by the stand-in can still be constructed with arbitrary keyword arguments.
+class Node(object):
+
+  ## @var field_types
+  # Dictionary mapping field names to the field types they are created with.
+  field_types = {"Name" : SFString}
+
+  ## Custom constructor.
+  # @param FIELDS Initial field values as keyword arguments, e.g. Name = "node".
+  def __init__(self, **FIELDS):
+
+    for _name, _value in FIELDS.items():
+      getattr(self, _name).value = _value
+
+  ## Creates fields on first access.
+  # @param NAME The name of the requested attribute.
+  def __getattr__(self, NAME):
+
+    if NAME[0].isupper():
+      _field = self.create_field(NAME)
+      _field.owner = self
+      self.__dict__[NAME] = _field
+      return _field
+
+    raise AttributeError(NAME)
+
+  ## Creates a new field for a field name.
+  # @param NAME The name of the field to be created.
+  def create_field(self, NAME):
+
+    for _class in type(self).__mro__:
+
+      _field_types = _class.__dict__.get("field_types", {})
+
+      if NAME in _field_types:
+        return _field_types[NAME]()
+
+    return SField()
+
+  ## Called when one of this node's fields was written.
+  # @param FIELD The field which was written.
+  def field_touched(self, FIELD):
+    pass
+
+
+## Field returning the time elapsed since its creation in seconds.
+class SFElapsedTime(SFDouble):
+
+  ## Custom constructor.
+  # @param VALUE Ignored, the value is computed on every read.
+  def __init__(self, VALUE = None):
+    SFDouble.__init__(self)
+
+    ## @var start_time
+    # Wall time at construction.
+    self.start_time = time.time()
+
+  ## Returns the elapsed time.
+  @property
+  def value(self):
+    return time.time() - self.start_time
+
+  ## Writes are ignored, as the value is derived from the wall time.
+  @value.setter
+  def value(self, VALUE):
+    pass
+
+
+## Node providing the elapsed time in seconds.
+class TimeSensor(Node):
+
+  field_types = {"Time" : SFElapsedTime}
+
+
+## Namespace of the core node types, accessed as avango.nodes.
+class nodes:
+  TimeSensor = TimeSensor
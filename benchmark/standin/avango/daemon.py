@@ -0,0 +1,76 @@
+#!/usr/bin/python
+
+## @file
+# Pure-Python stand-in for avango.daemon, used by the headless benchmarks.
+#
+# DeviceSensor nodes provide the fields read by the framework's devices and tracking readers.
+# They receive no input by themselves; benchmarks write recorded or synthetic values to them.
+# The device driver classes only exist so that daemon configurations can be imported.
+
+# import avango libraries
+import avango
+import avango.gua
+from avango import Node, SFString, SFFloat, SFBool
+
+# import python libraries
+import re
+
+## Node exposing the values of a device station.
+class DeviceSensor(Node):
+
+  field_types = { "Station" : SFString
+                , "Matrix" : avango.gua.SFMatrix4
+                , "TransmitterOffset" : avango.gua.SFMatrix4
+                , "ReceiverOffset" : avango.gua.SFMatrix4 }
+
+  ## Creates a new field for a field name. ValueN fields are floats, ButtonN fields booleans.
+  # @param NAME The name of the field to be created.
+  def create_field(self, NAME):
+
+    if re.match(r"^Value\d+$", NAME):
+      return SFFloat()
+
+    if re.match(r"^Button\d+$", NAME):
+      return SFBool()
+
+    return Node.create_field(self, NAME)
+
+
+## Namespace of the daemon node types, accessed as avango.daemon.nodes.
+class nodes:
+  DeviceSensor = DeviceSensor
+
+
+## Device driver or service stand-in accepting any attribute assignment and method call.
+class DeviceStandIn(object):
+
+  def __init__(self, *ARGS, **KWARGS):
+    self.__dict__["stations"] = {}
+
+  def __getattr__(self, NAME):
+    return lambda *ARGS, **KWARGS: None
+
+
+class DeviceService(DeviceStandIn):
+  pass
+
+class Station(DeviceStandIn):
+  pass
+
+class HIDInput(DeviceStandIn):
+  pass
+
+class DTrack(DeviceStandIn):
+  pass
+
+class TUIOInput(DeviceStandIn):
+  pass
+
+class Oculus(DeviceStandIn):
+  pass
+
+
+## Starts the daemon with a list of devices. Returns immediately in the stand-in.
+# @param DEVICES List of device instances.
+def run(DEVICES):
+  pass
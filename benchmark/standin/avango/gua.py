@@ -0,0 +1,866 @@
+#!/usr/bin/python
+
+## @file
+# Pure-Python stand-in for avango.gua, used by the headless benchmarks.
+#
+# Provides the math types (Vec2, Vec3, Vec4, Quat, Mat4, Color) with guacamole's conventions
+# (angles in degrees, Mat4 * Vec3 returning a Vec4 with w = 1), the matrix fields, and a minimal
+# scenegraph with world transformations, path lookup and a ray test against a height field.
+# Plain Python floats are used instead of numpy, as the framework performs single 4x4 operations
+# for which the per-call overhead of numpy arrays outweighs their arithmetic speed.
+
+# import avango libraries
+import avango
+from avango import Field, SField, MField, Node, SFString, SFFloat, SFBool, MFString
+
+# import python libraries
+import math
+
+## Two-dimensional vector.
+class Vec2(object):
+
+  __slots__ = ("x", "y")
+
+  def __init__(self, X = 0.0, Y = 0.0):
+    self.x = X
+    self.y = Y
+
+  def __add__(self, OTHER):
+    return Vec2(self.x + OTHER.x, self.y + OTHER.y)
+
+  def __sub__(self, OTHER):
+    return Vec2(self.x - OTHER.x, self.y - OTHER.y)
+
+  def __mul__(self, SCALAR):
+    return Vec2(self.x * SCALAR, self.y * SCALAR)
+
+  __rmul__ = __mul__
+
+  def length(self):
+    return math.sqrt(self.x * self.x + self.y * self.y)
+
+  def copy(self):
+    return Vec2(self.x, self.y)
+
+  def __repr__(self):
+    return "(" + str(self.x) + ", " + str(self.y) + ")"
+
+
+## Three-dimensional vector.
+class Vec3(object):
+
+  __slots__ = ("x", "y", "z")
+
+  def __init__(self, X = 0.0, Y = 0.0, Z = 0.0):
+    self.x = X
+    self.y = Y
+    self.z = Z
+
+  def __add__(self, OTHER):
+    return Vec3(self.x + OTHER.x, self.y + OTHER.y, self.z + OTHER.z)
+
+  def __sub__(self, OTHER):
+    return Vec3(self.x - OTHER.x, self.y - OTHER.y, self.z - OTHER.z)
+
+  ## Multiplies by a scalar or, component-wise, by another vector.
+  def __mul__(self, OTHER):
+
+    if isinstance(OTHER, Vec3):
+      return Vec3(self.x * OTHER.x, self.y * OTHER.y, self.z * OTHER.z)
+
+    return Vec3(self.x * OTHER, self.y * OTHER, self.z * OTHER)
+
+  __rmul__ = __mul__
+
+  def __truediv__(self, SCALAR):
+    return Vec3(self.x / SCALAR, self.y / SCALAR, self.z / SCALAR)
+
+  def __neg__(self):
+    return Vec3(-self.x, -self.y, -self.z)
+
+  def __eq__(self, OTHER):
+    return isinstance(OTHER, Vec3) and self.x == OTHER.x and self.y == OTHER.y and self.z == OTHER.z
+
+  def __ne__(self, OTHER):
+    return not self.__eq__(OTHER)
+
+  __hash__ = None
+
+  def length(self):
+    return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+  ## Normalizes this vector in place. Zero vectors are left unchanged.
+  def normalize(self):
+
+    _length = self.length()
+
+    if _length > 0.0:
+      self.x /= _length
+      self.y /= _length
+      self.z /= _length
+
+  def dot(self, OTHER):
+    return self.x * OTHER.x + self.y * OTHER.y + self.z * OTHER.z
+
+  def cross(self, OTHER):
+    return Vec3(self.y * OTHER.z - self.z * OTHER.y
+              , self.z * OTHER.x - self.x * OTHER.z
+              , self.x * OTHER.y - self.y * OTHER.x)
+
+  def copy(self):
+    return Vec3(self.x, self.y, self.z)
+
+  def __repr__(self):
+    return "(" + str(self.x) + ", " + str(self.y) + ", " + str(self.z) + ")"
+
+
+## Four-dimensional vector, e.g. the result of transforming a Vec3 by a Mat4.
+class Vec4(object):
+
+  __slots__ = ("x", "y", "z", "w")
+
+  def __init__(self, X = 0.0, Y = 0.0, Z = 0.0, W = 0.0):
+    self.x = X
+    self.y = Y
+    self.z = Z
+    self.w = W
+
+  def __add__(self, OTHER):
+    return Vec4(self.x + OTHER.x, self.y + OTHER.y, self.z + OTHER.z, self.w + OTHER.w)
+
+  def __sub__(self, OTHER):
+    return Vec4(self.x - OTHER.x, self.y - OTHER.y, self.z - OTHER.z, self.w - OTHER.w)
+
+  def __mul__(self, SCALAR):
+    return Vec4(self.x * SCALAR, self.y * SCALAR, self.z * SCALAR, self.w * SCALAR)
+
+  __rmul__ = __mul__
+
+  def length(self):
+    return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z + self.w * self.w)
+
+  def copy(self):
+    return Vec4(self.x, self.y, self.z, self.w)
+
+  def __repr__(self):
+    return "(" + str(self.x) + ", " + str(self.y) + ", " + str(self.z) + ", " + str(self.w) + ")"
+
+
+## Rotation quaternion.
+class Quat(object):
+
+  __slots__ = ("x", "y", "z", "w")
+
+  def __init__(self, X = 0.0, Y = 0.0, Z = 0.0, W = 1.0):
+    self.x = X
+    self.y = Y
+    self.z = Z
+    self.w = W
+
+  ## Returns the rotation angle in degrees. NaN if the quaternion is not normalized.
+  def get_angle(self):
+
+    if abs(self.w) > 1.0:
+      return float("nan")
+
+    return math.degrees(2.0 * math.acos(self.w))
+
+  ## Returns the normalized rotation axis, a zero vector for the identity rotation.
+  def get_axis(self):
+
+    _axis = Vec3(self.x, self.y, self.z)
+    _axis.normalize()
+    return _axis
+
+  def __repr__(self):
+    return "(" + str(self.x) + ", " + str(self.y) + ", " + str(self.z) + ", " + str(self.w) + ")"
+
+
+## RGB(A) color.
+class Color(object):
+
+  def __init__(self, R = 0.0, G = 0.0, B = 0.0, A = 1.0):
+    self.r = R
+    self.g = G
+    self.b = B
+    self.a = A
+
+  def copy(self):
+    return Color(self.r, self.g, self.b, self.a)
+
+
+## 4x4 matrix, stored row-major in a flat list. Translations are in the last column.
+class Mat4(object):
+
+  __slots__ = ("m",)
+
+  ## Custom constructor.
+  # @param VALUES Optional list of 16 floats in row-major order, the identity otherwise.
+  def __init__(self, VALUES = None):
+
+    if VALUES is None:
+      self.m = [1.0, 0.0, 0.0, 0.0
+              , 0.0, 1.0, 0.0, 0.0
+              , 0.0, 0.0, 1.0, 0.0
+              , 0.0, 0.0, 0.0, 1.0]
+    else:
+      self.m = list(VALUES)
+
+  ## Multiplies with another matrix, a Vec3 (as a point, returning a Vec4) or a Vec4.
+  def __mul__(self, OTHER):
+
+    _a = self.m
+
+    if isinstance(OTHER, Mat4):
+
+      _b = OTHER.m
+      _result = [0.0] * 16
+
+      for _row in (0, 4, 8, 12):
+
+        _a0 = _a[_row]
+        _a1 = _a[_row + 1]
+        _a2 = _a[_row + 2]
+        _a3 = _a[_row + 3]
+
+        _result[_row]     = _a0 * _b[0] + _a1 * _b[4] + _a2 * _b[8]  + _a3 * _b[12]
+        _result[_row + 1] = _a0 * _b[1] + _a1 * _b[5] + _a2 * _b[9]  + _a3 * _b[13]
+        _result[_row + 2] = _a0 * _b[2] + _a1 * _b[6] + _a2 * _b[10] + _a3 * _b[14]
+        _result[_row + 3] = _a0 * _b[3] + _a1 * _b[7] + _a2 * _b[11] + _a3 * _b[15]
+
+      return Mat4(_result)
+
+    if isinstance(OTHER, Vec3):
+
+      _x = OTHER.x
+      _y = OTHER.y
+      _z = OTHER.z
+
+      return Vec4(_a[0] * _x + _a[1] * _y + _a[2] * _z + _a[3]
+                , _a[4] * _x + _a[5] * _y + _a[6] * _z + _a[7]
+                , _a[8] * _x + _a[9] * _y + _a[10] * _z + _a[11]
+                , _a[12] * _x + _a[13] * _y + _a[14] * _z + _a[15])
+
+    if isinstance(OTHER, Vec4):
+
+      _x = OTHER.x
+      _y = OTHER.y
+      _z = OTHER.z
+      _w = OTHER.w
+
+      return Vec4(_a[0] * _x + _a[1] * _y + _a[2] * _z + _a[3] * _w
+                , _a[4] * _x + _a[5] * _y + _a[6] * _z + _a[7] * _w
+                , _a[8] * _x + _a[9] * _y + _a[10] * _z + _a[11] * _w
+                , _a[12] * _x + _a[13] * _y + _a[14] * _z + _a[15] * _w)
+
+    return NotImplemented
+
+  def get_element(self, ROW, COLUMN):
+    return self.m[ROW * 4 + COLUMN]
+
+  def set_element(self, ROW, COLUMN, VALUE):
+    self.m[ROW * 4 + COLUMN] = VALUE
+
+  def get_translate(self):
+    return Vec3(self.m[3], self.m[7], self.m[11])
+
+  def set_translate(self, VECTOR):
+    self.m[3] = VECTOR.x
+    self.m[7] = VECTOR.y
+    self.m[11] = VECTOR.z
+
+  ## Returns the lengths of the first three columns.
+  def get_scale(self):
+
+    _m = self.m
+    return Vec3(math.sqrt(_m[0] * _m[0] + _m[4] * _m[4] + _m[8] * _m[8])
+              , math.sqrt(_m[1] * _m[1] + _m[5] * _m[5] + _m[9] * _m[9])
+              , math.sqrt(_m[2] * _m[2] + _m[6] * _m[6] + _m[10] * _m[10]))
+
+  ## Returns the rotation of the upper 3x3 part. Not normalized if the matrix is scaled.
+  def get_rotate(self):
+
+    _m = self.m
+    return quat_from_rotation(_m[0], _m[1], _m[2], _m[4], _m[5], _m[6], _m[8], _m[9], _m[10])
+
+  ## Returns the rotation of the upper 3x3 part with the scaling removed.
+  def get_rotate_scale_corrected(self):
+
+    _m = self.m
+    _scale = self.get_scale()
+    _sx = _scale.x if _scale.x > 0.0 else 1.0
+    _sy = _scale.y if _scale.y > 0.0 else 1.0
+    _sz = _scale.z if _scale.z > 0.0 else 1.0
+
+    return quat_from_rotation(_m[0] / _sx, _m[1] / _sy, _m[2] / _sz
+                            , _m[4] / _sx, _m[5] / _sy, _m[6] / _sz
+                            , _m[8] / _sx, _m[9] / _sy, _m[10] / _sz)
+
+  def copy(self):
+    return Mat4(self.m)
+
+  def __repr__(self):
+    return "\n".join([str(self.m[_row * 4 : _row * 4 + 4]) for _row in range(4)])
+
+
+## Converts a 3x3 rotation matrix given in row-major order to a quaternion.
+def quat_from_rotation(M00, M01, M02, M10, M11, M12, M20, M21, M22):
+
+  _trace = M00 + M11 + M22
+
+  if _trace > 0.0:
+    _s = math.sqrt(_trace + 1.0) * 2.0
+    return Quat((M21 - M12) / _s, (M02 - M20) / _s, (M10 - M01) / _s, 0.25 * _s)
+
+  if M00 > M11 and M00 > M22:
+    _s = math.sqrt(max(1.0 + M00 - M11 - M22, 0.0)) * 2.0 or 1.0
+    return Quat(0.25 * _s, (M01 + M10) / _s, (M02 + M20) / _s, (M21 - M12) / _s)
+
+  if M11 > M22:
+    _s = math.sqrt(max(1.0 + M11 - M00 - M22, 0.0)) * 2.0 or 1.0
+    return Quat((M01 + M10) / _s, 0.25 * _s, (M12 + M21) / _s, (M02 - M20) / _s)
+
+  _s = math.sqrt(max(1.0 + M22 - M00 - M11, 0.0)) * 2.0 or 1.0
+  return Quat((M02 + M20) / _s, (M12 + M21) / _s, 0.25 * _s, (M10 - M01) / _s)
+
+
+def make_identity_mat():
+  return Mat4()
+
+## Returns a translation matrix. Accepts a vector or three floats.
+def make_trans_mat(*ARGS):
+
+  if len(ARGS) == 1:
+    _x, _y, _z = ARGS[0].x, ARGS[0].y, ARGS[0].z
+  else:
+    _x, _y, _z = ARGS
+
+  return Mat4([1.0, 0.0, 0.0, _x
+             , 0.0, 1.0, 0.0, _y
+             , 0.0, 0.0, 1.0, _z
+             , 0.0, 0.0, 0.0, 1.0])
+
+## Returns a scaling matrix. Accepts a uniform factor, a vector or three floats.
+def make_scale_mat(*ARGS):
+
+  if len(ARGS) == 1:
+
+    if isinstance(ARGS[0], (Vec3, Vec4)):
+      _x, _y, _z = ARGS[0].x, ARGS[0].y, ARGS[0].z
+    else:
+      _x = _y = _z = ARGS[0]
+
+  else:
+    _x, _y, _z = ARGS
+
+  return Mat4([_x, 0.0, 0.0, 0.0
+             , 0.0, _y, 0.0, 0.0
+             , 0.0, 0.0, _z, 0.0
+             , 0.0, 0.0, 0.0, 1.0])
+
+## Returns a rotation matrix. Accepts a quaternion, an angle in degrees and an axis vector,
+# or an angle in degrees and three axis components. A zero axis yields the identity.
+def make_rot_mat(*ARGS):
+
+  if len(ARGS) == 1:
+
+    _quat = ARGS[0]
+    _x, _y, _z, _w = _quat.x, _quat.y, _quat.z, _quat.w
+    _length = math.sqrt(_x * _x + _y * _y + _z * _z + _w * _w)
+
+    if _length == 0.0:
+      return Mat4()
+
+    _x /= _length
+    _y /= _length
+    _z /= _length
+    _w /= _length
+
+    return Mat4([1.0 - 2.0 * (_y * _y + _z * _z), 2.0 * (_x * _y - _z * _w), 2.0 * (_x * _z + _y * _w), 0.0
+               , 2.0 * (_x * _y + _z * _w), 1.0 - 2.0 * (_x * _x + _z * _z), 2.0 * (_y * _z - _x * _w), 0.0
+               , 2.0 * (_x * _z - _y * _w), 2.0 * (_y * _z + _x * _w), 1.0 - 2.0 * (_x * _x + _y * _y), 0.0
+               , 0.0, 0.0, 0.0, 1.0])
+
+  if len(ARGS) == 2:
+    _angle = ARGS[0]
+    _x, _y, _z = ARGS[1].x, ARGS[1].y, ARGS[1].z
+  else:
+    _angle, _x, _y, _z = ARGS
+
+  _length = math.sqrt(_x * _x + _y * _y + _z * _z)
+
+  if _length == 0.0:
+    return Mat4()
+
+  _x /= _length
+  _y /= _length
+  _z /= _length
+
+  _radians = math.radians(_angle)
+  _c = math.cos(_radians)
+  _s = math.sin(_radians)
+  _t = 1.0 - _c
+
+  return Mat4([_t * _x * _x + _c, _t * _x * _y - _s * _z, _t * _x * _z + _s * _y, 0.0
+             , _t * _x * _y + _s * _z, _t * _y * _y + _c, _t * _y * _z - _s * _x, 0.0
+             , _t * _x * _z - _s * _y, _t * _y * _z + _s * _x, _t * _z * _z + _c, 0.0
+             , 0.0, 0.0, 0.0, 1.0])
+
+## Returns the inverse of a matrix. Affine matrices are inverted via their 3x3 part.
+def make_inverse_mat(MATRIX):
+
+  _m = MATRIX.m
+
+  if _m[12] != 0.0 or _m[13] != 0.0 or _m[14] != 0.0 or _m[15] != 1.0:
+    return make_general_inverse_mat(MATRIX)
+
+  _c00 = _m[5] * _m[10] - _m[6] * _m[9]
+  _c01 = _m[6] * _m[8] - _m[4] * _m[10]
+  _c02 = _m[4] * _m[9] - _m[5] * _m[8]
+
+  _determinant = _m[0] * _c00 + _m[1] * _c01 + _m[2] * _c02
+
+  if _determinant == 0.0:
+    return Mat4()
+
+  _inv = 1.0 / _determinant
+
+  _r00 = _c00 * _inv
+  _r01 = (_m[2] * _m[9] - _m[1] * _m[10]) * _inv
+  _r02 = (_m[1] * _m[6] - _m[2] * _m[5]) * _inv
+  _r10 = _c01 * _inv
+  _r11 = (_m[0] * _m[10] - _m[2] * _m[8]) * _inv
+  _r12 = (_m[2] * _m[4] - _m[0] * _m[6]) * _inv
+  _r20 = _c02 * _inv
+  _r21 = (_m[1] * _m[8] - _m[0] * _m[9]) * _inv
+  _r22 = (_m[0] * _m[5] - _m[1] * _m[4]) * _inv
+
+  _tx = _m[3]
+  _ty = _m[7]
+  _tz = _m[11]
+
+  return Mat4([_r00, _r01, _r02, -(_r00 * _tx + _r01 * _ty + _r02 * _tz)
+             , _r10, _r11, _r12, -(_r10 * _tx + _r11 * _ty + _r12 * _tz)
+             , _r20, _r21, _r22, -(_r20 * _tx + _r21 * _ty + _r22 * _tz)
+             , 0.0, 0.0, 0.0, 1.0])
+
+## Returns the inverse of an arbitrary matrix using Gauss-Jordan elimination.
+def make_general_inverse_mat(MATRIX):
+
+  _rows = [MATRIX.m[_row * 4 : _row * 4 + 4] + [1.0 if _column == _row else 0.0 for _column in range(4)] for _row in range(4)]
+
+  for _column in range(4):
+
+    _pivot = max(range(_column, 4), key = lambda _row: abs(_rows[_row][_column]))
+
+    if _rows[_pivot][_column] == 0.0:
+      return Mat4()
+
+    _rows[_column], _rows[_pivot] = _rows[_pivot], _rows[_column]
+    _factor = 1.0 / _rows[_column][_column]
+    _rows[_column] = [_value * _factor for _value in _rows[_column]]
+
+    for _row in range(4):
+
+      if _row != _column and _rows[_row][_column] != 0.0:
+        _scale = _rows[_row][_column]
+        _rows[_row] = [_value - _scale * _pivot_value for _value, _pivot_value in zip(_rows[_row], _rows[_column])]
+
+  return Mat4([_value for _row in _rows for _value in _row[4:]])
+
+
+# fields
+
+## Single matrix field, defaults to the identity.
+class SFMatrix4(SField):
+
+  default_value = Mat4()
+
+  def copy_value(self, VALUE):
+    return Mat4(VALUE.m)
+
+class MFMatrix4(MField):
+  pass
+
+class SFVec2(SField):
+
+  default_value = Vec2()
+
+  def copy_value(self, VALUE):
+    return VALUE.copy()
+
+class SFVec3(SField):
+
+  default_value = Vec3()
+
+  def copy_value(self, VALUE):
+    return VALUE.copy()
+
+class SFVec4(SField):
+
+  default_value = Vec4()
+
+  def copy_value(self, VALUE):
+    return VALUE.copy()
+
+class SFColor(SField):
+
+  default_value = Color()
+
+  def copy_value(self, VALUE):
+    return VALUE.copy()
+
+class SFNode(SField):
+  pass
+
+class MFNode(MField):
+  pass
+
+class MFPickResult(MField):
+  pass
+
+
+## Single intersection of a ray with a scenegraph node.
+class PickResult(object):
+
+  ## Custom constructor.
+  # @param DISTANCE Distance to the intersection, normalized to the ray length.
+  # @param POSITION Intersection position in the object's coordinate system.
+  # @param WORLD_POSITION Intersection position in world coordinates.
+  # @param WORLD_NORMAL Surface normal at the intersection in world coordinates.
+  # @param OBJECT The intersected node.
+  def __init__(self, DISTANCE, POSITION, WORLD_POSITION, WORLD_NORMAL, OBJECT):
+
+    self.Distance = SFFloat(DISTANCE)
+    self.Position = SFVec3(POSITION)
+    self.WorldPosition = SFVec3(WORLD_POSITION)
+    self.WorldNormal = SFVec3(WORLD_NORMAL)
+    self.Object = SFNode(OBJECT)
+
+
+# nodes
+
+## Children list of a node, keeping the Parent fields of the children up to date.
+class ChildList(list):
+
+  ## Custom constructor.
+  # @param OWNER The node the children belong to.
+  # @param NODES Initial children.
+  def __init__(self, OWNER, NODES = []):
+    list.__init__(self)
+
+    ## @var owner
+    # The node the children belong to.
+    self.owner = OWNER
+
+    self.extend(NODES)
+
+  def append(self, NODE):
+    NODE.Parent.stored_value = self.owner
+    list.append(self, NODE)
+
+  def extend(self, NODES):
+    for _node in NODES:
+      self.append(_node)
+
+  def insert(self, INDEX, NODE):
+    NODE.Parent.stored_value = self.owner
+    list.insert(self, INDEX, NODE)
+
+  def remove(self, NODE):
+    list.remove(self, NODE)
+    NODE.Parent.stored_value = None
+
+  def pop(self, INDEX = -1):
+    _node = list.pop(self, INDEX)
+    _node.Parent.stored_value = None
+    return _node
+
+  def clear(self):
+    for _node in self:
+      _node.Parent.stored_value = None
+
+    del self[:]
+
+
+## Children field. Reads return the stored ChildList itself, so that appending modifies the node.
+class MFChildren(MField):
+
+  ## Returns the ChildList itself instead of a copy.
+  @property
+  def value(self):
+    return self.stored_value
+
+  ## Replaces all children.
+  @value.setter
+  def value(self, VALUE):
+
+    if isinstance(self.stored_value, ChildList):
+      self.stored_value.clear()
+      self.stored_value.extend(VALUE)
+    else:
+      self.stored_value = VALUE
+
+    self.touch()
+
+
+## Field computing a node's world transformation from the parent chain on every read.
+class SFWorldTransform(SFMatrix4):
+
+  ## Custom constructor.
+  # @param NODE The node to compute the world transformation for.
+  def __init__(self, NODE = None):
+    SFMatrix4.__init__(self)
+
+    ## @var node
+    # The node to compute the world transformation for.
+    self.node = NODE
+
+  @property
+  def value(self):
+
+    _matrix = self.node.Transform.stored_value
+    _parent = self.node.Parent.stored_value
+
+    while _parent != None:
+      _matrix = _parent.Transform.stored_value * _matrix
+      _parent = _parent.Parent.stored_value
+
+    return Mat4(_matrix.m)
+
+  @value.setter
+  def value(self, VALUE):
+    pass
+
+
+## Generic scenegraph node with name, transformation, children and group names.
+class SceneNode(Node):
+
+  field_types = { "Transform" : SFMatrix4
+                , "Children" : MFChildren
+                , "Parent" : SFNode
+                , "GroupNames" : MFString
+                , "Material" : SFString
+                , "Width" : SFFloat
+                , "Height" : SFFloat
+                , "Tags" : MFString }
+
+  ## Creates a new field for a field name. Children and WorldTransform refer to this node.
+  # @param NAME The name of the field to be created.
+  def create_field(self, NAME):
+
+    if NAME == "Children":
+      _field = MFChildren()
+      _field.stored_value = ChildList(self)
+      return _field
+
+    if NAME == "WorldTransform":
+      return SFWorldTransform(self)
+
+    if NAME == "Path":
+      return SFString(self.get_path())
+
+    return Node.create_field(self, NAME)
+
+  ## Creates fields on first access. Path is recomputed on every read.
+  # @param NAME The name of the requested attribute.
+  def __getattr__(self, NAME):
+
+    _field = Node.__getattr__(self, NAME)
+
+    if NAME == "Path":
+      del self.__dict__[NAME]
+
+    return _field
+
+  ## Returns the absolute path of this node in its scenegraph.
+  def get_path(self):
+
+    _names = []
+    _node = self
+
+    while _node.Parent.stored_value != None:
+      _names.append(_node.Name.stored_value)
+      _node = _node.Parent.stored_value
+
+    return "/" + "/".join(reversed(_names))
+
+
+## Scenegraph with a root node, path lookup and ray tests.
+#
+# Ray tests are answered analytically by intersecting the ray with the height field returned
+# by height_function, representing the terrain node. The terrain node is added below the root
+# and carries the group names used by the framework's picking masks.
+class SceneGraph(Node):
+
+  field_types = {"Root" : SFNode}
+
+  ## Custom constructor.
+  # @param FIELDS Initial field values as keyword arguments.
+  def __init__(self, **FIELDS):
+    Node.__init__(self, **FIELDS)
+
+    self.Root.value = SceneNode(Name = "/")
+
+    ## @var terrain_node
+    # Node returned as intersected object by ray tests.
+    self.terrain_node = SceneNode(Name = "terrain")
+    self.terrain_node.GroupNames.value = ["gf_pick_group", "man_pick_group"]
+    self.Root.value.Children.value.append(self.terrain_node)
+
+    ## @var height_function
+    # Function mapping world x and z coordinates to the terrain height.
+    self.height_function = lambda X, Z: 0.0
+
+    ## @var number_of_ray_tests
+    # Number of ray tests performed so far.
+    self.number_of_ray_tests = 0
+
+  ## Returns the node at an absolute path, e.g. "/net", None if there is no such node.
+  # @param PATH The path of the node.
+  def __getitem__(self, PATH):
+
+    _node = self.Root.value
+
+    for _name in [_name for _name in PATH.split("/") if _name != ""]:
+
+      _children = [_child for _child in _node.Children.value if _child.Name.value == _name]
+
+      if len(_children) == 0:
+        return None
+
+      _node = _children[0]
+
+    return _node
+
+  ## Intersects a ray node with the terrain. The ray starts at the node's origin and ends at (0, 0, -1) in its coordinate system.
+  # @param RAY The ray node.
+  # @param OPTIONS The picking options, ignored.
+  # @param MASK The picking mask, either empty or one of the terrain's group names for a hit.
+  # @return MFPickResult field with at most one PickResult.
+  def ray_test(self, RAY, OPTIONS = 0, MASK = ""):
+
+    self.number_of_ray_tests += 1
+
+    _result = MFPickResult()
+
+    if MASK != "" and MASK not in self.terrain_node.GroupNames.value:
+      return _result
+
+    _ray_mat = RAY.WorldTransform.value
+    _start = _ray_mat * Vec3(0.0, 0.0, 0.0)
+    _end = _ray_mat * Vec3(0.0, 0.0, -1.0)
+
+    _height = self.height_function(_start.x, _start.z)
+    _descent = _start.y - _end.y
+
+    if _descent <= 0.0:
+      return _result
+
+    _distance = (_start.y - _height) / _descent
+
+    if _distance < 0.0 or _distance > 1.0:
+      return _result
+
+    _position = Vec3(_start.x + (_end.x - _start.x) * _distance
+                   , _start.y + (_end.y - _start.y) * _distance
+                   , _start.z + (_end.z - _start.z) * _distance)
+
+    _result.value = [PickResult(_distance, _position, _position, Vec3(0.0, 1.0, 0.0), self.terrain_node)]
+    return _result
+
+
+## Network node whose subtree is distributed to the clients.
+class NetTransform(SceneNode):
+
+  field_types = {"Groupname" : SFString}
+
+  ## Custom constructor.
+  # @param FIELDS Initial field values as keyword arguments.
+  def __init__(self, **FIELDS):
+    SceneNode.__init__(self, **FIELDS)
+
+    ## @var distributed_objects
+    # Number of objects registered for distribution.
+    self.distributed_objects = 0
+
+  def distribute_object(self, OBJECT):
+    self.distributed_objects += 1
+
+
+## Loader creating geometry nodes without loading any files.
+class TriMeshLoader(Node):
+
+  def create_geometry_from_file(self, NAME, FILENAME, MATERIAL = "", FLAGS = 0):
+    return SceneNode(Name = NAME, Material = MATERIAL)
+
+
+## Viewer evaluating the stand-in scripts once per frame.
+class Viewer(Node):
+
+  def frame(self):
+
+    import avango.script
+    avango.script.evaluate_frame()
+
+  def run(self):
+    pass
+
+
+## Factory of node types, accessed as avango.gua.nodes. Unknown types are generic scenegraph nodes.
+class NodeFactory(object):
+
+  ## @var node_types
+  # Dictionary mapping node type names to the classes modelling them.
+  node_types = { "SceneGraph" : SceneGraph
+               , "NetTransform" : NetTransform
+               , "TriMeshLoader" : TriMeshLoader
+               , "PLODLoader" : TriMeshLoader
+               , "Viewer" : Viewer }
+
+  def __getattr__(self, NAME):
+
+    if NAME not in NodeFactory.node_types:
+      NodeFactory.node_types[NAME] = type(NAME, (SceneNode,), {})
+
+    return NodeFactory.node_types[NAME]
+
+nodes = NodeFactory()
+
+
+## Enumeration returning distinct bit flags for arbitrary names.
+class FlagEnumeration(object):
+
+  def __init__(self):
+    self.flags = {}
+
+  def __getattr__(self, NAME):
+
+    if NAME == "flags":
+      raise AttributeError(NAME)
+
+    if NAME not in self.flags:
+      self.flags[NAME] = 1 << len(self.flags)
+
+    return self.flags[NAME]
+
+LoaderFlags = FlagEnumeration()
+PLODLoaderFlags = FlagEnumeration()
+PickingOptions = FlagEnumeration()
+ShadowMode = FlagEnumeration()
+BackgroundMode = FlagEnumeration()
+
+
+# resource functions, which have no effect without a renderer
+
+def load_materials_from(PATH):
+  pass
+
+def load_shading_models_from(PATH):
+  pass
+
+def create_texture(FILENAME):
+  pass
+
+def set_material_uniform(MATERIAL, NAME, VALUE):
+  pass
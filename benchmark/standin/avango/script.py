@@ -0,0 +1,133 @@
+#!/usr/bin/python
+
+## @file
+# Pure-Python stand-in for avango.script, used by the headless benchmarks.
+#
+# Field declarations on Script classes are cloned per instance on construction and wired to
+# the methods decorated with field_has_changed. evaluate_frame() mimics one frame of avango's
+# evaluation loop: the callbacks of active Update nodes are called, followed by the evaluate
+# methods of all scripts which either always evaluate or had an input field written.
+
+# import avango libraries
+import avango
+from avango import Field, SField, Node
+
+# import python libraries
+import builtins
+import weakref
+
+## @var scripts
+# List of weak references to all constructed Script instances.
+scripts = []
+
+## @var update_nodes
+# List of weak references to all constructed Update nodes.
+update_nodes = []
+
+## Decorator registering a method to be called whenever a field of the Script was written.
+# @param FIELD The class-level field declaration to be watched.
+def field_has_changed(FIELD):
+
+  def _decorator(METHOD):
+    METHOD.watched_field = FIELD
+    return METHOD
+
+  return _decorator
+
+
+## Field holding an arbitrary Python object.
+class SFObject(SField):
+  pass
+
+
+## Base class of all scripts.
+class Script(object):
+
+  ## Default constructor. Clones the class-level field declarations and wires the change handlers.
+  def __init__(self):
+
+    _class_fields = {}
+
+    for _class in reversed(type(self).__mro__):
+      for _name, _attribute in vars(_class).items():
+        if isinstance(_attribute, Field):
+          _class_fields[_name] = _attribute
+
+    _instance_fields = {}
+
+    for _name, _class_field in _class_fields.items():
+      _field = _class_field.clone()
+      _field.owner = self
+      self.__dict__[_name] = _field
+      _instance_fields[id(_class_field)] = _field
+
+    for _class in reversed(type(self).__mro__):
+      for _name, _attribute in vars(_class).items():
+
+        _watched_field = getattr(_attribute, "watched_field", None)
+
+        if _watched_field != None and id(_watched_field) in _instance_fields:
+          _instance_fields[id(_watched_field)].callbacks.append(getattr(self, _name))
+
+    self.__dict__["evaluate_always"] = False
+    self.__dict__["evaluation_pending"] = True
+
+    scripts.append(weakref.ref(self))
+
+  ## Returns a proxy to call methods of a base class, used as self.super(CLASS).__init__().
+  # @param CLASS The class whose base class methods are to be called.
+  def super(self, CLASS):
+    return builtins.super(CLASS, self)
+
+  ## Enables or disables the evaluation in every frame.
+  # @param FLAG Boolean saying if evaluate is to be called every frame.
+  def always_evaluate(self, FLAG):
+    self.evaluate_always = FLAG
+
+  ## Called when one of this script's fields was written. Schedules an evaluation.
+  # @param FIELD The field which was written.
+  def field_touched(self, FIELD):
+    self.evaluation_pending = True
+
+  ## Evaluated every frame if always_evaluate is set, otherwise after input fields were written.
+  def evaluate(self):
+    pass
+
+
+## Node calling a callback once per frame while active.
+class Update(Node):
+
+  ## Custom constructor.
+  # @param FIELDS Initial field values as keyword arguments, usually Callback and Active.
+  def __init__(self, **FIELDS):
+    Node.__init__(self, **FIELDS)
+    update_nodes.append(weakref.ref(self))
+
+
+## Namespace of the script node types, accessed as avango.script.nodes.
+class nodes:
+  Update = Update
+
+
+## Returns the living objects of a list of weak references and removes the dead ones.
+# @param REFERENCES List of weak references.
+def get_living_objects(REFERENCES):
+
+  _objects = [_reference() for _reference in REFERENCES]
+  REFERENCES[:] = [_reference for _reference, _object in zip(REFERENCES, _objects) if _object is not None]
+  return [_object for _object in _objects if _object is not None]
+
+
+## Performs one frame of the evaluation loop.
+def evaluate_frame():
+
+  for _update_node in get_living_objects(update_nodes):
+    if _update_node.Active.value:
+      _update_node.Callback.value()
+
+  for _script in get_living_objects(scripts):
+    if _script.evaluate_always or _script.evaluation_pending:
+      _script.evaluate()
+
+      # writes to the script's own fields during evaluate do not schedule another evaluation
+      _script.evaluation_pending = False
@@ -0,0 +1,13 @@
+#!/usr/bin/python
+
+## @file
+# Stand-in for the GuaVE interactive shell, used by the headless benchmarks.
+
+## Shell which does nothing, as the benchmarks run without a console.
+class GuaVE(object):
+
+  def start(self, LOCALS, GLOBALS, *ARGS):
+    pass
+
+  def list_variables(self):
+    pass
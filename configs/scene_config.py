@@ -34,3 +34,36 @@ scenes = ["SceneMedievalTown"]
 # if true, scenes will be switchable using the number buttons
 enable_key_bindings = False
 
+# scenes are created on their first activation, least recently used scenes are
+# unloaded when the size of the data files of all loaded scenes exceeds this budget (in MB),
+# counting the point data files (.lod) of plod scenes;
+# unloading removes the scene's nodes on server and clients, the geometries loaded by
+# guacamole stay cached and are reused when the scene is loaded again
+scene_memory_budget = 8192
+
+# if true, the evaluate and frame_callback hooks of the server are timed, see FrameProfiler.py
+enable_frame_profiler = False
+
+# if true, the field updates distributed to the clients are counted per node, see NetworkMeter.py
+enable_network_meter = False
+
+# if true, transformations written via NetworkMeter.set_transform are skipped when the matrix is unchanged
+coalesce_distributed_writes = True
+
+# distance in meters of the ground heights cached for ground following at scale 1.0, 0.0 disables the cache
+terrain_height_cache_cell_size = 0.25
+
+# duration in seconds of one navigation step, navigation inputs are integrated with this fixed step independent of the frame rate
+navigation_step_time = 1.0 / 60.0
+
+# maximum number of navigation steps caught up per frame, the remaining time is dropped on low frame rates
+navigation_max_steps = 10
+
+# if set, the device stations read by the server are recorded to this file, see TrackingRecorder.py
+tracking_record_file = None
+
+# if set, the device stations are replayed from this file instead of being read from the daemon
+tracking_replay_file = None
+
+# speed factor of the tracking replay, 0.0 replays one recorded frame per rendered frame
+tracking_replay_speed = 1.0
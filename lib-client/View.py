@@ -16,6 +16,7 @@ from ClientPortal import *
 from ConsoleIO import *
 
 # import python libraries
+import json
 import time
 
 
@@ -24,7 +25,7 @@ import time
 class View(avango.script.Script):
 
   ## @var sf_pipeline_string
-  # String field containing the concatenated pipeline values.
+  # String field containing the versioned pipeline values as JSON.
   sf_pipeline_string = avango.SFString()
 
   ## Default constructor.
@@ -35,6 +36,14 @@ class View(avango.script.Script):
     # A list of all PortalPreView instances for this view.
     self.portal_pre_views = []
 
+    ## @var pipeline_values
+    # Dictionary of the pipeline values currently applied to the pipeline.
+    self.pipeline_values = {}
+
+    ## @var pipeline_values_version
+    # Version number of the lastly applied pipeline values.
+    self.pipeline_values_version = None
+
   ## Custom constructor.
   # @param SCENEGRAPH Reference to the scenegraph to be displayed.
   # @param VIEWER Reference to the viewer to which the created pipeline will be appended to.
@@ -210,68 +219,90 @@ class View(avango.script.Script):
   ## Called whenever sf_pipeline_string changes.
   @field_has_changed(sf_pipeline_string)
   def sf_pipeline_string_changed(self):
-      
-    _splitted_string = self.sf_pipeline_string.value.split("#")
 
-    print_message("w" + str(self.workspace_id) + "_dg" + str(self.display_group_id) + "_u" + str(self.user_id) + ": Set pipeline values to " + str(_splitted_string))
+    try:
+      _payload = json.loads(self.sf_pipeline_string.value)
+    except ValueError:
+      print_warning("w" + str(self.workspace_id) + "_dg" + str(self.display_group_id) + "_u" + str(self.user_id) + ": Invalid pipeline values " + self.sf_pipeline_string.value)
+      return
+
+    if _payload["version"] == self.pipeline_values_version:
+      return
+
+    # only apply values differing from the current ones
+    _changed_values = {}
+
+    for _key, _value in _payload["values"].items():
+      if self.pipeline_values.get(_key) != _value:
+        _changed_values[_key] = _value
+
+    self.pipeline_values_version = _payload["version"]
+    self.pipeline_values.update(_changed_values)
+
+    print_message("w" + str(self.workspace_id) + "_dg" + str(self.display_group_id) + "_u" + str(self.user_id) + ": Set pipeline values to " + str(_changed_values))
 
     # Note: Calling avango.gua.create_texture during runtime causes the application
     # to crash. All textures have to be preloaded, for example in ClientPipelineValues.py
-    # avango.gua.create_texture(_splitted_string[0])
+    # avango.gua.create_texture(_changed_values["background_texture"])
     
-    if self.display_render_mask == "!main_scene":
-      self.pipeline.BackgroundMode.value = avango.gua.BackgroundMode.COLOR
-      self.pipeline.BackgroundColor.value = avango.gua.Color(0.2, 0.45, 0.6)
-    else:
-      self.pipeline.BackgroundMode.value = avango.gua.BackgroundMode.SKYMAP_TEXTURE
-      self.pipeline.BackgroundTexture.value = _splitted_string[0]
-      self.pipeline.FogTexture.value = _splitted_string[0]
+    if "background_texture" in _changed_values:
 
-    if _splitted_string[1] == "True":
-      self.pipeline.EnableBloom.value = True
-    else:
-      self.pipeline.EnableBloom.value = False
+      if self.display_render_mask == "!main_scene":
+        self.pipeline.BackgroundMode.value = avango.gua.BackgroundMode.COLOR
+        self.pipeline.BackgroundColor.value = avango.gua.Color(0.2, 0.45, 0.6)
+      else:
+        self.pipeline.BackgroundMode.value = avango.gua.BackgroundMode.SKYMAP_TEXTURE
+        self.pipeline.BackgroundTexture.value = _changed_values["background_texture"]
+        self.pipeline.FogTexture.value = _changed_values["background_texture"]
 
-    self.pipeline.BloomIntensity.value = float(_splitted_string[2])
-    self.pipeline.BloomThreshold.value = float(_splitted_string[3])
-    self.pipeline.BloomRadius.value = float(_splitted_string[4])
+    if "enable_bloom" in _changed_values:
+      self.pipeline.EnableBloom.value = _changed_values["enable_bloom"]
 
-    if _splitted_string[5] == "True":
-      self.pipeline.EnableSsao.value = True
-    else:
-      self.pipeline.EnableSsao.value = False
+    if "bloom_intensity" in _changed_values:
+      self.pipeline.BloomIntensity.value = _changed_values["bloom_intensity"]
 
-    self.pipeline.SsaoRadius.value = float(_splitted_string[6])
-    self.pipeline.SsaoIntensity.value = float(_splitted_string[7])
+    if "bloom_threshold" in _changed_values:
+      self.pipeline.BloomThreshold.value = _changed_values["bloom_threshold"]
 
-    if _splitted_string[8] == "True":
-      self.pipeline.EnableBackfaceCulling.value = True
-    else:
-      self.pipeline.EnableBackfaceCulling.value = False
+    if "bloom_radius" in _changed_values:
+      self.pipeline.BloomRadius.value = _changed_values["bloom_radius"]
 
-    if _splitted_string[9] == "True":
-      self.pipeline.EnableFrustumCulling.value = True
-    else:
-      self.pipeline.EnableFrustumCulling.value = False
+    if "enable_ssao" in _changed_values:
+      self.pipeline.EnableSsao.value = _changed_values["enable_ssao"]
 
-    if _splitted_string[10] == "True":
-      self.pipeline.EnableFXAA.value = True
-    else:
-      self.pipeline.EnableFXAA.value = False
+    if "ssao_radius" in _changed_values:
+      self.pipeline.SsaoRadius.value = _changed_values["ssao_radius"]
 
-    _ambient_color_values = _splitted_string[11].split(",")
-    _ambient_color = avango.gua.Color(float(_ambient_color_values[0]), float(_ambient_color_values[1]), float(_ambient_color_values[2]))
-    self.pipeline.AmbientColor.value = _ambient_color
+    if "ssao_intensity" in _changed_values:
+      self.pipeline.SsaoIntensity.value = _changed_values["ssao_intensity"]
 
-    if _splitted_string[12] == "True":
-      self.pipeline.EnableFog.value = True
-    else:
-      self.pipeline.EnableFog.value = False
+    if "enable_backface_culling" in _changed_values:
+      self.pipeline.EnableBackfaceCulling.value = _changed_values["enable_backface_culling"]
+
+    if "enable_frustum_culling" in _changed_values:
+      self.pipeline.EnableFrustumCulling.value = _changed_values["enable_frustum_culling"]
+
+    if "enable_fxaa" in _changed_values:
+      self.pipeline.EnableFXAA.value = _changed_values["enable_fxaa"]
+
+    if "ambient_color" in _changed_values:
+      _ambient_color_values = _changed_values["ambient_color"]
+      self.pipeline.AmbientColor.value = avango.gua.Color(_ambient_color_values[0], _ambient_color_values[1], _ambient_color_values[2])
+
+    if "enable_fog" in _changed_values:
+      self.pipeline.EnableFog.value = _changed_values["enable_fog"]
+
+    if "fog_start" in _changed_values:
+      self.pipeline.FogStart.value = _changed_values["fog_start"]
+
+    if "fog_end" in _changed_values:
+      self.pipeline.FogEnd.value = _changed_values["fog_end"]
+
+    if "near_clip" in _changed_values:
+      self.pipeline.NearClip.value = _changed_values["near_clip"]
 
-    self.pipeline.FogStart.value = float(_splitted_string[13])
-    self.pipeline.FogEnd.value = float(_splitted_string[14])
-    self.pipeline.NearClip.value = float(_splitted_string[15])
-    self.pipeline.FarClip.value = float(_splitted_string[16])
+    if "far_clip" in _changed_values:
+      self.pipeline.FarClip.value = _changed_values["far_clip"]
   
     #avango.gua.reload_materials()
   
@@ -12,6 +12,7 @@ from   examples_common.GuaVE import GuaVE
 
 # import framework libraries
 from   ConsoleIO import *
+from   TrackingRecorder import DeviceSensorFactory
 from   scene_config import scenegraphs
 from   Video3D import *
 
@@ -45,6 +46,14 @@ class ApplicationManager(avango.script.Script):
   # List of all Workspace instances active in the setup.
   all_workspaces = []
 
+  ## @var frame_profiler
+  # FrameProfiler instance timing the evaluate and frame_callback hooks, None if profiling is disabled.
+  frame_profiler = None
+
+  ## @var network_meter
+  # NetworkMeter instance counting the distributed field updates, None if metering is disabled.
+  network_meter = None
+
   ## @var sf_key1
   # Boolean field representing the key for action 1.
   sf_key1 = avango.SFBool()
@@ -154,6 +163,11 @@ class ApplicationManager(avango.script.Script):
     # List of VirtualDisplayGroup instances that have the transitable flag set true.
     self.transit_display_groups = []
 
+    ## @var lf_nav_device_positions
+    # Dictionary mapping navigation indices to the world position of the navigation device in the last frame.
+    # Missing for navigations that were teleported in the last frame.
+    self.lf_nav_device_positions = {}
+
     ApplicationManager.all_virtual_display_groups = virtual_display_groups
 
 
@@ -335,12 +349,8 @@ class ApplicationManager(avango.script.Script):
         for _nav in _display_group.navigations:
           _nav.handle_correct_visibility_groups()
 
-        # trigger correct groups for all users at display
-        for _user in _workspace.users:
-          _user.handle_correct_visibility_groups_for(_display_group)
-
-          for _portal_display_group in ApplicationManager.all_virtual_display_groups:
-            _user.handle_correct_visibility_groups_for(_portal_display_group)
+    # trigger correct groups for all users at all displays
+    self.init_avatar_group_names()
 
     # connect proper navigations
     for _user_representation in ApplicationManager.all_user_representations:
@@ -358,8 +368,7 @@ class ApplicationManager(avango.script.Script):
 
     ## Keyboard Sensor Setup ##
 
-    self.keyboard_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.keyboard_sensor.Station.value = "device-keyboard0"
+    self.keyboard_sensor = DeviceSensorFactory.create("device-keyboard0")
 
     self.sf_key1.connect_from(self.keyboard_sensor.Button19) # key F1
     self.sf_key2.connect_from(self.keyboard_sensor.Button20) # key F2
@@ -590,7 +599,7 @@ class ApplicationManager(avango.script.Script):
 
     ## handle portal transitions ##
 
-    for _nav in self.workspace_navigations:
+    for _nav_index, _nav in enumerate(self.workspace_navigations):
 
       # if navigation does not allow portal transit, go to next loop iteration
       if _nav.reacts_on_portal_transit == False:
@@ -612,6 +621,19 @@ class ApplicationManager(avango.script.Script):
       _nav_device_pos2 = _nav_device_mat * avango.gua.Vec3(0.0,0.0,1.0)
       _nav_device_pos2 = avango.gua.Vec3(_nav_device_pos2.x, _nav_device_pos2.y, _nav_device_pos2.z)
 
+      # distance between the two test points, bounds the depth at which a transit can be detected
+      _test_length = (_nav_device_pos2 - _nav_device_pos).length()
+
+      # a device that crossed a portal plane since the last frame can be up to this distance behind it
+      _lf_nav_device_pos = self.lf_nav_device_positions.get(_nav_index, None)
+
+      if _lf_nav_device_pos != None:
+        _moved_distance = (_nav_device_pos - _lf_nav_device_pos).length()
+      else:
+        _moved_distance = 0.0
+
+      _transit_done = False
+
       for _tuple in self.transit_display_groups:
 
         _portal_display_group = _tuple[0]
@@ -621,30 +643,44 @@ class ApplicationManager(avango.script.Script):
         if _portal_display_group.viewing_mode != "3D":
           continue
 
+        _active_navigation = _portal_display_group.navigations[_first_virtual_user_repr.connected_navigation_id]
+
         # check for transit in every single virtual display
-        for _display in _portal_display_group.displays:
+        for _index, _portal in enumerate(_portal_display_group.get_transit_portals()):
 
-          _index = _portal_display_group.displays.index(_display)
+          # early reject if the device is outside the portal's bounding sphere, widened by the reachable depth
+          _center_offset = _nav_device_pos - _portal[1]
+          _radius_length = _test_length * _portal[3] + _moved_distance
 
-          _active_navigation = _portal_display_group.navigations[_first_virtual_user_repr.connected_navigation_id]
-          _mat = avango.gua.make_inverse_mat(_portal_display_group.entry_node.Transform.value * _portal_display_group.screen_nodes[_index].Transform.value)
+          if _center_offset.length() ** 2 > _portal[2] ** 2 + _radius_length ** 2:
+            continue
+
+          _display = _portal_display_group.displays[_index]
+          _mat = _portal[0]
 
-          _nav_device_portal_space_mat = _mat * _nav_device_mat
           _nav_device_portal_space_pos = _mat * _nav_device_pos
           _nav_device_portal_space_pos2 = _mat * _nav_device_pos2
           _nav_device_portal_space_pos = avango.gua.Vec3(_nav_device_portal_space_pos.x, _nav_device_portal_space_pos.y, _nav_device_portal_space_pos.z)
 
           # do a teleportation if navigation enters portal
+          # (the device is at most the test length behind the portal plane or crossed it since the last frame,
+          # facing into the portal in both cases)
           if  _nav_device_portal_space_pos.x > -_display.size[0]/2     and \
               _nav_device_portal_space_pos.x <  _display.size[0]/2     and \
               _nav_device_portal_space_pos.y > -_display.size[1]/2     and \
               _nav_device_portal_space_pos.y <  _display.size[1]/2     and \
               _nav_device_portal_space_pos.z < 0.0                    and \
-              _nav_device_portal_space_pos2.z >= 0.0:
+              (_nav_device_portal_space_pos2.z >= 0.0 or \
+               (_nav_device_portal_space_pos2.z > _nav_device_portal_space_pos.z and \
+                _lf_nav_device_pos != None and \
+                (_mat * _lf_nav_device_pos).z >= 0.0)):
+
+            _screen_mat = _portal_display_group.screen_nodes[_index].Transform.value
+            _nav_device_portal_space_mat = _mat * _nav_device_mat
 
-            _nav.inputmapping.set_abs_mat(avango.gua.make_trans_mat(_portal_display_group.screen_nodes[_index].Transform.value.get_translate()) * \
+            _nav.inputmapping.set_abs_mat(avango.gua.make_trans_mat(_screen_mat.get_translate()) * \
                                           _active_navigation.sf_abs_mat.value * \
-                                          avango.gua.make_rot_mat(_portal_display_group.screen_nodes[_index].Transform.value.get_rotate()) * \
+                                          avango.gua.make_rot_mat(_screen_mat.get_rotate()) * \
                                           avango.gua.make_scale_mat(_active_navigation.sf_scale.value) * \
                                           avango.gua.make_trans_mat(_nav_device_portal_space_pos) * \
                                           avango.gua.make_rot_mat(_nav_device_portal_space_mat.get_rotate_scale_corrected()) * \
@@ -657,6 +693,14 @@ class ApplicationManager(avango.script.Script):
             _nav.inputmapping.scale_stop_time = None
             _nav.inputmapping.set_scale(_active_navigation.sf_scale.value, False)
 
+            _transit_done = True
+
+      # the position from before a teleportation is meaningless at the new location
+      if _transit_done:
+        self.lf_nav_device_positions.pop(_nav_index, None)
+      else:
+        self.lf_nav_device_positions[_nav_index] = _nav_device_pos
+
 
     ## handle requestable navigations ##
 
@@ -705,16 +749,18 @@ class ApplicationManager(avango.script.Script):
 
 
   ## Initializes the GroupNames field of all UserRepresentation's avatars.
-  # Users cannot see the avatars in own display group, but the ones in others.
+  # The group names are resolved from the visibility table of each user, once per display group and user.
   def init_avatar_group_names(self):
 
-    for _user_repr_1 in ApplicationManager.all_user_representations:
+    for _workspace in self.workspaces:
 
-      for _user_repr_2 in ApplicationManager.all_user_representations:
+      for _user in _workspace.users:
 
-        if _user_repr_2.DISPLAY_GROUP != _user_repr_1.DISPLAY_GROUP:
+        for _display_group in _workspace.display_groups:
+          _user.handle_correct_visibility_groups_for(_display_group)
 
-          _user_repr_1.append_to_avatar_group_names(_user_repr_2.view_transform_node.Name.value)
+        for _portal_display_group in ApplicationManager.all_virtual_display_groups:
+          _user.handle_correct_visibility_groups_for(_portal_display_group)
   
 
   ## Switches the navigation for a user at a display group. 
@@ -736,4 +782,53 @@ class ApplicationManager(avango.script.Script):
 
   ## Lists the variables of the shell.
   def list_variables(self):
-    self.shell.list_variables()
\ No newline at end of file
+    self.shell.list_variables()
+
+  ## Prints the rolling frame time statistics of the evaluate and frame_callback hooks.
+  # @param INSTANCES Boolean saying if the per-instance statistics are to be printed as well.
+  def print_frame_profile(self, INSTANCES = False):
+
+    if ApplicationManager.frame_profiler == None:
+      print_warning("Frame profiler is disabled, set enable_frame_profiler in scene_config.py.")
+      return
+
+    ApplicationManager.frame_profiler.print_statistics(INSTANCES)
+
+  ## Writes the rolling frame time statistics of the evaluate and frame_callback hooks to a CSV file.
+  # @param FILENAME Path of the CSV file to be written.
+  def dump_frame_profile(self, FILENAME = "frame_profile.csv"):
+
+    if ApplicationManager.frame_profiler == None:
+      print_warning("Frame profiler is disabled, set enable_frame_profiler in scene_config.py.")
+      return
+
+    ApplicationManager.frame_profiler.dump_csv(FILENAME)
+
+  ## Prints the distributed field updates per frame and the nodes causing the most traffic.
+  def print_network_profile(self):
+
+    if ApplicationManager.network_meter == None:
+      print_warning("Network meter is disabled, set enable_network_meter in scene_config.py.")
+      return
+
+    ApplicationManager.network_meter.print_statistics()
+
+  ## Writes the distributed field updates per node to a CSV file.
+  # @param FILENAME Path of the CSV file to be written.
+  def dump_network_profile(self, FILENAME = "network_profile.csv"):
+
+    if ApplicationManager.network_meter == None:
+      print_warning("Network meter is disabled, set enable_network_meter in scene_config.py.")
+      return
+
+    ApplicationManager.network_meter.dump_csv(FILENAME)
+
+  ## Stops the recording of the device stations and closes the tracking log.
+  def stop_tracking_recording(self):
+
+    if DeviceSensorFactory.recorder == None:
+      print_warning("Tracking recording is disabled, set tracking_record_file in scene_config.py.")
+      return
+
+    DeviceSensorFactory.recorder.close()
+    DeviceSensorFactory.recorder = None
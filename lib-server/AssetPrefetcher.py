@@ -0,0 +1,176 @@
+#!/usr/bin/python
+
+## @file
+# Contains classes AssetRequest and AssetPrefetcher.
+
+# import framework libraries
+from ConsoleIO import *
+
+# import python libraries
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
+
+## Description of a geometry to be loaded from file for a SceneObject.
+class AssetRequest:
+
+  ## Custom constructor.
+  # @param LOADER_TYPE Type of the loader to be used, either "trimesh" or "plod".
+  # @param NAME The name of the new node.
+  # @param FILENAME Path to the file to be loaded.
+  # @param FLAG_NAMES Tuple of loader flag names to be combined.
+  # @param MATRIX The transformation matrix of the new node.
+  # @param MATERIAL Material string to be used for the geometry, None for plod geometries.
+  # @param GROUNDFOLLOWING_PICK_FLAG Boolean indicating if the new geometry should be pickable for GroundFollowing purposes.
+  # @param MANIPULATION_PICK_FLAG Boolean indicating if the new geometry should be pickable for manipulation purposes.
+  # @param PARENT_NODE Scenegraph node or InteractiveObject to append the geometry to.
+  # @param RENDER_GROUP The render group to be associated with the new geometry.
+  def __init__(self, LOADER_TYPE, NAME, FILENAME, FLAG_NAMES, MATRIX, MATERIAL, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, PARENT_NODE, RENDER_GROUP):
+
+    ## @var loader_type
+    # Type of the loader to be used, either "trimesh" or "plod".
+    self.loader_type = LOADER_TYPE
+
+    ## @var name
+    # The name of the new node.
+    self.name = NAME
+
+    ## @var filename
+    # Path to the file to be loaded.
+    self.filename = FILENAME
+
+    ## @var flag_names
+    # Tuple of loader flag names to be combined.
+    self.flag_names = FLAG_NAMES
+
+    ## @var matrix
+    # The transformation matrix of the new node.
+    self.matrix = MATRIX
+
+    ## @var material
+    # Material string to be used for the geometry, None for plod geometries.
+    self.material = MATERIAL
+
+    ## @var gf_pick_flag
+    # Boolean indicating if the new geometry should be pickable for GroundFollowing purposes.
+    self.gf_pick_flag = GROUNDFOLLOWING_PICK_FLAG
+
+    ## @var man_pick_flag
+    # Boolean indicating if the new geometry should be pickable for manipulation purposes.
+    self.man_pick_flag = MANIPULATION_PICK_FLAG
+
+    ## @var parent_node
+    # Scenegraph node or InteractiveObject to append the geometry to.
+    self.parent_node = PARENT_NODE
+
+    ## @var render_group
+    # The render group to be associated with the new geometry.
+    self.render_group = RENDER_GROUP
+
+
+## Reads the data files of asset requests in a thread pool before the (not thread-safe)
+# guacamole loaders are called on the main thread. This way the disk accesses of all files
+# overlap and the loaders read from the operating system's file cache. For plod requests,
+# the point data files (.lod) next to the index files (.kdn) are read as well.
+#
+# This is no loader and no geometry cache: the files are parsed by guacamole's loaders, which
+# neither expose the parsed geometries nor accept them from Python, so nothing parsed can be
+# kept, neither within the process nor across server restarts. Files are only prefetched when
+# a scene is loaded, which is on its first activation since scenes are loaded lazily.
+class AssetPrefetcher:
+
+  ## Custom constructor.
+  # @param NUMBER_OF_THREADS Number of worker threads used for reading files.
+  def __init__(self, NUMBER_OF_THREADS = 8):
+
+    ## @var number_of_threads
+    # Number of worker threads used for reading files.
+    self.number_of_threads = NUMBER_OF_THREADS
+
+    ## @var read_files
+    # Dictionary mapping (path, modification time) keys of the files read so far in this process to their number of bytes.
+    self.read_files = {}
+
+  ## Returns the paths of the files holding the data of an asset request which exist on disk.
+  # @param REQUEST The AssetRequest instance to return the files for.
+  @staticmethod
+  def get_data_files(REQUEST):
+
+    _filenames = [REQUEST.filename]
+
+    if REQUEST.loader_type == "plod":
+      _filenames.append(os.path.splitext(REQUEST.filename)[0] + ".lod")
+
+    return [_filename for _filename in _filenames if os.path.isfile(_filename)]
+
+  ## Returns the key of a file in read_files or None if the file does not exist.
+  # @param FILENAME Path to the file.
+  def get_file_key(self, FILENAME):
+
+    try:
+      _mtime = os.path.getmtime(FILENAME)
+    except OSError:
+      return None
+
+    return (FILENAME, _mtime)
+
+  ## Returns the size of the data files of an asset request in bytes, e.g. index and point data of plod requests.
+  # @param REQUEST The AssetRequest instance to return the size for.
+  @staticmethod
+  def get_data_size(REQUEST):
+
+    return sum([os.path.getsize(_filename) for _filename in AssetPrefetcher.get_data_files(REQUEST)])
+
+  ## Reads a file in chunks so that it resides in the operating system's file cache afterwards.
+  # @param FILENAME Path to the file to be read.
+  def read_file(self, FILENAME):
+
+    _number_of_bytes = 0
+
+    with open(FILENAME, "rb") as _file:
+
+      _chunk = _file.read(1 << 20)
+
+      while _chunk:
+        _number_of_bytes += len(_chunk)
+        _chunk = _file.read(1 << 20)
+
+    return _number_of_bytes
+
+  ## Reads the data files of a list of asset requests in parallel unless they were read before.
+  # @param REQUESTS List of AssetRequest instances whose files are to be read.
+  def prefetch(self, REQUESTS):
+
+    _keys_to_read = []
+
+    for _request in REQUESTS:
+
+      for _filename in AssetPrefetcher.get_data_files(_request):
+
+        _key = self.get_file_key(_filename)
+
+        if _key != None and _key not in self.read_files and _key not in _keys_to_read:
+          _keys_to_read.append(_key)
+
+    if len(_keys_to_read) == 0:
+      return
+
+    _start_time = time.time()
+
+    _executor = ThreadPoolExecutor(max_workers = self.number_of_threads)
+    _futures = [(_key, _executor.submit(self.read_file, _key[0])) for _key in _keys_to_read]
+
+    _number_of_bytes = 0
+
+    for _key, _future in _futures:
+
+      try:
+        self.read_files[_key] = _future.result()
+        _number_of_bytes += self.read_files[_key]
+      except (IOError, OSError) as e:
+        print_warning("Could not prefetch " + _key[0] + " (" + str(e) + ")")
+
+    _executor.shutdown()
+
+    print_message("Prefetched " + str(len(_keys_to_read)) + " asset files (" + str(_number_of_bytes / (1 << 20)) + " MB) in " + str(round(time.time() - _start_time, 3)) + " s.")
@@ -10,6 +10,7 @@ import avango.script
 
 # import framework libraries
 from ApplicationManager import *
+from NetworkMeter import NetworkMeter
 import Utilities
 
 # import python libraries
@@ -56,6 +57,10 @@ class Avatar:
     # Geometry nodes representing all the screens at the DisplayGroup the UserRepresentation belongs to.
     self.screen_visualizations = []
 
+    ## @var group_names
+    # List of group names lastly applied to all avatar parts, None if not set yet.
+    self.group_names = None
+
     ## @var frame_trigger
     # Triggers framewise evaluation of frame_callback method.
     self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
@@ -68,11 +73,20 @@ class Avatar:
     self.USER_REPRESENTATION.view_transform_node.Children.value.append(_screen_visualization)
     self.screen_visualizations.append(_screen_visualization)
 
+    if self.group_names != None:
+      _screen_visualization.GroupNames.value = list(self.group_names)
+
 
   ## Sets the GroupNames field on all avatar parts to a list of strings.
   # @param LIST_OF_STRINGS A list of group names to be set for the avatar parts.
   def set_group_names(self, LIST_OF_STRINGS):
 
+    # avoid field writes (and their distribution) if nothing has changed
+    if LIST_OF_STRINGS == self.group_names:
+      return
+
+    self.group_names = list(LIST_OF_STRINGS)
+
     self.head_geometry.GroupNames.value = LIST_OF_STRINGS
     self.body_geometry.GroupNames.value = LIST_OF_STRINGS
 
@@ -84,6 +98,11 @@ class Avatar:
   # @param STRING The string to be appended to the GroupNames field.
   def append_to_group_names(self, STRING):
 
+    if self.group_names == None:
+      self.group_names = list(self.head_geometry.GroupNames.value)
+
+    self.group_names.append(STRING)
+
     self.head_geometry.GroupNames.value.append(STRING)
     self.body_geometry.GroupNames.value.append(STRING)
 
@@ -108,7 +127,8 @@ class Avatar:
     _head_pos = self.USER_REPRESENTATION.head.Transform.value.get_translate()
     _forward_yaw = Utilities.get_yaw(self.USER_REPRESENTATION.head.Transform.value)
 
-    self.body_geometry.Transform.value = avango.gua.make_inverse_mat(avango.gua.make_rot_mat(self.USER_REPRESENTATION.head.Transform.value.get_rotate_scale_corrected())) * \
-                                         avango.gua.make_trans_mat(0.0, -_head_pos.y / 2, 0.0) * \
-                                         avango.gua.make_rot_mat(math.degrees(_forward_yaw) - 90, 0, 1, 0) * \
-                                         avango.gua.make_scale_mat(0.45, _head_pos.y / 2, 0.45)
\ No newline at end of file
+    NetworkMeter.set_transform(self.body_geometry
+                             , avango.gua.make_inverse_mat(avango.gua.make_rot_mat(self.USER_REPRESENTATION.head.Transform.value.get_rotate_scale_corrected())) * \
+                               avango.gua.make_trans_mat(0.0, -_head_pos.y / 2, 0.0) * \
+                               avango.gua.make_rot_mat(math.degrees(_forward_yaw) - 90, 0, 1, 0) * \
+                               avango.gua.make_scale_mat(0.45, _head_pos.y / 2, 0.45))
\ No newline at end of file
@@ -0,0 +1,67 @@
+#!/usr/bin/python
+
+## @file
+# Contains class ChangeTracker.
+
+# import framework libraries
+from MatrixObserver import MatrixObserver
+import Utilities
+
+## Remembers the inputs of a computation in order to skip it when none of them has changed.
+#
+# Matrix fields are watched by MatrixObservers. Only when a field was touched, its value is
+# compared to the last one, as tracking fields are rewritten every frame even if the target
+# does not move. Other inputs are compared by value directly.
+class ChangeTracker:
+
+  ## Default constructor.
+  def __init__(self):
+
+    ## @var observers
+    # Dictionary mapping input names to MatrixObserver instances.
+    self.observers = {}
+
+    ## @var values
+    # Dictionary mapping input names to their last values or matrix keys.
+    self.values = {}
+
+  ## Checks if a matrix field has changed its value since the last check.
+  # @param NAME Name of the input, unique within this ChangeTracker.
+  # @param SF_MATRIX The matrix field to be checked.
+  def has_matrix_changed(self, NAME, SF_MATRIX):
+
+    if NAME not in self.observers:
+      self.observers[NAME] = MatrixObserver()
+      self.observers[NAME].my_constructor(SF_MATRIX)
+
+    if not self.observers[NAME].consume_change() and NAME in self.values:
+      return False
+
+    return self.has_value_changed(NAME, Utilities.get_matrix_key(SF_MATRIX.value))
+
+  ## Checks if a value has changed since the last check.
+  # @param NAME Name of the input, unique within this ChangeTracker.
+  # @param VALUE The current value of the input.
+  def has_value_changed(self, NAME, VALUE):
+
+    if NAME in self.values and self.values[NAME] == VALUE:
+      return False
+
+    self.values[NAME] = VALUE
+    return True
+
+  ## Forgets all last values, so that the next checks report changes.
+  # To be called when the output was overwritten by other means.
+  def invalidate(self):
+
+    self.values = {}
+
+  ## Forgets all last values and matrix observers.
+  # To be called when the fields to be watched have been exchanged.
+  def reset(self):
+
+    for _observer in self.observers.values():
+      _observer.sf_mat.disconnect()
+
+    self.observers = {}
+    self.values = {}
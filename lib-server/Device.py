@@ -11,10 +11,12 @@ import avango.daemon
 
 # import framework libraries
 from TrackingReader import *
+from TrackingRecorder import DeviceSensorFactory
 from ConsoleIO import *
 
 # import standard python modules
 import types
+import ast
 
 ## Base class for the representation of an input device supplying multiple degrees of freedom.
 #
@@ -52,6 +54,23 @@ class MultiDofDevice(avango.script.Script):
     ## @var input_bindings
     # List of bindings between input values / button values and events. Code form.
     self.input_bindings = []
+
+    ## @var compiled_input_bindings
+    # List of (instruction, code object) tuples for the input bindings not handled by filtered_input_bindings.
+    self.compiled_input_bindings = []
+
+    ## @var filtered_input_bindings
+    # List of (dof id, instruction, value code object, offset, positive threshold, positive range, negative threshold, negative range)
+    # tuples for all set_and_filter_dof bindings. The channel parameters are precomputed once in add_input_binding.
+    self.filtered_input_bindings = []
+
+    ## @var binding_namespace
+    # Local namespace in which the compiled input bindings are evaluated.
+    self.binding_namespace = {"self" : self}
+
+    ## @var dofs
+    # List of degrees of freedom to process input bindings. Reused every frame.
+    self.dofs = [0.0,0.0,0.0,0.0,0.0,0.0,0.0]
     
     # factors for amplifying
     ## @var translation_factor
@@ -138,29 +157,110 @@ class MultiDofDevice(avango.script.Script):
     INPUT_CHANNEL_PARAMETERS[3] = NEG_THRESHOLD
     INPUT_CHANNEL_PARAMETERS[4] = POS_THRESHOLD
 
+  ## Filters a list of input values at once using the precomputed parameters of filtered_input_bindings.
+  # Produces the same results as filter_channel applied to each value.
+  # @param VALUES List of raw input values, one for each entry in filtered_input_bindings.
+  def filter_channels(self, VALUES):
+
+    _filtered_values = []
+
+    for _value, _binding in zip(VALUES, self.filtered_input_bindings):
+
+      _value = _value - _binding[3]
+
+      if _value > 0:
+
+        if _value > _binding[4]: # above positive threshold
+          _value = min( (_value - _binding[4]) / _binding[5], 1.0) # normalize interval
+        else: # beneath positive threshold
+          _value = 0
+
+      elif _value < 0:
+
+        if _value < _binding[6]:
+          _value = max( (_value - _binding[6]) / _binding[7], -1.0)
+        else: # above negative threshold
+          _value = 0
+
+      _filtered_values.append(_value)
+
+    return _filtered_values
+
   ## Adds an input binding to the list of bindings for this device.
+  # The binding is compiled once here. Calls to set_and_filter_dof with constant channel parameters
+  # are split up so that their filtering can be done for all channels in one pass.
   # @param INSTRUCTION The binding in code form to be set.
   def add_input_binding(self, INSTRUCTION):
   
     self.input_bindings.append(INSTRUCTION)
 
+    try:
+      _expression = ast.parse(INSTRUCTION, mode = "eval").body
+    except SyntaxError as e:
+      print_error("Error parsing input binding " + INSTRUCTION + " (" + str(e) + ")", False)
+      return
+
+    # check for the form self.set_and_filter_dof(ID, VALUE, OFFSET, MIN, MAX, NEG_THRESHOLD, POS_THRESHOLD)
+    if isinstance(_expression, ast.Call) and \
+       isinstance(_expression.func, ast.Attribute) and \
+       _expression.func.attr == "set_and_filter_dof" and \
+       isinstance(_expression.func.value, ast.Name) and \
+       _expression.func.value.id == "self" and \
+       len(_expression.args) == 7 and \
+       len(_expression.keywords) == 0:
+
+      try:
+        _id = ast.literal_eval(_expression.args[0])
+        _offset, _min, _max, _neg_threshold, _pos_threshold = [ast.literal_eval(_arg) for _arg in _expression.args[2:]]
+        _constant_parameters = True
+      except ValueError:
+        _constant_parameters = False
+
+      if _constant_parameters:
+        _value_code = compile(ast.Expression(_expression.args[1]), INSTRUCTION, "eval")
+
+        _min = _min - _offset
+        _max = _max - _offset
+        _pos = _max * _pos_threshold * 0.01
+        _neg = _min * _neg_threshold * 0.01
+
+        self.filtered_input_bindings.append( (_id, INSTRUCTION, _value_code, _offset, _pos, _max - _pos, _neg, abs(_min - _neg)) )
+        return
+
+    self.compiled_input_bindings.append( (INSTRUCTION, compile(INSTRUCTION, INSTRUCTION, "eval")) )
+
 
   ## Callback: evaluated every frame
   def frame_callback(self):
   
-    ## @var dofs
-    # Temporary list of degrees of freedom to process input bindings.
-    self.dofs = [0.0,0.0,0.0,0.0,0.0,0.0,0.0]
+    _dofs = self.dofs
 
-    # evaluate input bindings
-    for _input_binding in self.input_bindings:
+    for _i in range(len(_dofs)):
+      _dofs[_i] = 0.0
+
+    # evaluate filtered input bindings
+    _values = []
+
+    for _binding in self.filtered_input_bindings:
+
+      try:
+        _values.append(eval(_binding[2], globals(), self.binding_namespace))
+      except Exception as e:
+        print_error("Error parsing input binding " + _binding[1] + " (" + str(e) + ")", False)
+        _values.append(_binding[3]) # offset is filtered to zero
+
+    for _binding, _value in zip(self.filtered_input_bindings, self.filter_channels(_values)):
+      _dofs[_binding[0]] += _value
+
+    # evaluate remaining input bindings
+    for _input_binding in self.compiled_input_bindings:
 
       try:
-        eval(_input_binding)
+        eval(_input_binding[1], globals(), self.binding_namespace)
       except Exception as e:
-        print_error("Error parsing input binding " + _input_binding + "(" + e + ")", False)
+        print_error("Error parsing input binding " + _input_binding[0] + " (" + str(e) + ")", False)
     
-    self.mf_dof.value = self.dofs
+    self.mf_dof.value = _dofs
 
 
   ## Sets a specific degree of freedom to a value which is filtered before.
@@ -215,8 +315,7 @@ class SpacemouseDevice(MultiDofDevice):
     # init sensor
     ## @var device_sensor
     # Device sensor for the device's inputs.
-    self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor.Station.value = DEVICE_STATION
+    self.device_sensor = DeviceSensorFactory.create(DEVICE_STATION)
 
     self.init_station_tracking(TRACKING_TARGET_NAME, NO_TRACKING_MAT)
 
@@ -249,8 +348,7 @@ class GlobefishDevice(MultiDofDevice):
     # init sensor
     ## @var device_sensor
     # Device sensor for the device's inputs.
-    self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor.Station.value = DEVICE_STATION
+    self.device_sensor = DeviceSensorFactory.create(DEVICE_STATION)
 
     self.init_station_tracking(None, NO_TRACKING_MAT)
 
@@ -281,13 +379,11 @@ class KeyboardMouseDevice(MultiDofDevice):
   
     ## @var mouse_sensor
     # Input sensor referencing the mouse connected to the computer.
-    self.mouse_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = _device_service)
-    self.mouse_sensor.Station.value = "device-mouse"
+    self.mouse_sensor = DeviceSensorFactory.create("device-mouse", DEVICE_SERVICE = _device_service)
 
     ## @var keyboard_sensor
     # Input sensor referencing the keyboard connected to the computer.
-    self.keyboard_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = _device_service)
-    self.keyboard_sensor.Station.value = "device-keyboard0"
+    self.keyboard_sensor = DeviceSensorFactory.create("device-keyboard0", DEVICE_SERVICE = _device_service)
 
     self.init_station_tracking(None, NO_TRACKING_MAT)
 
@@ -328,8 +424,7 @@ class XBoxDevice(MultiDofDevice):
     
     ## @var device_sensor
     # Device sensor for the device's inputs.
-    self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor.Station.value = DEVICE_STATION
+    self.device_sensor = DeviceSensorFactory.create(DEVICE_STATION)
     
     ## @var translation_factor
     # Factor to modify the device's translation input.
@@ -369,13 +464,11 @@ class OldSpheronDevice(MultiDofDevice):
     
     ## @var device_sensor
     # Device sensor for the device's inputs.
-    self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor.Station.value = DEVICE_STATION
+    self.device_sensor = DeviceSensorFactory.create(DEVICE_STATION)
 
     ## @var button_sensor
     # Device sensor for the device's button inputs.
-    self.button_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.button_sensor.Station.value = "device-old-spheron-buttons"
+    self.button_sensor = DeviceSensorFactory.create("device-old-spheron-buttons")
     
     ## @var translation_factor
     # Factor to modify the device's translation input.
@@ -404,10 +497,7 @@ class OldSpheronDevice(MultiDofDevice):
   # @param NEG_THRESHOLD The negative threshold to be used.
   # @param POS_THRESHOLD The positive threshold to be used.
   def conditional_set_and_filter_dof(self, ID, VALUE, OFFSET, MIN, MAX, NEG_THRESHOLD, POS_THRESHOLD):
-    _condition = "self.device_sensor.Value" + str(ID) + ".value != 0.0"
-    _result = eval(_condition)
-
-    if _result:
+    if getattr(self.device_sensor, "Value" + str(ID)).value != 0.0:
       self.set_and_filter_dof(ID, VALUE, OFFSET, MIN, MAX, NEG_THRESHOLD, POS_THRESHOLD)
 
 
@@ -424,13 +514,11 @@ class NewSpheronDevice(MultiDofDevice):
     
     ## @var device_sensor_right
     # Device sensor for the device's right inputs.
-    self.device_sensor_right = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor_right.Station.value = DEVICE_STATION + "-right"
+    self.device_sensor_right = DeviceSensorFactory.create(DEVICE_STATION + "-right")
 
     ## @var device_sensor_left
     # Device sensor for the device's left inputs.
-    self.device_sensor_left = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor_left.Station.value = DEVICE_STATION + "-left"
+    self.device_sensor_left = DeviceSensorFactory.create(DEVICE_STATION + "-left")
     
     ## @var translation_factor
     # Factor to modify the device's translation input.
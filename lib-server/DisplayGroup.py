@@ -7,8 +7,13 @@
 import avango
 import avango.gua
 
+# import python libraries
+import math
+
 # import framework libraries
 from ApplicationManager import *
+from MatrixObserver import MatrixObserver
+from NodeDistributor import NodeDistributor
 from VirtualDisplay import VirtualDisplayProxy
 from scene_config import scenegraphs
 
@@ -162,34 +167,56 @@ class VirtualDisplayGroup(DisplayGroup):
 
     if self.id == 0:
       self.NET_TRANS_NODE.Children.value.append(VirtualDisplayGroup.portal_group_node)
-      self.NET_TRANS_NODE.distribute_object(VirtualDisplayGroup.portal_group_node)
+      NodeDistributor.distribute_object(self.NET_TRANS_NODE, VirtualDisplayGroup.portal_group_node)
 
     ## @var portal_node
     # Grouping node for this virtual display group below the group node for all virtual displays.
     self.portal_node = avango.gua.nodes.TransformNode(Name = "vir_dg" + str(self.id) + "_" + self.portal_node_name_attachment)
     VirtualDisplayGroup.portal_group_node.Children.value.append(self.portal_node)
-    self.NET_TRANS_NODE.distribute_object(self.portal_node)
+    NodeDistributor.distribute_object(self.NET_TRANS_NODE, self.portal_node)
 
     ## @var settings_node
     # Node whose group names store information about the virtual display group settings, such as viewing mode, etc.
     self.settings_node = avango.gua.nodes.TransformNode(Name = "settings")
     self.settings_node.GroupNames.value = ["0-" + self.viewing_mode, "1-" + self.camera_mode, "2-" + self.negative_parallax, "3-" + self.border_material, "4-" + self.visible]
     self.portal_node.Children.value.append(self.settings_node)
-    self.NET_TRANS_NODE.distribute_object(self.settings_node)
+    NodeDistributor.distribute_object(self.NET_TRANS_NODE, self.settings_node)
 
     ## @var entry_node
     # Node storing the matrix of the virtual display group's primary display's entry.
     self.entry_node = avango.gua.nodes.TransformNode(Name = "entry")
     self.entry_node.Transform.value = self.displays[0].entry_matrix
     self.portal_node.Children.value.append(self.entry_node)
-    self.NET_TRANS_NODE.distribute_object(self.entry_node)
+    NodeDistributor.distribute_object(self.NET_TRANS_NODE, self.entry_node)
 
     ## @var exit_node
     # Node storing the matrix of the virtual display group's exit.
     self.exit_node = avango.gua.nodes.TransformNode(Name = "exit")
     self.exit_node.Transform.value = avango.gua.make_identity_mat()
     self.portal_node.Children.value.append(self.exit_node)
-    self.NET_TRANS_NODE.distribute_object(self.exit_node)
+    NodeDistributor.distribute_object(self.NET_TRANS_NODE, self.exit_node)
+
+    ## @var entry_observer
+    # MatrixObserver watching the entry node's transformation to invalidate transit_portals.
+    self.entry_observer = MatrixObserver()
+    self.entry_observer.my_constructor(self.entry_node.Transform)
+
+    ## @var entry_version
+    # Number increased whenever the entry node's transformation has changed.
+    self.entry_version = 0
+
+    ## @var transit_portals_version
+    # Entry version transit_portals were computed for.
+    self.transit_portals_version = -1
+
+    ## @var screen_to_entry_mat
+    # Cached product of the first screen node's transformation and the inverse entry matrix, None if outdated.
+    self.screen_to_entry_mat = None
+
+    ## @var transit_portals
+    # Cached list of (inverse portal matrix, world center, world half diagonal, scale ratio) tuples, one for each screen node.
+    # Used by the ApplicationManager for portal transit checks.
+    self.transit_portals = []
 
 
     # add texture offset nodes and screen nodes
@@ -209,7 +236,7 @@ class VirtualDisplayGroup(DisplayGroup):
       _offset_node = avango.gua.nodes.TransformNode(Name = "offset_tex_" + str(_index))
       _offset_node.Transform.value = _offset
       self.entry_node.Children.value.append(_offset_node)
-      self.NET_TRANS_NODE.distribute_object(_offset_node)
+      NodeDistributor.distribute_object(self.NET_TRANS_NODE, _offset_node)
       self.texture_offset_nodes.append(_offset_node)
 
       _screen_node = avango.gua.nodes.ScreenNode(Name = "screen_" + str(_index))
@@ -217,7 +244,7 @@ class VirtualDisplayGroup(DisplayGroup):
       _screen_node.Height.value = self.displays[_index].size[1]
       _screen_node.Transform.value = _offset
       self.exit_node.Children.value.append(_screen_node)
-      self.NET_TRANS_NODE.distribute_object(_screen_node)
+      NodeDistributor.distribute_object(self.NET_TRANS_NODE, _screen_node)
       self.screen_nodes.append(_screen_node)
 
     # create proxy screen geometries
@@ -237,6 +264,52 @@ class VirtualDisplayGroup(DisplayGroup):
                           , SCREEN_NODE = _screen_node)
 
 
+  ## Returns the entry version, which is increased whenever the entry node has moved.
+  def get_entry_version(self):
+
+    if self.entry_observer.consume_change():
+      self.entry_version += 1
+      self.screen_to_entry_mat = None
+
+    return self.entry_version
+
+  ## Returns the transformation from the entry node's to the first screen node's coordinate system.
+  # Recomputed only if the entry node has moved.
+  def get_screen_to_entry_mat(self):
+
+    self.get_entry_version()
+
+    if self.screen_to_entry_mat == None:
+      self.screen_to_entry_mat = self.screen_nodes[0].Transform.value * avango.gua.make_inverse_mat(self.entry_node.Transform.value)
+
+    return self.screen_to_entry_mat
+
+  ## Returns the cached portal data for transit checks and recomputes it if the entry node has moved.
+  # The screen node transformations are assumed to stay constant after add_virtual_display_nodes.
+  def get_transit_portals(self):
+
+    if self.transit_portals_version != self.get_entry_version() or len(self.transit_portals) != len(self.screen_nodes):
+
+      self.transit_portals_version = self.entry_version
+
+      self.transit_portals = []
+
+      for _index, _screen_node in enumerate(self.screen_nodes):
+
+        _portal_mat = self.entry_node.Transform.value * _screen_node.Transform.value
+        _portal_scale = _portal_mat.get_scale()
+        _max_scale = max(abs(_portal_scale.x), abs(_portal_scale.y), abs(_portal_scale.z))
+        _min_scale = min(abs(_portal_scale.x), abs(_portal_scale.y), abs(_portal_scale.z))
+
+        _half_diagonal = 0.5 * math.sqrt(self.displays[_index].size[0] ** 2 + self.displays[_index].size[1] ** 2)
+
+        self.transit_portals.append( (avango.gua.make_inverse_mat(_portal_mat)
+                                    , _portal_mat.get_translate()
+                                    , _max_scale * _half_diagonal
+                                    , _max_scale / max(_min_scale, 0.000001)) )
+
+    return self.transit_portals
+
   ## Switches viewing_mode to the other state.
   def switch_viewing_mode(self):
     if self.viewing_mode == "2D":
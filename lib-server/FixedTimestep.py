@@ -0,0 +1,106 @@
+#!/usr/bin/python
+
+## @file
+# Contains class FixedTimestep.
+
+# import avango-guacamole libraries
+# ...
+
+# import framework libraries
+# ...
+
+# import python libraries
+import time
+
+## Clock dividing the elapsed time into navigation steps of a fixed duration.
+#
+# Each call of advance returns the number of whole steps that elapsed since the last step, so the
+# navigation speed does not depend on the frame rate. Elapsed times which fall short of a whole step by
+# less than step_tolerance count as that step, so frame times equal to the step time, with rounding
+# errors and some jitter, give one step per frame instead of 0 or 2 steps. The time not yet covered by a step is kept for
+# the next frame and is available as interpolation factor. At most max_steps are caught up per frame;
+# on lower frame rates the remaining time is dropped, so the navigation slows down instead of spending
+# more and more steps on every frame.
+class FixedTimestep:
+
+  ## @var clock
+  # Function returning the current time in seconds. Can be replaced, e.g. by a simulated clock in the benchmarks.
+  clock = time.time
+
+  ## @var reference_step_time
+  # Step time in seconds for which the per-step input and correction factors of the framework are tuned.
+  reference_step_time = 1.0 / 60.0
+
+  ## @var step_tolerance
+  # Fraction of a step by which the elapsed time may fall short of a whole step to still count it.
+  step_tolerance = 0.1
+
+  ## Custom constructor.
+  # @param STEP_TIME Duration of one step in seconds.
+  # @param MAX_STEPS Maximum number of steps returned by one call of advance.
+  def __init__(self, STEP_TIME, MAX_STEPS):
+
+    ## @var step_time
+    # Duration of one step in seconds.
+    self.step_time = STEP_TIME
+
+    ## @var max_steps
+    # Maximum number of steps returned by one call of advance.
+    self.max_steps = MAX_STEPS
+
+    ## @var step_factor
+    # Ratio of step_time and reference_step_time, used to scale values given per reference step.
+    self.step_factor = STEP_TIME / FixedTimestep.reference_step_time
+
+    ## @var time
+    # Time of the last step, None if the clock was not started yet.
+    self.time = None
+
+    ## @var current_time
+    # Time of the last call of advance.
+    self.current_time = None
+
+    ## @var dropped_time
+    # Accumulated time in seconds that was dropped because more than max_steps had elapsed.
+    self.dropped_time = 0.0
+
+  ## Restarts the clock at the current time.
+  def reset(self):
+
+    self.time = FixedTimestep.clock()
+    self.current_time = self.time
+
+  ## Returns the number of steps that elapsed since the last step and moves the time of the last step accordingly.
+  def advance(self):
+
+    _now = FixedTimestep.clock()
+    self.current_time = _now
+
+    if self.time == None:
+      self.time = _now
+      return 0
+
+    _steps = max(int((_now - self.time) / self.step_time + FixedTimestep.step_tolerance), 0)
+
+    if _steps > self.max_steps:
+      self.dropped_time += (_now - self.time) - self.max_steps * self.step_time
+      self.time = _now - self.max_steps * self.step_time
+      _steps = self.max_steps
+
+    self.time += _steps * self.step_time
+    return _steps
+
+  ## Returns the time of a step of the last call of advance.
+  # @param INDEX Index of the step, 0 being the first step of the call.
+  # @param STEPS Number of steps returned by the call.
+  def get_step_time(self, INDEX, STEPS):
+
+    return self.time - (STEPS - 1 - INDEX) * self.step_time
+
+  ## Returns the fraction of a step that elapsed after the last step, in the range [0, 1).
+  def get_alpha(self):
+
+    if self.time == None:
+      return 0.0
+
+    return min(max((self.current_time - self.time) / self.step_time, 0.0), 1.0)
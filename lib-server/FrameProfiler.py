@@ -0,0 +1,305 @@
+#!/usr/bin/python
+
+## @file
+# Contains classes RingBuffer and FrameProfiler.
+
+# import avango-guacamole libraries
+import avango
+import avango.script
+
+# import framework libraries
+from ConsoleIO import *
+
+# import python libraries
+import functools
+import glob
+import importlib
+import os
+import sys
+import time
+
+## Fixed-size buffer keeping the latest samples of a measurement.
+class RingBuffer:
+
+  ## Custom constructor.
+  # @param SIZE Maximum number of samples to be kept.
+  def __init__(self, SIZE):
+
+    ## @var samples
+    # List of the stored samples. Once full, the oldest sample is overwritten.
+    self.samples = []
+
+    ## @var size
+    # Maximum number of samples to be kept.
+    self.size = SIZE
+
+    ## @var next_index
+    # Index in samples to be overwritten next once the buffer is full.
+    self.next_index = 0
+
+  ## Adds a sample, overwriting the oldest one if the buffer is full.
+  # @param VALUE The sample to be added.
+  def append(self, VALUE):
+
+    if len(self.samples) < self.size:
+      self.samples.append(VALUE)
+    else:
+      self.samples[self.next_index] = VALUE
+      self.next_index = (self.next_index + 1) % self.size
+
+  ## Returns the given percentiles of the stored samples using the nearest rank method.
+  # @param PERCENTILES List of percentiles in the range [0, 100].
+  def get_percentiles(self, PERCENTILES):
+
+    if len(self.samples) == 0:
+      return [0.0 for _percentile in PERCENTILES]
+
+    _sorted_samples = sorted(self.samples)
+    _last_index = len(_sorted_samples) - 1
+
+    return [_sorted_samples[int(round(_percentile / 100.0 * _last_index))] for _percentile in PERCENTILES]
+
+
+## Opt-in instrumentation measuring the wall time of the evaluate and frame_callback hooks.
+#
+# install() imports the framework modules and replaces the hooks of all their classes by
+# timing wrappers. It has to be called before any framework objects are created, including
+# the ones created by the workspace configuration file, as frame_callback methods are bound
+# to Update nodes on construction. For every hook, the time per frame is recorded per class
+# (summed over all instances) and per instance in ring buffers. Rolling percentiles can be
+# printed from the GuaVE shell or dumped to a CSV file.
+class FrameProfiler:
+
+  ## @var hook_names
+  # Names of the methods to be instrumented.
+  hook_names = ["evaluate", "frame_callback"]
+
+  ## @var excluded_modules
+  # Names of the framework modules which are not imported by install, as they run code on import.
+  excluded_modules = ["main", "Daemon", "__init__"]
+
+  ## @var percentiles
+  # Percentiles reported by print_statistics and dump_csv.
+  percentiles = [50, 90, 99]
+
+  ## Custom constructor.
+  # @param HISTORY_SIZE Number of frames to be kept in the ring buffers.
+  def __init__(self, HISTORY_SIZE = 600):
+
+    ## @var history_size
+    # Number of frames to be kept in the ring buffers.
+    self.history_size = HISTORY_SIZE
+
+    ## @var class_buffers
+    # Dictionary mapping hook names, e.g. "GroundFollowing.evaluate", to RingBuffers of per-frame times summed over all instances.
+    self.class_buffers = {}
+
+    ## @var instance_buffers
+    # Dictionary mapping (hook name, instance number) keys to RingBuffers of per-frame times of a single instance.
+    self.instance_buffers = {}
+
+    ## @var instance_numbers
+    # Dictionary mapping (hook name, object id) keys to instance numbers in the order of first appearance.
+    self.instance_numbers = {}
+
+    ## @var current_frame_times
+    # Dictionary mapping hook names to the times summed up in the current frame.
+    self.current_frame_times = {}
+
+    ## @var number_of_frames
+    # Number of frames recorded since installation or the last reset.
+    self.number_of_frames = 0
+
+    ## @var instrumented_hooks
+    # List of (class, method name, original method) tuples replaced by install.
+    self.instrumented_hooks = []
+
+    ## @var frame_trigger
+    # Triggers framewise evaluation of frame_callback method.
+    self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+  ## Evaluated every frame. Closes the per-class measurements of the last frame.
+  def frame_callback(self):
+
+    for _hook_name, _time in self.current_frame_times.items():
+
+      if _hook_name not in self.class_buffers:
+        self.class_buffers[_hook_name] = RingBuffer(self.history_size)
+
+      self.class_buffers[_hook_name].append(_time)
+
+    self.current_frame_times = {}
+    self.number_of_frames += 1
+
+  ## Records the time spent in a hook call.
+  # @param HOOK_NAME Name of the hook, e.g. "GroundFollowing.evaluate".
+  # @param INSTANCE The object the hook was called on.
+  # @param TIME The wall time of the call in seconds.
+  def record(self, HOOK_NAME, INSTANCE, TIME):
+
+    self.current_frame_times[HOOK_NAME] = self.current_frame_times.get(HOOK_NAME, 0.0) + TIME
+
+    _id_key = (HOOK_NAME, id(INSTANCE))
+
+    if _id_key not in self.instance_numbers:
+      self.instance_numbers[_id_key] = len([_key for _key in self.instance_numbers if _key[0] == HOOK_NAME])
+      self.instance_buffers[(HOOK_NAME, self.instance_numbers[_id_key])] = RingBuffer(self.history_size)
+
+    self.instance_buffers[(HOOK_NAME, self.instance_numbers[_id_key])].append(TIME)
+
+  ## Replaces the hooks of a class by timing wrappers. Only hooks defined in the class itself are replaced.
+  # @param CLASS The class to be instrumented.
+  def instrument_class(self, CLASS):
+
+    # the profiler's own frame callback is not measured
+    if CLASS == FrameProfiler:
+      return
+
+    for _method_name in FrameProfiler.hook_names:
+
+      _method = CLASS.__dict__.get(_method_name)
+
+      if _method == None or getattr(_method, "frame_profiler_hook", False):
+        continue
+
+      _wrapper = self.create_wrapper(CLASS.__name__ + "." + _method_name, _method)
+      setattr(CLASS, _method_name, _wrapper)
+      self.instrumented_hooks.append( (CLASS, _method_name, _method) )
+
+  ## Creates a timing wrapper around a hook.
+  # @param HOOK_NAME Name under which the measurements are recorded.
+  # @param METHOD The method to be wrapped.
+  def create_wrapper(self, HOOK_NAME, METHOD):
+
+    _profiler = self
+    _clock = time.perf_counter
+
+    @functools.wraps(METHOD)
+    def _wrapper(INSTANCE):
+
+      _start_time = _clock()
+
+      try:
+        return METHOD(INSTANCE)
+      finally:
+        _profiler.record(HOOK_NAME, INSTANCE, _clock() - _start_time)
+
+    _wrapper.frame_profiler_hook = True
+    return _wrapper
+
+  ## Imports all framework modules, i.e. the modules in this directory, and instruments their classes.
+  # Modules are imported here because most of them are imported for the first time by the workspace configuration file.
+  def install(self):
+
+    _directory = os.path.dirname(os.path.abspath(__file__))
+
+    for _filename in sorted(glob.glob(os.path.join(_directory, "*.py"))):
+
+      _module_name = os.path.splitext(os.path.basename(_filename))[0]
+
+      if _module_name not in FrameProfiler.excluded_modules:
+        importlib.import_module(_module_name)
+
+    for _module in list(sys.modules.values()):
+
+      _filename = getattr(_module, "__file__", None)
+
+      if _filename == None or os.path.dirname(os.path.abspath(_filename)) != _directory:
+        continue
+
+      for _object in list(vars(_module).values()):
+
+        if isinstance(_object, type) and _object.__module__ == _module.__name__:
+          self.instrument_class(_object)
+
+    print_message("Frame profiler instrumented " + str(len(self.instrumented_hooks)) + " hooks.")
+
+  ## Restores the original hooks. Objects created before keep the wrapped frame_callback bindings.
+  def uninstall(self):
+
+    for _class, _method_name, _method in self.instrumented_hooks:
+      setattr(_class, _method_name, _method)
+
+    self.instrumented_hooks = []
+
+  ## Clears all measurements.
+  def reset(self):
+
+    self.class_buffers = {}
+    self.instance_buffers = {}
+    self.instance_numbers = {}
+    self.current_frame_times = {}
+    self.number_of_frames = 0
+
+  ## Returns a list of statistics rows (scope, hook name, instance number, samples, mean, percentiles..., max) in milliseconds.
+  # The rows are sorted by descending mean time within each scope.
+  def get_statistics(self):
+
+    _rows = []
+
+    for _scope, _buffers in [("class", self.class_buffers), ("instance", self.instance_buffers)]:
+
+      _scope_rows = []
+
+      for _key, _buffer in _buffers.items():
+
+        if _scope == "class":
+          _hook_name, _instance_number = _key, ""
+        else:
+          _hook_name, _instance_number = _key
+
+        _samples = _buffer.samples
+
+        if len(_samples) == 0:
+          continue
+
+        _row = [_scope, _hook_name, _instance_number, len(_samples), sum(_samples) / len(_samples) * 1000.0]
+        _row.extend([_value * 1000.0 for _value in _buffer.get_percentiles(FrameProfiler.percentiles)])
+        _row.append(max(_samples) * 1000.0)
+        _scope_rows.append(_row)
+
+      _scope_rows.sort(key = lambda _row: -_row[4])
+      _rows.extend(_scope_rows)
+
+    return _rows
+
+  ## Prints the rolling statistics per class and, optionally, per instance on the console.
+  # @param INSTANCES Boolean saying if the per-instance statistics are to be printed as well.
+  # @param NUMBER_OF_ROWS Maximum number of rows to be printed per scope.
+  def print_statistics(self, INSTANCES = False, NUMBER_OF_ROWS = 20):
+
+    _rows = self.get_statistics()
+
+    print_subheadline("Frame profile over the last " + str(min(self.number_of_frames, self.history_size)) + " frames (ms)")
+    print("{0:<48} {1:>8} {2:>8} {3:>8} {4:>8} {5:>8}".format("hook", "mean", "p50", "p90", "p99", "max"))
+
+    for _scope in ["class", "instance"]:
+
+      if _scope == "instance" and not INSTANCES:
+        continue
+
+      for _row in [_row for _row in _rows if _row[0] == _scope][:NUMBER_OF_ROWS]:
+
+        _name = _row[1]
+
+        if _scope == "instance":
+          _name += " #" + str(_row[2])
+
+        print("{0:<48} {1:>8.3f} {2:>8.3f} {3:>8.3f} {4:>8.3f} {5:>8.3f}".format(_name, _row[4], _row[5], _row[6], _row[7], _row[8]))
+
+  ## Writes the rolling statistics per class and per instance to a CSV file.
+  # @param FILENAME Path of the CSV file to be written.
+  def dump_csv(self, FILENAME):
+
+    _header = ["scope", "hook", "instance", "samples", "mean_ms"]
+    _header.extend(["p" + str(_percentile) + "_ms" for _percentile in FrameProfiler.percentiles])
+    _header.append("max_ms")
+
+    with open(FILENAME, "w") as _file:
+
+      _file.write(",".join(_header) + "\n")
+
+      for _row in self.get_statistics():
+        _file.write(",".join([str(_value) for _value in _row]) + "\n")
+
+    print_message("Frame profile written to " + FILENAME + ".")
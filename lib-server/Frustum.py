@@ -0,0 +1,201 @@
+#!/usr/bin/python
+
+## @file
+# Contains class Frustum.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+
+# import framework libraries
+from SceneManager import SceneManager
+import Utilities
+
+# import python libraries
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+
+## Cached viewing frustum of a UserRepresentation at one of its screens.
+#
+# The clipping planes are stored as plain floats and are only recomputed when the head
+# position, the screen transformation or the clipping distances have changed. Checking this
+# is not free, so update is called once per frame or caller loop, not per tested point: contains
+# and points_inside_frustums test against the planes of the last update.
+class Frustum:
+
+  ## @var numpy_threshold
+  # Minimum number of point-frustum tests for which points_inside_frustums uses numpy. Fewer tests are faster in plain Python.
+  numpy_threshold = 64
+
+  ## Recomputes the clipping planes of several frustums if necessary.
+  # @param FRUSTUMS List of Frustum instances to be updated.
+  @staticmethod
+  def update_all(FRUSTUMS):
+
+    for _frustum in FRUSTUMS:
+      _frustum.update()
+
+  ## Tests a list of points against a list of frustums in a single call.
+  # The frustums are not updated, see update_all. Uses numpy if available and enough tests are done, otherwise Frustum.contains.
+  # @param POINTS List of N points in world coordinates.
+  # @param FRUSTUMS List of M Frustum instances.
+  # @return N x M nested list of booleans saying if point n is inside frustum m.
+  @staticmethod
+  def points_inside_frustums(POINTS, FRUSTUMS):
+
+    if len(POINTS) == 0 or len(FRUSTUMS) == 0:
+      return [[] for _point in POINTS]
+
+    if numpy == None or len(POINTS) * len(FRUSTUMS) < Frustum.numpy_threshold:
+      return [[_frustum.contains(_point) for _frustum in FRUSTUMS] for _point in POINTS]
+
+    _points = numpy.array([(_point.x, _point.y, _point.z, 1.0) for _point in POINTS]) # N x 4
+    _depth_rows = numpy.array([_frustum.depth_row for _frustum in FRUSTUMS])          # M x 4
+    _near_clips = numpy.array([_frustum.near_clip for _frustum in FRUSTUMS])          # M
+    _far_clips = numpy.array([_frustum.far_clip for _frustum in FRUSTUMS])            # M
+    _planes = numpy.array([_frustum.planes for _frustum in FRUSTUMS])                 # M x 4 x 4
+
+    _depths = numpy.abs(_points.dot(_depth_rows.T))                                   # N x M
+    _inside = (_depths >= _near_clips) & (_depths <= _far_clips)
+
+    _distances = numpy.einsum('nk,mpk->nmp', _points, _planes)                        # N x M x 4
+    _inside &= numpy.all(_distances >= 0.0, axis = 2)
+
+    return _inside.tolist()
+
+  ## Returns if a point is inside at least one of several frustums.
+  # The frustums are not updated, see update_all.
+  # @param POINT The point in world coordinates to be checked.
+  # @param FRUSTUMS List of Frustum instances.
+  @staticmethod
+  def is_inside_any(POINT, FRUSTUMS):
+
+    return True in Frustum.points_inside_frustums([POINT], FRUSTUMS)[0]
+
+  ## Custom constructor.
+  # @param USER_REPRESENTATION The UserRepresentation instance to which SCREEN is belonging to.
+  # @param SCREEN The screen node to create the viewing frustum for.
+  def __init__(self, USER_REPRESENTATION, SCREEN):
+
+    ## @var USER_REPRESENTATION
+    # The UserRepresentation instance to which SCREEN is belonging to.
+    self.USER_REPRESENTATION = USER_REPRESENTATION
+
+    ## @var SCREEN
+    # The screen node this frustum is created for.
+    self.SCREEN = SCREEN
+
+    ## @var head_key
+    # Head world position the frustum was lastly computed for.
+    self.head_key = None
+
+    ## @var screen_key
+    # Screen world matrix and size the frustum was lastly computed for.
+    self.screen_key = None
+
+    ## @var clip_key
+    # Global clipping distances the frustum was lastly computed for.
+    self.clip_key = None
+
+    ## @var near_clip
+    # Near clipping distance in head space.
+    self.near_clip = 0.0
+
+    ## @var far_clip
+    # Far clipping distance in head space.
+    self.far_clip = 0.0
+
+    ## @var depth_row
+    # Coefficients (a, b, c, d) computing the depth of a world point in head space as a*x + b*y + c*z + d.
+    self.depth_row = (0.0, 0.0, 0.0, 0.0)
+
+    ## @var planes
+    # The four lateral clipping planes as (nx, ny, nz, d) tuples. Points inside the frustum have positive distances.
+    self.planes = []
+
+  ## Recomputes the clipping planes if the head, the screen or the clipping distances have changed.
+  def update(self):
+
+    _user_head_world_pos = self.USER_REPRESENTATION.head.WorldTransform.value.get_translate()
+    _screen_world_mat = self.SCREEN.WorldTransform.value
+
+    _head_key = (_user_head_world_pos.x, _user_head_world_pos.y, _user_head_world_pos.z)
+    _screen_key = (Utilities.get_matrix_key(_screen_world_mat), self.SCREEN.Width.value, self.SCREEN.Height.value)
+    _clip_key = (SceneManager.current_near_clip, SceneManager.current_far_clip)
+
+    if _head_key == self.head_key and _screen_key == self.screen_key and _clip_key == self.clip_key:
+      return
+
+    self.head_key = _head_key
+    self.screen_key = _screen_key
+    self.clip_key = _clip_key
+
+    # if user representation is in virtual display, start intersecting from the virtual display plane
+    if self.USER_REPRESENTATION.is_in_virtual_display():
+      _head_in_screen_pos = avango.gua.make_inverse_mat(_screen_world_mat) * _user_head_world_pos
+      self.near_clip = abs(_head_in_screen_pos.z)
+    else:
+      self.near_clip = SceneManager.current_near_clip
+
+    self.far_clip = SceneManager.current_far_clip
+
+    # head space (but with nav orientation)
+    _head_mat = self.SCREEN.WorldTransform.value
+    _head_mat.set_translate(_user_head_world_pos)
+    _inv_head_mat = avango.gua.make_inverse_mat(_head_mat)
+
+    # extract the z row of the inverse head matrix to compute depths without matrix multiplications
+    _origin_z = (_inv_head_mat * avango.gua.Vec3(0.0, 0.0, 0.0)).z
+    self.depth_row = ( (_inv_head_mat * avango.gua.Vec3(1.0, 0.0, 0.0)).z - _origin_z
+                     , (_inv_head_mat * avango.gua.Vec3(0.0, 1.0, 0.0)).z - _origin_z
+                     , (_inv_head_mat * avango.gua.Vec3(0.0, 0.0, 1.0)).z - _origin_z
+                     , _origin_z)
+
+    # compute screen corner points
+    _screen_width = self.SCREEN.Width.value
+    _screen_height = self.SCREEN.Height.value
+
+    _tl_world_pos = _screen_world_mat * avango.gua.Vec3(-_screen_width * 0.5, _screen_height * 0.5, 0.0)
+    _tr_world_pos = _screen_world_mat * avango.gua.Vec3(_screen_width * 0.5, _screen_height * 0.5, 0.0)
+    _bl_world_pos = _screen_world_mat * avango.gua.Vec3(-_screen_width * 0.5, -_screen_height * 0.5, 0.0)
+    _br_world_pos = _screen_world_mat * avango.gua.Vec3(_screen_width * 0.5, -_screen_height * 0.5, 0.0)
+
+    _tl_world_pos = avango.gua.Vec3(_tl_world_pos.x, _tl_world_pos.y, _tl_world_pos.z)
+    _tr_world_pos = avango.gua.Vec3(_tr_world_pos.x, _tr_world_pos.y, _tr_world_pos.z)
+    _bl_world_pos = avango.gua.Vec3(_bl_world_pos.x, _bl_world_pos.y, _bl_world_pos.z)
+    _br_world_pos = avango.gua.Vec3(_br_world_pos.x, _br_world_pos.y, _br_world_pos.z)
+
+    # compute lateral planes: left, right, top, bottom
+    self.planes = []
+
+    for _plane in [ Utilities.compute_plane(_bl_world_pos, _tl_world_pos, _user_head_world_pos)
+                  , Utilities.compute_plane(_tr_world_pos, _br_world_pos, _user_head_world_pos)
+                  , Utilities.compute_plane(_tl_world_pos, _tr_world_pos, _user_head_world_pos)
+                  , Utilities.compute_plane(_br_world_pos, _bl_world_pos, _user_head_world_pos) ]:
+
+      self.planes.append( (_plane[0].x, _plane[0].y, _plane[0].z, _plane[1]) )
+
+  ## Checks if a point is inside this frustum as of the last update.
+  # @param POINT The point in world coordinates to be checked.
+  def contains(self, POINT):
+
+    _x = POINT.x
+    _y = POINT.y
+    _z = POINT.z
+
+    _row = self.depth_row
+    _depth = abs(_row[0] * _x + _row[1] * _y + _row[2] * _z + _row[3])
+
+    if (_depth < self.near_clip) or (_depth > self.far_clip): # point in front of near plane or behind far plane --> outside frustum
+      return False
+
+    for _plane in self.planes:
+
+      if _plane[0] * _x + _plane[1] * _y + _plane[2] * _z + _plane[3] < 0.0: # point in front of lateral plane --> outside frustum
+        return False
+
+    return True
+
@@ -10,8 +10,12 @@ import avango.script
 from   avango.script import field_has_changed
 
 # import framework libraries
-from Intersection import *
+from FixedTimestep import FixedTimestep
+from TerrainHeightCache import TerrainHeightCache
 from scene_config import scenegraphs
+from scene_config import terrain_height_cache_cell_size
+from scene_config import navigation_step_time
+from scene_config import navigation_max_steps
 
 # import python libraries
 import math
@@ -22,9 +26,21 @@ import math
 # respect to gravity using the scenegraph. Therefore, a ray
 # is shot from a specific start height downwards and the intersection
 # point is compared to the position of the device belonging to the platform.
+#
+# The ground heights are looked up in a TerrainHeightCache shared by all
+# instances, which only performs ray tests for uncached positions. No lookup
+# is done while the ray start position and the scale remain unchanged.
+#
+# The correction is integrated in navigation steps of a fixed duration, so
+# falling and climbing speeds do not depend on the frame rate. Frames without
+# an elapsed step pass the input matrix through.
 
 class GroundFollowing(avango.script.Script):
 
+  ## @var terrain_height_cache
+  # TerrainHeightCache shared by all instances, created with the first instance.
+  terrain_height_cache = None
+
   # input field
   ## @var sf_abs_input_mat
   # The input matrix to be corrected by the ground following algorithm.
@@ -38,11 +54,6 @@ class GroundFollowing(avango.script.Script):
   sf_abs_output_mat.value = avango.gua.make_identity_mat()
 
   # internal fields
-  ## @var sf_gf_start_mat
-  # The matrix representing the position where the sent ray to the ground starts. 
-  sf_gf_start_mat = avango.gua.SFMatrix4()
-  sf_gf_start_mat.value = avango.gua.make_identity_mat()
-
   ## @var sf_station_mat
   # The matrix representing the position of the device belonging to the platform.
   sf_station_mat = avango.gua.SFMatrix4()
@@ -53,10 +64,6 @@ class GroundFollowing(avango.script.Script):
   sf_scale = avango.SFFloat()
   sf_scale.value = 1.0
 
-  ## @var mf_ground_pick_result
-  # Intersections of the ground following ray with the objects in the scene.
-  mf_ground_pick_result = avango.gua.MFPickResult()
-
   ## Default constructor.
   def __init__(self):
     self.super(GroundFollowing).__init__()
@@ -76,17 +83,25 @@ class GroundFollowing(avango.script.Script):
     # A boolean indicating if the user is currently falling. Used for fall speed computations.
     self.falling = False
 
+    ## @var timestep
+    # FixedTimestep dividing the elapsed time into navigation steps.
+    self.timestep = FixedTimestep(navigation_step_time, navigation_max_steps)
+
     ## @var initial_fall_velocity
-    # The starting velocity when the user is falling in meters per frame. Is increased the longer the falling process goes on.
-    self.initial_fall_velocity = 0.05
+    # The starting velocity when the user is falling in meters per second. Is increased the longer the falling process goes on.
+    self.initial_fall_velocity = 3.0
+
+    ## @var fall_acceleration
+    # The increase of the fall velocity in meters per second squared.
+    self.fall_acceleration = 18.0
 
     ## @var height_modification_factor
-    # Scaling factor used for the modification of up and down vectors.
-    self.height_modification_factor = 0.15
+    # Fraction of the height difference to the ground that is corrected per navigation step when climbing.
+    self.height_modification_factor = 1.0 - math.pow(1.0 - 0.15, self.timestep.step_factor)
 
-    # fall velocity in meter per frame
+    # fall velocity in meter per second
     ## @var fall_velocity
-    # Speed when the user is falling in meters per frame.
+    # Speed when the user is falling in meters per second.
     self.fall_velocity = self.initial_fall_velocity
 
     # pick length in meter
@@ -94,10 +109,6 @@ class GroundFollowing(avango.script.Script):
     # Length of the ground following ray.
     self.ground_pick_length = 100.0
 
-    ## @var ground_pick_direction_mat
-    # Direction of the ground following ray.
-    self.ground_pick_direction_mat = avango.gua.make_identity_mat()
-
     ## @var SCENEGRAPH
     # Reference to the scenegraph to intersect the ground following ray with.
     self.SCENEGRAPH = scenegraphs[0]
@@ -106,30 +117,33 @@ class GroundFollowing(avango.script.Script):
     # Starting height of the ground following ray.
     self.ray_start_height = RAY_START_HEIGHT
 
-    # initialize shoot and output matrices
-    self.sf_abs_output_mat.value = self.sf_abs_input_mat.value
+    ## @var last_ray_start
+    # Tuple of the ray start position and scale of the last ground height lookup.
+    self.last_ray_start = None
 
-    self.set_pick_direction(avango.gua.Vec3(0.0, -1.0, 0.0))
+    ## @var last_ground_height
+    # Ground height found by the last lookup, None if no ground was found.
+    self.last_ground_height = None
+
+    # initialize output matrix
+    self.sf_abs_output_mat.value = self.sf_abs_input_mat.value
 
     # init field connections
     self.sf_station_mat.connect_from(SF_STATION_MAT)
 
-    # init internal class
-    ## @var ground_intersection
-    # Intersection class to determine the intersections of the ground following ray with the objects in the scenegraph.
-    self.ground_intersection = Intersection()
-    self.ground_intersection.my_constructor(self.SCENEGRAPH, self.sf_gf_start_mat, self.ground_pick_length, "gf_pick_group")
-    self.mf_ground_pick_result.connect_from(self.ground_intersection.mf_pick_result)
+    if GroundFollowing.terrain_height_cache == None:
+      GroundFollowing.terrain_height_cache = TerrainHeightCache(self.SCENEGRAPH, "gf_pick_group", self.ground_pick_length, terrain_height_cache_cell_size)
 
 
   ## Evaluated every frame.
   def evaluate(self):
     if self.activated == True:
-      # platform translation in the world
-      _platform_trans_vec = self.sf_abs_input_mat.value.get_translate()
 
-      # tracked device translation on the platform
-      _device_trans_vec = self.sf_station_mat.value.get_translate()
+      _steps = self.timestep.advance()
+
+      if _steps == 0:
+        self.sf_abs_output_mat.value = self.sf_abs_input_mat.value          # no navigation step elapsed
+        return
 
       # prepare ground following matrix
       _gf_start_pos = self.sf_station_mat.value.get_translate()
@@ -137,51 +151,54 @@ class GroundFollowing(avango.script.Script):
       _gf_start_pos *= self.sf_scale.value
       _gf_start_pos = self.sf_abs_input_mat.value * _gf_start_pos
       _gf_start_pos = avango.gua.Vec3(_gf_start_pos.x, _gf_start_pos.y, _gf_start_pos.z)
-      self.sf_gf_start_mat.value = avango.gua.make_trans_mat(_gf_start_pos) * self.ground_pick_direction_mat
 
-      if len(self.mf_ground_pick_result.value) > 0: # an intersection with the ground was found
+      _ground_height = self.get_ground_height(_gf_start_pos)
 
-        # get first intersection target
-        _pick_result = self.mf_ground_pick_result.value[0]             
-        #print _pick_result.Object.value, _pick_result.Object.value.Name.value
+      if _ground_height != None: # an intersection with the ground was found
 
-        # compare distance to ground and ray_start_height
-        _distance_to_ground = _pick_result.Distance.value * self.ground_pick_length
-        _difference = _distance_to_ground - (self.ray_start_height * self.sf_scale.value)
-        _difference = round(_difference, 3)
+        _height = self.ray_start_height * self.sf_scale.value
+        _distance_to_ground = _gf_start_pos.y - _ground_height
 
-        if _difference < 0: # climb up
+        # vertical correction accumulated over the steps
+        _offset = 0.0
 
-          # end falling when necessary
-          if self.falling:
-            self.falling = False
-            self.fall_velocity = self.initial_fall_velocity 
+        for _i in range(_steps):
 
-          # move player up
-          _up_vec = avango.gua.Vec3(0.0, _difference * -1.0 * self.height_modification_factor, 0.0)
-          self.sf_abs_output_mat.value = avango.gua.make_trans_mat(_up_vec) * self.sf_abs_input_mat.value
+          # compare distance to ground and ray_start_height
+          _difference = _distance_to_ground + _offset - _height
+          _difference = round(_difference, 3)
 
-        elif _difference > 0:
-          
-          if _difference > (self.ray_start_height * self.sf_scale.value): # falling
+          if _difference < 0: # climb up
 
-            # make player fall down faster every time
-            self.falling = True
-            _fall_vec = avango.gua.Vec3(0.0, -self.fall_velocity, 0.0)
-            self.sf_abs_output_mat.value = avango.gua.make_trans_mat(_fall_vec) * self.sf_abs_input_mat.value
-            self.fall_velocity += 0.005
-
-          else: # climb down
-            
             # end falling when necessary
             if self.falling:
               self.falling = False
-              self.fall_velocity = self.initial_fall_velocity 
+              self.fall_velocity = self.initial_fall_velocity
+
+            # move player up
+            _offset -= _difference * self.height_modification_factor
+
+          elif _difference > 0:
+
+            if _difference > _height: # falling
+
+              # make player fall down faster every time
+              self.falling = True
+              _offset -= self.fall_velocity * self.timestep.step_time
+              self.fall_velocity += self.fall_acceleration * self.timestep.step_time
 
-            # move player down
-            _down_vec = avango.gua.Vec3(0.0, _difference * -1.0 * self.height_modification_factor, 0.0)
-            self.sf_abs_output_mat.value = avango.gua.make_trans_mat(_down_vec) * self.sf_abs_input_mat.value
+            else: # climb down
 
+              # end falling when necessary
+              if self.falling:
+                self.falling = False
+                self.fall_velocity = self.initial_fall_velocity
+
+              # move player down
+              _offset -= _difference * self.height_modification_factor
+
+        if _offset != 0.0:
+          self.sf_abs_output_mat.value = avango.gua.make_trans_mat(0.0, _offset, 0.0) * self.sf_abs_input_mat.value
         else:
           self.sf_abs_output_mat.value = self.sf_abs_input_mat.value        # player remains on ground
 
@@ -193,25 +210,30 @@ class GroundFollowing(avango.script.Script):
       self.sf_abs_output_mat.value = self.sf_abs_input_mat.value            # ground following is deactivated
 
 
-  ## Sets the pick_direction attribute.
-  # @param PICK_DIRECTION New pick direction.
-  def set_pick_direction(self, PICK_DIRECTION):
+  ## Returns the height of the ground below a ray start position, None if no ground was found.
+  # The terrain height cache is only queried if the position, the scale or the cache changed since the last call.
+  # @param RAY_START_POS The start position of the ground following ray in world coordinates.
+  def get_ground_height(self, RAY_START_POS):
 
-    PICK_DIRECTION.normalize()
-    
-    _ref = avango.gua.Vec3(0.0,0.0,-1.0)
-    _angle = math.degrees(math.acos(_ref.dot(PICK_DIRECTION)))
-    _axis = _ref.cross(PICK_DIRECTION)
+    _ray_start = (RAY_START_POS.x, RAY_START_POS.y, RAY_START_POS.z, self.sf_scale.value, GroundFollowing.terrain_height_cache.invalidation_time)
 
-    self.ground_pick_direction_mat = avango.gua.make_rot_mat(_angle, _axis)
+    if _ray_start != self.last_ray_start:
+      self.last_ground_height = GroundFollowing.terrain_height_cache.get_ground_height(RAY_START_POS, self.sf_scale.value)
+      self.last_ray_start = _ray_start
+
+    return self.last_ground_height
 
 
   ## Activates the ground following algorithm.
   def activate(self):
     self.activated = True
-    self.ground_intersection.activate(True)
+    self.timestep.reset()
+
+    # the ground height is checked every frame, even if the input matrix does not change
+    self.always_evaluate(True)
 
   ## Deactivates the ground following algorithm. The input matrix is just passed through after calling this method.
   def deactivate(self):
     self.activated = False
-    self.ground_intersection.activate(False)
+    self.last_ray_start = None
+    self.always_evaluate(False)
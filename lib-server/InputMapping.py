@@ -12,15 +12,26 @@ from avango.script import field_has_changed
 
 # import framework libraries
 from GroundFollowing import *
+from FixedTimestep import FixedTimestep
+from scene_config import navigation_step_time
+from scene_config import navigation_max_steps
 import Utilities
 
 # import of other libraries
+import collections
 import time
 import math
 
 
 ## This class accumulates the relative device inputs to an absolute matrix forwarded to the platform
 # and uses an instance of GroundFollowing to correct this matrix with respect to gravity.
+#
+# The device inputs are buffered with their arrival time and integrated in navigation steps of a
+# fixed duration, each step using the last input sample that arrived before it. The input values are
+# given per step of FixedTimestep.reference_step_time, so the navigation speed does not depend on the
+# frame rate. The forwarded matrix is interpolated between the last two steps. Changes of sf_abs_mat
+# that were not caused by the steps, e.g. ground following corrections or set_abs_mat, are applied to
+# both steps.
 class InputMapping(avango.script.Script):
 
   ## @var mf_rel_input_values
@@ -62,9 +73,41 @@ class InputMapping(avango.script.Script):
     # Boolean variable indicating if the device input is blocked (e.g. when in coupling animation)
     self.blocked = False
 
-    ## @var lf_quat_angle
-    # Quaternion angle of last frame to prevent blackscreen. Used if new angle is nan.
-    self.lf_quat_angle = 0.0
+    ## @var timestep
+    # FixedTimestep dividing the elapsed time into navigation steps.
+    self.timestep = FixedTimestep(navigation_step_time, navigation_max_steps)
+
+    ## @var input_samples
+    # Buffer of the received device inputs as tuples of arrival time and input values, not consumed by a navigation step yet.
+    self.input_samples = collections.deque(maxlen = 64)
+
+    ## @var input_values
+    # The device input values applied by the navigation steps.
+    self.input_values = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+    ## @var previous_step_mat
+    # The absolute matrix after the second to last navigation step.
+    self.previous_step_mat = avango.gua.make_identity_mat()
+
+    ## @var current_step_mat
+    # The absolute matrix after the last navigation step.
+    self.current_step_mat = avango.gua.make_identity_mat()
+
+    ## @var interpolating
+    # Boolean saying if previous_step_mat and current_step_mat differ.
+    self.interpolating = False
+
+    ## @var new_abs_mat
+    # Preallocated matrix into which the interpolated matrix is written before it is set on sf_abs_uncorrected_mat.
+    self.new_abs_mat = avango.gua.make_identity_mat()
+
+    ## @var forwarded_mat
+    # The matrix sf_abs_mat is expected to have if no other changes occurred, None if the steps have to be restarted from sf_abs_mat.
+    self.forwarded_mat = None
+
+    ## @var forwarded_mat_key
+    # Matrix key of forwarded_mat.
+    self.forwarded_mat_key = None
 
     # factors for input amplifying
     ## @var input_trans_factor
@@ -130,108 +173,263 @@ class InputMapping(avango.script.Script):
     # set the starting position
     self.set_abs_mat(STARTING_MATRIX)
 
+    # the navigation steps are taken every frame
+    self.timestep.reset()
+    self.always_evaluate(True)
 
-  ## Evaluated when device input values change.
+
+  ## Evaluated when device input values change. Buffers the input values for the next navigation steps.
   @field_has_changed(mf_rel_input_values)
   def mf_rel_input_values_changed(self):
-    
-    if self.blocked == False:
 
-      # map scale input
-      _scale_input = self.mf_rel_input_values.value[6]
-      if _scale_input != 0.0:
-        self.set_scale(self.sf_scale.value * (1.0 + _scale_input * 0.015))
-      
-      _x = self.mf_rel_input_values.value[0]
-      _y = self.mf_rel_input_values.value[1]
-      _z = self.mf_rel_input_values.value[2]
-
-      _rx = self.mf_rel_input_values.value[3]
-      _ry = self.mf_rel_input_values.value[4]
-      _rz = self.mf_rel_input_values.value[5]
-
-      # invert movement if activated
-      if self.invert:
-        _x = -_x
-        _y = -_y
-        _z = -_z
-        _rx = -_rx
-        _ry = -_ry
-        _rz = -_rz
- 
-      # delete certain values that create an unrealistic movement
-      if self.realistic:
-        _y = 0.0
-        _rx = 0.0
-        _rz = 0.0
-      
-      # get translation values from input device
-      _trans_vec = avango.gua.Vec3(_x,_y,_z)
-      _trans_input = _trans_vec.length()
-
-      # get rotation values from input device
-      _rot_vec = avango.gua.Vec3(_rx,_ry,_rz) * self.input_rot_factor
-      _rot_input = _rot_vec.length()
- 
-      # only accumulate inputs on absolute matrix when the device values change
-      if _trans_input != 0.0 or _rot_input != 0.0:
-
-        # transfer function for translation
-        if _trans_input != 0.0:
-          _trans_vec.normalize()
-          _trans_vec *= math.pow(min(_trans_input,1.0), 3) * self.input_trans_factor * self.sf_scale.value
-
-        # global platform rotation in the world
-        _platform_quat = self.sf_abs_mat.value.get_rotate()
-
-        # Fix if quaternion angle is nan
-        _quat_angle = _platform_quat.get_angle()
-
-        if math.isnan(_quat_angle) == False:
-          _platform_rot_mat = avango.gua.make_rot_mat(_quat_angle, _platform_quat.get_axis())
-          self.lf_quat_angle = _quat_angle
-        else:
-          _platform_rot_mat = avango.gua.make_rot_mat(self.lf_quat_angle, _platform_quat.get_axis())
-
-        # global rotation of the device in the world
-        _device_forward_yaw = Utilities.get_yaw(self.sf_station_mat.value)
-        _device_rot_mat = avango.gua.make_rot_mat(math.degrees(_device_forward_yaw), 0, 1, 0)
-
-        # combined platform and device rotation
-        _combined_rot_mat = _platform_rot_mat * _device_rot_mat
-   
-        # rotation center of the device
-        _rot_center = self.sf_station_mat.value.get_translate() * self.sf_scale.value
-
-        # transformed translation, rotation and rotation center
-        _transformed_trans_vec = self.transform_vector_with_matrix(_trans_vec, _combined_rot_mat)
-
-        _transformed_rot_vec = self.transform_vector_with_matrix(_rot_vec, _combined_rot_mat)
-        _transformed_rot_center = self.transform_vector_with_matrix(_rot_center, _platform_rot_mat)
-        
-        # create new transformation matrix
-        _new_mat = avango.gua.make_trans_mat(_transformed_trans_vec) * \
-                   self.sf_abs_mat.value * \
-                   avango.gua.make_trans_mat(_rot_center) * \
-                   avango.gua.make_rot_mat( _rot_vec.y, 0, 1, 0) * \
-                   avango.gua.make_rot_mat( _rot_vec.x, 1, 0, 0) * \
-                   avango.gua.make_rot_mat( _rot_vec.z, 0, 0, 1) * \
-                   avango.gua.make_trans_mat(_rot_center * -1)
-
-        '''
-        # update matrix on coupled navigations
-        _global_rot_center = self.sf_abs_mat.value * _rot_center
-        _global_rot_center = avango.gua.Vec3(_global_rot_center.x, _global_rot_center.y, _global_rot_center.z)
-
-        for _navigation in self.NAVIGATION.coupled_navigations:
-          _navigation.inputmapping.modify_abs_uncorrected_mat(_transformed_trans_vec, _transformed_rot_vec, _global_rot_center)
-        '''
-      else:
-        # the device values are all equal to zero
-        _new_mat = self.sf_abs_mat.value
-
-      # save the computed new matrix
-      self.sf_abs_uncorrected_mat.value = _new_mat    
+    self.input_samples.append( (FixedTimestep.clock(), list(self.mf_rel_input_values.value)) )
+
+  ## Evaluated every frame. Takes the elapsed navigation steps and forwards the interpolated matrix.
+  def evaluate(self):
+
+    _abs_mat = self.sf_abs_mat.value
+
+    if self.forwarded_mat == None:
+      # restart the steps from the current matrix
+      self.copy_matrix(_abs_mat, self.previous_step_mat)
+      self.copy_matrix(_abs_mat, self.current_step_mat)
+      self.interpolating = False
+      self.forwarded_mat = _abs_mat
+      self.forwarded_mat_key = Utilities.get_matrix_key(_abs_mat)
+
+    else:
+      _abs_mat_key = Utilities.get_matrix_key(_abs_mat)
+
+      if _abs_mat_key != self.forwarded_mat_key:
+        # apply the change of the forwarded matrix, e.g. by ground following, to both steps
+        _correction_mat = _abs_mat * avango.gua.make_inverse_mat(self.forwarded_mat)
+        self.previous_step_mat = _correction_mat * self.previous_step_mat
+        self.current_step_mat = _correction_mat * self.current_step_mat
+        self.forwarded_mat = _abs_mat
+        self.forwarded_mat_key = _abs_mat_key
+
+    _was_interpolating = self.interpolating
+    _steps = self.timestep.advance()
+
+    for _i in range(_steps):
+
+      # use the last input sample that arrived before the step
+      _step_time = self.timestep.get_step_time(_i, _steps)
+
+      while len(self.input_samples) > 0 and self.input_samples[0][0] <= _step_time:
+        self.input_values = self.input_samples.popleft()[1]
+
+      # the new step is written to the buffer of the previous step, then the buffers are swapped
+      if self.map_input_values(self.input_values, self.current_step_mat, self.previous_step_mat):
+        self.previous_step_mat, self.current_step_mat = self.current_step_mat, self.previous_step_mat
+        self.interpolating = True
+
+      elif self.interpolating:
+        self.copy_matrix(self.current_step_mat, self.previous_step_mat)
+        self.interpolating = False
+
+    # samples that arrived before dropped time are not applied anymore
+    while len(self.input_samples) > 0 and self.input_samples[0][0] <= self.timestep.time:
+      self.input_values = self.input_samples.popleft()[1]
+
+    if self.interpolating == False and _was_interpolating == False:
+      return
+
+    # forward the matrix interpolated between the last two steps
+    _alpha = self.timestep.get_alpha()
+
+    for _row in range(3):
+      for _column in range(4):
+        _previous_value = self.previous_step_mat.get_element(_row, _column)
+        self.new_abs_mat.set_element(_row, _column, _previous_value + (self.current_step_mat.get_element(_row, _column) - _previous_value) * _alpha)
+
+    self.sf_abs_uncorrected_mat.value = self.new_abs_mat
+    self.forwarded_mat = self.new_abs_mat
+    self.forwarded_mat_key = Utilities.get_matrix_key(self.new_abs_mat)
+
+  ## Applies the device input values of one navigation step to a matrix.
+  # @param VALUES The seven device input values [trans_x, trans_y, trans_z, pitch, head, roll, scale], given per reference step.
+  # @param MATRIX The absolute matrix before the step.
+  # @param RESULT_MAT Matrix the absolute matrix after the step is written to.
+  def map_input_values(self, VALUES, MATRIX, RESULT_MAT):
+
+    if self.blocked:
+      return False
+
+    _step_factor = self.timestep.step_factor
+
+    # map scale input
+    _scale_input = VALUES[6]
+    if _scale_input != 0.0:
+      self.set_scale(self.sf_scale.value * (1.0 + _scale_input * 0.015 * _step_factor))
+
+    _x = VALUES[0]
+    _y = VALUES[1]
+    _z = VALUES[2]
+
+    _rx = VALUES[3]
+    _ry = VALUES[4]
+    _rz = VALUES[5]
+
+    # invert movement if activated
+    if self.invert:
+      _x = -_x
+      _y = -_y
+      _z = -_z
+      _rx = -_rx
+      _ry = -_ry
+      _rz = -_rz
+
+    # delete certain values that create an unrealistic movement
+    if self.realistic:
+      _y = 0.0
+      _rx = 0.0
+      _rz = 0.0
+
+    # get translation values from input device
+    _trans_input = math.sqrt(_x * _x + _y * _y + _z * _z)
+
+    # get rotation values from input device
+    _rx *= self.input_rot_factor * _step_factor
+    _ry *= self.input_rot_factor * _step_factor
+    _rz *= self.input_rot_factor * _step_factor
+
+    # only accumulate inputs on absolute matrix when the device values change
+    if _trans_input == 0.0 and _rx == 0.0 and _ry == 0.0 and _rz == 0.0:
+      return False
+
+    # transfer function for translation
+    if _trans_input != 0.0:
+      _trans_factor = math.pow(min(_trans_input,1.0), 3) * self.input_trans_factor * self.sf_scale.value * _step_factor / _trans_input
+      _x *= _trans_factor
+      _y *= _trans_factor
+      _z *= _trans_factor
+
+    self.compute_new_abs_mat(MATRIX, _x, _y, _z, _rx, _ry, _rz, RESULT_MAT)
+    return True
+
+  ## Computes the new absolute matrix from a given one and the mapped device inputs.
+  # The translation is applied in the direction of the platform rotation combined with the device yaw,
+  # the rotation is applied around the device position. This is the fused form of
+  # make_trans_mat(transformed translation) * MATRIX * make_trans_mat(center) * rotation * make_trans_mat(-center),
+  # evaluated on floats and written into a preallocated matrix.
+  # @param MATRIX The absolute matrix to apply the inputs to.
+  # @param X Translation input in x direction, already scaled.
+  # @param Y Translation input in y direction, already scaled.
+  # @param Z Translation input in z direction, already scaled.
+  # @param RX Rotation input around the x axis in degrees.
+  # @param RY Rotation input around the y axis in degrees.
+  # @param RZ Rotation input around the z axis in degrees.
+  # @param RESULT_MAT Matrix the new absolute matrix is written to, must not be MATRIX.
+  def compute_new_abs_mat(self, MATRIX, X, Y, Z, RX, RY, RZ, RESULT_MAT):
+
+    _abs_mat = MATRIX
+    _station_mat = self.sf_station_mat.value
+    _scale = self.sf_scale.value
+
+    # current platform matrix
+    _m00 = _abs_mat.get_element(0, 0)
+    _m01 = _abs_mat.get_element(0, 1)
+    _m02 = _abs_mat.get_element(0, 2)
+    _m03 = _abs_mat.get_element(0, 3)
+    _m10 = _abs_mat.get_element(1, 0)
+    _m11 = _abs_mat.get_element(1, 1)
+    _m12 = _abs_mat.get_element(1, 2)
+    _m13 = _abs_mat.get_element(1, 3)
+    _m20 = _abs_mat.get_element(2, 0)
+    _m21 = _abs_mat.get_element(2, 1)
+    _m22 = _abs_mat.get_element(2, 2)
+    _m23 = _abs_mat.get_element(2, 3)
+
+    # new translation, starting with the current one
+    _t0 = _m03
+    _t1 = _m13
+    _t2 = _m23
+
+    if X != 0.0 or Y != 0.0 or Z != 0.0:
+
+      # global platform rotation in the world
+      _qx, _qy, _qz, _qw = Utilities.get_rotation_quat_elements(_abs_mat)
+
+      _p00 = 1.0 - 2.0 * (_qy * _qy + _qz * _qz)
+      _p01 = 2.0 * (_qx * _qy - _qz * _qw)
+      _p02 = 2.0 * (_qx * _qz + _qy * _qw)
+      _p10 = 2.0 * (_qx * _qy + _qz * _qw)
+      _p11 = 1.0 - 2.0 * (_qx * _qx + _qz * _qz)
+      _p12 = 2.0 * (_qy * _qz - _qx * _qw)
+      _p20 = 2.0 * (_qx * _qz - _qy * _qw)
+      _p21 = 2.0 * (_qy * _qz + _qx * _qw)
+      _p22 = 1.0 - 2.0 * (_qx * _qx + _qy * _qy)
+
+      # global rotation of the device in the world
+      _device_forward_yaw = Utilities.get_yaw_from_quat_elements(*Utilities.get_rotation_quat_elements(_station_mat))
+      _cos_yaw = math.cos(_device_forward_yaw)
+      _sin_yaw = math.sin(_device_forward_yaw)
+
+      # translation rotated by the device yaw, then by the platform rotation
+      _yx = _cos_yaw * X + _sin_yaw * Z
+      _yz = _cos_yaw * Z - _sin_yaw * X
+
+      _t0 += _p00 * _yx + _p01 * Y + _p02 * _yz
+      _t1 += _p10 * _yx + _p11 * Y + _p12 * _yz
+      _t2 += _p20 * _yx + _p21 * Y + _p22 * _yz
+
+    if RX != 0.0 or RY != 0.0 or RZ != 0.0:
+
+      # rotation around y, x and z axes in this order
+      _rad_x = math.radians(RX)
+      _rad_y = math.radians(RY)
+      _rad_z = math.radians(RZ)
+      _cx = math.cos(_rad_x)
+      _sx = math.sin(_rad_x)
+      _cy = math.cos(_rad_y)
+      _sy = math.sin(_rad_y)
+      _cz = math.cos(_rad_z)
+      _sz = math.sin(_rad_z)
+
+      _r00 = _cy * _cz + _sy * _sx * _sz
+      _r01 = _sy * _sx * _cz - _cy * _sz
+      _r02 = _sy * _cx
+      _r10 = _cx * _sz
+      _r11 = _cx * _cz
+      _r12 = -_sx
+      _r20 = _cy * _sx * _sz - _sy * _cz
+      _r21 = _sy * _sz + _cy * _sx * _cz
+      _r22 = _cy * _cx
+
+      # rotation center of the device
+      _c0 = _station_mat.get_element(0, 3) * _scale
+      _c1 = _station_mat.get_element(1, 3) * _scale
+      _c2 = _station_mat.get_element(2, 3) * _scale
+
+      # offset of the rotation center caused by the rotation
+      _d0 = _c0 - (_r00 * _c0 + _r01 * _c1 + _r02 * _c2)
+      _d1 = _c1 - (_r10 * _c0 + _r11 * _c1 + _r12 * _c2)
+      _d2 = _c2 - (_r20 * _c0 + _r21 * _c1 + _r22 * _c2)
+
+      _t0 += _m00 * _d0 + _m01 * _d1 + _m02 * _d2
+      _t1 += _m10 * _d0 + _m11 * _d1 + _m12 * _d2
+      _t2 += _m20 * _d0 + _m21 * _d1 + _m22 * _d2
+
+      _m00, _m01, _m02 = _m00 * _r00 + _m01 * _r10 + _m02 * _r20, _m00 * _r01 + _m01 * _r11 + _m02 * _r21, _m00 * _r02 + _m01 * _r12 + _m02 * _r22
+      _m10, _m11, _m12 = _m10 * _r00 + _m11 * _r10 + _m12 * _r20, _m10 * _r01 + _m11 * _r11 + _m12 * _r21, _m10 * _r02 + _m11 * _r12 + _m12 * _r22
+      _m20, _m21, _m22 = _m20 * _r00 + _m21 * _r10 + _m22 * _r20, _m20 * _r01 + _m21 * _r11 + _m22 * _r21, _m20 * _r02 + _m21 * _r12 + _m22 * _r22
+
+    _new_mat = RESULT_MAT
+    _new_mat.set_element(0, 0, _m00)
+    _new_mat.set_element(0, 1, _m01)
+    _new_mat.set_element(0, 2, _m02)
+    _new_mat.set_element(0, 3, _t0)
+    _new_mat.set_element(1, 0, _m10)
+    _new_mat.set_element(1, 1, _m11)
+    _new_mat.set_element(1, 2, _m12)
+    _new_mat.set_element(1, 3, _t1)
+    _new_mat.set_element(2, 0, _m20)
+    _new_mat.set_element(2, 1, _m21)
+    _new_mat.set_element(2, 2, _m22)
+    _new_mat.set_element(2, 3, _t2)
+
+    return _new_mat
 
   ## Modify the uncorrected matrix of this input mapping with specific values. Used for coupling purposes.
   # @param TRANSFORMED_TRANS_VECTOR The translation vector to be applied.
@@ -259,6 +457,15 @@ class InputMapping(avango.script.Script):
     # save the computed new matrix
     self.sf_abs_mat.value = _new_mat
   
+  ## Copies the affine part of a matrix into another one without creating a new matrix.
+  # @param SOURCE_MAT The matrix to be copied.
+  # @param TARGET_MAT The matrix to be overwritten.
+  def copy_matrix(self, SOURCE_MAT, TARGET_MAT):
+
+    for _row in range(3):
+      for _column in range(4):
+        TARGET_MAT.set_element(_row, _column, SOURCE_MAT.get_element(_row, _column))
+
   ## Transforms a vector using a transformation matrix.
   # @param VECTOR The vector to be transformed.
   # @param MATRIX The matrix to be applied for transformation.
@@ -266,10 +473,11 @@ class InputMapping(avango.script.Script):
     _trans_vec = MATRIX * VECTOR
     return avango.gua.Vec3(_trans_vec.x, _trans_vec.y, _trans_vec.z)
 
-  ## Set a value for sf_abs_mat.
+  ## Set a value for sf_abs_mat. The navigation steps are restarted from this matrix.
   # @param MATRIX The matrix to be set to.
   def set_abs_mat(self, MATRIX):
     self.sf_abs_mat.value = MATRIX
+    self.forwarded_mat = None
 
   ## Sets the translation and rotation input factors.
   # @param TRANSLATION_FACTOR Translation modification factor to be set. 1.0 by default.
@@ -0,0 +1,763 @@
+#!/usr/bin/python
+
+## @file
+# Contains class InteractiveObjectStore.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+
+# import framework libraries
+from TerrainHeightCache import TerrainHeightCache
+from Visualization import BoundingBoxVisualization
+
+# import python libraries
+import array
+
+## Compact storage of the interactive objects of a scene.
+#
+# The objects are identified by their index in the store. Their hierarchy, flags, hierarchy levels,
+# render groups, matrices and bounding boxes are kept in parallel arrays instead of one script per
+# object. The children of an object are linked by first child, last child and next sibling indices.
+# Each object additionally stores the indices of its ancestors per hierarchy level, so the ancestor
+# at a given level is found without walking the parent chain.
+#
+# The scenegraph node of an object carries the fields InteractiveObjectStore and InteractiveObjectIndex
+# to find its entry, e.g. from a pick result. An InteractiveObject script is only created by get_object
+# for objects that are actually selected or manipulated. Scripts have no state of their own, so the store
+# drops the script of an object when its highlight ends.
+#
+# Highlighted objects are displayed by BoundingBoxVisualization instances attached directly to their
+# store entries, without scripts for the descendants. Visualizations released by ended highlights
+# are kept and reused for the next highlight.
+#
+# Matrices are stored as 16 floats in row-major order. The world matrices are cached relative to the
+# parent node of the top-level object and recomputed from the local matrices when invalidated.
+class InteractiveObjectStore:
+
+  ## @var stores
+  # List of all created stores, indexed by their id. Cleared stores are replaced by None.
+  stores = []
+
+  # flag bits
+  ## @var FLAG_GF_PICK
+  # The object is pickable for GroundFollowing purposes.
+  FLAG_GF_PICK = 1
+
+  ## @var FLAG_MAN_PICK
+  # The object is pickable for manipulation purposes.
+  FLAG_MAN_PICK = 2
+
+  ## @var FLAG_HIGHLIGHT
+  # The object is highlighted.
+  FLAG_HIGHLIGHT = 4
+
+  ## @var FLAG_WORLD_VALID
+  # The cached world matrix is up to date.
+  FLAG_WORLD_VALID = 8
+
+  ## @var FLAG_GEOMETRY_BB_RESOLVED
+  # The geometry bounding box was read from the scenegraph.
+  FLAG_GEOMETRY_BB_RESOLVED = 16
+
+  ## @var FLAG_GEOMETRY_BB_EMPTY
+  # The node has no geometry.
+  FLAG_GEOMETRY_BB_EMPTY = 32
+
+  ## @var FLAG_BB_VALID
+  # The cached bounding box is up to date.
+  FLAG_BB_VALID = 64
+
+  ## @var FLAG_BB_EMPTY
+  # The cached bounding box is empty.
+  FLAG_BB_EMPTY = 128
+
+  ## Custom constructor.
+  # @param SCENE The SceneObject instance the objects belong to.
+  # @param OBJECT_CLASS The class of the scripts created by get_object.
+  def __init__(self, SCENE, OBJECT_CLASS):
+
+    ## @var SCENE
+    # Reference to the SceneObject instance the objects belong to.
+    self.SCENE = SCENE
+
+    ## @var object_class
+    # The class of the scripts created by get_object.
+    self.object_class = OBJECT_CLASS
+
+    ## @var id
+    # Index of this store in InteractiveObjectStore.stores.
+    self.id = len(InteractiveObjectStore.stores)
+    InteractiveObjectStore.stores.append(self)
+
+    ## @var nodes
+    # List of the scenegraph nodes of the objects.
+    self.nodes = []
+
+    ## @var objects
+    # List of the created InteractiveObject scripts, None for objects without script.
+    self.objects = []
+
+    ## @var box_visualizations
+    # Dictionary mapping the indices of the highlighted objects to the BoundingBoxVisualization instances displaying them.
+    self.box_visualizations = {}
+
+    ## @var free_box_visualizations
+    # List of the created BoundingBoxVisualization instances which are currently not attached to an object.
+    self.free_box_visualizations = []
+
+    ## @var number_of_box_visualizations
+    # Number of BoundingBoxVisualization instances created by this store.
+    self.number_of_box_visualizations = 0
+
+    ## @var scene_paths
+    # List of the scenegraph paths of the nodes relative to the scene root, maintained by the SceneObject. None if not below the scene root.
+    self.scene_paths = []
+
+    ## @var root_parent_nodes
+    # Dictionary mapping the indices of top-level objects to the scenegraph nodes they are appended to.
+    self.root_parent_nodes = {}
+
+    ## @var parent_indices
+    # Index of the parent object of each object, -1 for top-level objects.
+    self.parent_indices = array.array('i')
+
+    ## @var first_child_indices
+    # Index of the first child object of each object, -1 if there is none.
+    self.first_child_indices = array.array('i')
+
+    ## @var last_child_indices
+    # Index of the last child object of each object, -1 if there is none.
+    self.last_child_indices = array.array('i')
+
+    ## @var next_sibling_indices
+    # Index of the next child object of the same parent, -1 if there is none.
+    self.next_sibling_indices = array.array('i')
+
+    ## @var levels
+    # Level of each object in the local hierarchy.
+    self.levels = array.array('i')
+
+    ## @var ancestor_indices
+    # List of the ancestor tables of the objects. The table of an object holds the index of its ancestor at each hierarchy level, ending with the object itself.
+    self.ancestor_indices = []
+
+    ## @var flags
+    # Combination of the FLAG_ bits of each object.
+    self.flags = array.array('B')
+
+    ## @var render_group_indices
+    # Index of the render group of each object in render_groups.
+    self.render_group_indices = array.array('H')
+
+    ## @var render_groups
+    # List of the distinct render group strings.
+    self.render_groups = []
+
+    ## @var home_matrices
+    # Initial local transformations of the objects, 16 floats per object.
+    self.home_matrices = array.array('d')
+
+    ## @var local_matrices
+    # Local transformations of the objects, 16 floats per object.
+    self.local_matrices = array.array('d')
+
+    ## @var world_matrices
+    # Cached transformations of the objects relative to the parent node of their top-level object, 16 floats per object.
+    self.world_matrices = array.array('d')
+
+    ## @var geometry_bbs
+    # Bounding boxes of the nodes' geometries in local coordinates as minimum and maximum, 6 floats per object.
+    self.geometry_bbs = array.array('d')
+
+    ## @var bbs
+    # Cached bounding boxes of the objects including their child objects in local coordinates, 6 floats per object.
+    self.bbs = array.array('d')
+
+    ## @var unresolved_indices
+    # List of the objects whose geometry bounding box was not read from the scenegraph yet.
+    self.unresolved_indices = []
+
+  ## Returns the InteractiveObject script of a scenegraph node, which is created if necessary. None if the node does not belong to an interactive object.
+  # @param NODE The scenegraph node, e.g. of a pick result.
+  # @param HIERARCHY_LEVEL If not negative, the script of the object's ancestor at this hierarchy level is returned instead, None if there is none.
+  @staticmethod
+  def get_object_of_node(NODE, HIERARCHY_LEVEL = -1):
+
+    if NODE.has_field("InteractiveObjectIndex") == False:
+      return None
+
+    _store = InteractiveObjectStore.stores[NODE.InteractiveObjectStore.value]
+
+    if _store == None:
+      return None
+
+    _index = NODE.InteractiveObjectIndex.value
+
+    if HIERARCHY_LEVEL >= 0:
+      _index = _store.get_ancestor_at_level(_index, HIERARCHY_LEVEL)
+
+      if _index < 0:
+        return None
+
+    return _store.get_object(_index)
+
+  ## Returns the 16 elements of a matrix in row-major order.
+  # @param MATRIX The matrix to be read.
+  @staticmethod
+  def get_matrix_values(MATRIX):
+
+    return [MATRIX.get_element(_i // 4, _i % 4) for _i in range(16)]
+
+  ## Creates a matrix from 16 elements in row-major order.
+  # @param VALUES The array holding the elements.
+  # @param OFFSET The position of the first element in VALUES.
+  @staticmethod
+  def make_matrix(VALUES, OFFSET):
+
+    _mat = avango.gua.make_identity_mat()
+
+    for _i in range(16):
+      _mat.set_element(_i // 4, _i % 4, VALUES[OFFSET + _i])
+
+    return _mat
+
+  ## Returns the axis-aligned bounding box of a transformed bounding box as 6 floats, None if the box is empty.
+  # @param BB Sequence of the minimum and maximum of the box to be transformed.
+  # @param VALUES The array holding the affine transformation in row-major order.
+  # @param OFFSET The position of the first matrix element in VALUES.
+  @staticmethod
+  def transform_bb(BB, VALUES, OFFSET):
+
+    if BB[0] > BB[3] or BB[1] > BB[4] or BB[2] > BB[5]:
+      return None
+
+    _m = VALUES[OFFSET:OFFSET + 12]
+
+    # transformed center plus the extent of the transformed half axes
+    _cx = (BB[0] + BB[3]) * 0.5
+    _cy = (BB[1] + BB[4]) * 0.5
+    _cz = (BB[2] + BB[5]) * 0.5
+    _hx = (BB[3] - BB[0]) * 0.5
+    _hy = (BB[4] - BB[1]) * 0.5
+    _hz = (BB[5] - BB[2]) * 0.5
+
+    _bb = []
+
+    for _row in (0, 4, 8):
+      _center = _m[_row] * _cx + _m[_row + 1] * _cy + _m[_row + 2] * _cz + _m[_row + 3]
+      _extent = abs(_m[_row]) * _hx + abs(_m[_row + 1]) * _hy + abs(_m[_row + 2]) * _hz
+      _bb.append(_center - _extent)
+      _bb.append(_center + _extent)
+
+    return (_bb[0], _bb[2], _bb[4], _bb[1], _bb[3], _bb[5])
+
+  ## Returns the number of objects in the store.
+  def get_number_of_objects(self):
+
+    return len(self.nodes)
+
+  ## Adds an object for a scenegraph node and appends the node to its parent.
+  # @param NODE Scenegraph node for which an interactive object is to be created.
+  # @param PARENT_INDEX Index of the parent object, -1 for top-level objects.
+  # @param PARENT_NODE Scenegraph node to append a top-level object to.
+  # @param GROUNDFOLLOWING_PICK_FLAG Boolean indicating if the node should be pickable for GroundFollowing purposes.
+  # @param MANIPULATION_PICK_FLAG Boolean indicating if the node should be pickable for manipulation purposes.
+  # @param RENDER_GROUP The render group to be associated with the node.
+  def add_object(self, NODE, PARENT_INDEX, PARENT_NODE, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP):
+
+    _index = len(self.nodes)
+
+    self.nodes.append(NODE)
+    self.objects.append(None)
+    self.scene_paths.append(None)
+
+    self.parent_indices.append(-1)
+    self.first_child_indices.append(-1)
+    self.last_child_indices.append(-1)
+    self.next_sibling_indices.append(-1)
+    self.levels.append(0)
+    self.ancestor_indices.append(array.array('i', (_index,)))
+
+    _flags = 0
+
+    if GROUNDFOLLOWING_PICK_FLAG == True:
+      _flags |= InteractiveObjectStore.FLAG_GF_PICK
+
+    if MANIPULATION_PICK_FLAG == True:
+      _flags |= InteractiveObjectStore.FLAG_MAN_PICK
+
+    self.flags.append(_flags)
+
+    if RENDER_GROUP not in self.render_groups:
+      self.render_groups.append(RENDER_GROUP)
+
+    self.render_group_indices.append(self.render_groups.index(RENDER_GROUP))
+
+    _values = InteractiveObjectStore.get_matrix_values(NODE.Transform.value)
+    self.home_matrices.extend(_values)
+    self.local_matrices.extend(_values)
+    self.world_matrices.extend(_values)
+
+    self.geometry_bbs.extend( (0.0, 0.0, 0.0, 0.0, 0.0, 0.0) )
+    self.bbs.extend( (0.0, 0.0, 0.0, 0.0, 0.0, 0.0) )
+    self.unresolved_indices.append(_index)
+
+    self.add_node_reference(NODE, _index)
+
+    if PARENT_INDEX >= 0:
+      self.append_child(PARENT_INDEX, _index)
+
+    else:
+      self.root_parent_nodes[_index] = PARENT_NODE
+      PARENT_NODE.Children.value.append(NODE)
+      self.SCENE.index_object_path(_index)
+
+    self.enable_object(_index, True)
+
+    return _index
+
+  ## Marks a scenegraph node as belonging to an object, so that get_object_of_node returns the object for it.
+  # @param NODE The scenegraph node to be marked.
+  # @param INDEX Index of the object.
+  def add_node_reference(self, NODE, INDEX):
+
+    NODE.add_and_init_field(avango.SFInt(), "InteractiveObjectStore", self.id)
+    NODE.InteractiveObjectStore.dont_distribute(True)
+
+    NODE.add_and_init_field(avango.SFInt(), "InteractiveObjectIndex", INDEX)
+    NODE.InteractiveObjectIndex.dont_distribute(True)
+
+  ## Removes all objects from the store. Nodes referencing the store are not resolved anymore.
+  def clear(self):
+
+    InteractiveObjectStore.stores[self.id] = None
+
+  ## Returns the InteractiveObject script of an object, which is created on the first call.
+  # @param INDEX Index of the object.
+  def get_object(self, INDEX):
+
+    _object = self.objects[INDEX]
+
+    if _object == None:
+      _object = self.object_class()
+      self.objects[INDEX] = _object
+      _object.base_constructor(self, INDEX)
+
+    return _object
+
+  ## Returns the edge group nodes of all BoundingBoxVisualization instances created by this store.
+  def get_box_visualization_nodes(self):
+
+    _visualizations = list(self.box_visualizations.values()) + self.free_box_visualizations
+
+    return [_visualization.edge_group for _visualization in _visualizations]
+
+  ## Attaches a free or new BoundingBoxVisualization to an object and returns it.
+  # New visualizations are distributed by the scene when they are created.
+  # @param INDEX Index of the object.
+  def attach_box_visualization(self, INDEX):
+
+    if len(self.free_box_visualizations) > 0:
+      _visualization = self.free_box_visualizations.pop()
+
+    else:
+      _visualization = BoundingBoxVisualization(self.SCENE.get_net_trans_node())
+      self.number_of_box_visualizations += 1
+      self.SCENE.distribute_nodes([_visualization.edge_group])
+
+    _visualization.attach(self, INDEX, self.SCENE.get_scene_manager().get_hierarchy_material(self.levels[INDEX]))
+    self.box_visualizations[INDEX] = _visualization
+
+    return _visualization
+
+  ## Detaches the BoundingBoxVisualization of an object and keeps it for reuse.
+  # @param INDEX Index of the object.
+  def detach_box_visualization(self, INDEX):
+
+    _visualization = self.box_visualizations.pop(INDEX, None)
+
+    if _visualization != None:
+      _visualization.detach()
+      self.free_box_visualizations.append(_visualization)
+
+  ## Returns the indices of the child objects of an object.
+  # @param INDEX Index of the object.
+  def get_child_indices(self, INDEX):
+
+    _child_indices = []
+    _child_index = self.first_child_indices[INDEX]
+
+    while _child_index >= 0:
+      _child_indices.append(_child_index)
+      _child_index = self.next_sibling_indices[_child_index]
+
+    return _child_indices
+
+  ## Returns the indices of an object and all its descendants.
+  # @param INDEX Index of the object.
+  def get_subtree_indices(self, INDEX):
+
+    _indices = [INDEX]
+    _i = 0
+
+    while _i < len(_indices):
+      _child_index = self.first_child_indices[_indices[_i]]
+
+      while _child_index >= 0:
+        _indices.append(_child_index)
+        _child_index = self.next_sibling_indices[_child_index]
+
+      _i += 1
+
+    return _indices
+
+  ## Returns the index of the ancestor of an object at a hierarchy level, the object itself if it is at the level. -1 if there is none.
+  # @param INDEX Index of the object.
+  # @param HIERARCHY_LEVEL The hierarchy level to be searched for.
+  def get_ancestor_at_level(self, INDEX, HIERARCHY_LEVEL):
+
+    _ancestor_indices = self.ancestor_indices[INDEX]
+
+    if HIERARCHY_LEVEL < 0 or HIERARCHY_LEVEL >= len(_ancestor_indices):
+      return -1
+
+    return _ancestor_indices[HIERARCHY_LEVEL]
+
+  ## Recomputes the hierarchy levels and ancestor tables of an object and its descendants after the object was attached to a new parent.
+  # @param INDEX Index of the object.
+  def update_ancestor_indices(self, INDEX):
+
+    # parents are visited before their children
+    for _index in self.get_subtree_indices(INDEX):
+
+      _parent_index = self.parent_indices[_index]
+
+      if _parent_index >= 0:
+        _ancestor_indices = self.ancestor_indices[_parent_index] + array.array('i', (_index,))
+      else:
+        _ancestor_indices = array.array('i', (_index,))
+
+      self.ancestor_indices[_index] = _ancestor_indices
+      self.levels[_index] = len(_ancestor_indices) - 1
+
+  ## Appends an object as child of another object.
+  # @param PARENT_INDEX Index of the parent object.
+  # @param INDEX Index of the object to be appended.
+  def append_child(self, PARENT_INDEX, INDEX):
+
+    self.parent_indices[INDEX] = PARENT_INDEX
+    self.next_sibling_indices[INDEX] = -1
+
+    if self.last_child_indices[PARENT_INDEX] >= 0:
+      self.next_sibling_indices[self.last_child_indices[PARENT_INDEX]] = INDEX
+    else:
+      self.first_child_indices[PARENT_INDEX] = INDEX
+
+    self.last_child_indices[PARENT_INDEX] = INDEX
+
+    if INDEX in self.root_parent_nodes:
+      del self.root_parent_nodes[INDEX]
+
+    self.nodes[PARENT_INDEX].Children.value.append(self.nodes[INDEX])
+
+    self.update_ancestor_indices(INDEX)
+
+    self.invalidate_world_matrix(INDEX)
+    self.SCENE.index_object_path(INDEX)
+    self.invalidate_bb(PARENT_INDEX)
+
+  ## Removes an object from the children of another object.
+  # @param PARENT_INDEX Index of the parent object.
+  # @param INDEX Index of the object to be removed.
+  def remove_child(self, PARENT_INDEX, INDEX):
+
+    if self.parent_indices[INDEX] != PARENT_INDEX:
+      return
+
+    # unlink from the sibling list
+    _previous_index = -1
+    _child_index = self.first_child_indices[PARENT_INDEX]
+
+    while _child_index != INDEX:
+      _previous_index = _child_index
+      _child_index = self.next_sibling_indices[_child_index]
+
+    if _previous_index >= 0:
+      self.next_sibling_indices[_previous_index] = self.next_sibling_indices[INDEX]
+    else:
+      self.first_child_indices[PARENT_INDEX] = self.next_sibling_indices[INDEX]
+
+    if self.last_child_indices[PARENT_INDEX] == INDEX:
+      self.last_child_indices[PARENT_INDEX] = _previous_index
+
+    self.parent_indices[INDEX] = -1
+    self.next_sibling_indices[INDEX] = -1
+
+    self.nodes[PARENT_INDEX].Children.value.remove(self.nodes[INDEX])
+
+    self.update_ancestor_indices(INDEX)
+
+    self.invalidate_world_matrix(INDEX)
+    self.SCENE.unindex_object_path(INDEX)
+    self.invalidate_bb(PARENT_INDEX)
+
+  ## Enables or disables an object.
+  # @param INDEX Index of the object.
+  # @param FLAG Boolean indicating the activation or deactivation process.
+  def enable_object(self, INDEX, FLAG):
+
+    _node = self.nodes[INDEX]
+
+    if FLAG == True: # enable object
+      _node.GroupNames.value = [self.render_groups[self.render_group_indices[INDEX]]] # set geometry visible
+
+      if self.flags[INDEX] & InteractiveObjectStore.FLAG_GF_PICK:
+        _node.GroupNames.value.append("gf_pick_group")
+
+      if self.flags[INDEX] & InteractiveObjectStore.FLAG_MAN_PICK:
+        _node.GroupNames.value.append("man_pick_group")
+
+    else: # disable object
+      _node.GroupNames.value = ["do_not_display_group"] # set geometry invisible
+
+      if self.flags[INDEX] & InteractiveObjectStore.FLAG_HIGHLIGHT:
+        self.enable_highlight(INDEX, False)
+
+  ## Returns if an object is highlighted.
+  # @param INDEX Index of the object.
+  def is_highlighted(self, INDEX):
+
+    return (self.flags[INDEX] & InteractiveObjectStore.FLAG_HIGHLIGHT) != 0
+
+  ## Enables or disables the highlight for an object and its descendants.
+  # The bounding boxes of the subtree are displayed by box visualizations, no scripts are created.
+  # When the highlight ends, the visualizations are kept for reuse and the scripts of the subtree are dropped.
+  # @param INDEX Index of the object.
+  # @param FLAG Boolean indicating the activation or deactivation process.
+  def enable_highlight(self, INDEX, FLAG):
+
+    for _index in self.get_subtree_indices(INDEX):
+
+      if FLAG == True:
+        self.flags[_index] |= InteractiveObjectStore.FLAG_HIGHLIGHT
+
+        if _index not in self.box_visualizations:
+          self.attach_box_visualization(_index)
+
+      else:
+        self.flags[_index] &= ~InteractiveObjectStore.FLAG_HIGHLIGHT
+        self.detach_box_visualization(_index)
+        self.objects[_index] = None
+
+  ## Marks the cached world matrices of an object and its descendants as outdated.
+  # @param INDEX Index of the object.
+  def invalidate_world_matrix(self, INDEX):
+
+    _indices = [INDEX]
+
+    while len(_indices) > 0:
+      _index = _indices.pop()
+
+      # the descendants of an outdated world matrix are outdated already
+      if (self.flags[_index] & InteractiveObjectStore.FLAG_WORLD_VALID) == 0 and _index != INDEX:
+        continue
+
+      self.flags[_index] &= ~InteractiveObjectStore.FLAG_WORLD_VALID
+      _indices.extend(self.get_child_indices(_index))
+
+  ## Updates the cached world matrix of an object and returns its position in world_matrices.
+  # @param INDEX Index of the object.
+  def update_world_matrix(self, INDEX):
+
+    _offset = INDEX * 16
+
+    if self.flags[INDEX] & InteractiveObjectStore.FLAG_WORLD_VALID:
+      return _offset
+
+    _parent_index = self.parent_indices[INDEX]
+
+    if _parent_index < 0:
+      self.world_matrices[_offset:_offset + 16] = self.local_matrices[_offset:_offset + 16]
+
+    else:
+      _p = self.world_matrices
+      _l = self.local_matrices
+      _p_offset = self.update_world_matrix(_parent_index)
+      _values = []
+
+      for _row in (0, 4, 8, 12):
+        for _column in range(4):
+          _values.append( _p[_p_offset + _row] * _l[_offset + _column]
+                        + _p[_p_offset + _row + 1] * _l[_offset + 4 + _column]
+                        + _p[_p_offset + _row + 2] * _l[_offset + 8 + _column]
+                        + _p[_p_offset + _row + 3] * _l[_offset + 12 + _column] )
+
+      self.world_matrices[_offset:_offset + 16] = array.array('d', _values)
+
+    self.flags[INDEX] |= InteractiveObjectStore.FLAG_WORLD_VALID
+    return _offset
+
+  ## Returns the world transformation of an object computed from the local transformations of its ancestors.
+  # The parent node of the top-level object is considered by its world transformation.
+  # @param INDEX Index of the object.
+  def get_world_matrix(self, INDEX):
+
+    _world_mat = InteractiveObjectStore.make_matrix(self.world_matrices, self.update_world_matrix(INDEX))
+
+    _root_index = INDEX
+
+    while self.parent_indices[_root_index] >= 0:
+      _root_index = self.parent_indices[_root_index]
+
+    _root_parent_node = self.root_parent_nodes.get(_root_index)
+
+    if _root_parent_node == None:
+      return _world_mat
+
+    return _root_parent_node.WorldTransform.value * _world_mat
+
+  ## Sets the local transformation of an object.
+  # @param INDEX Index of the object.
+  # @param MATRIX The new local transformation.
+  def set_local_matrix(self, INDEX, MATRIX):
+
+    self.nodes[INDEX].Transform.value = MATRIX
+
+    _offset = INDEX * 16
+    self.local_matrices[_offset:_offset + 16] = array.array('d', InteractiveObjectStore.get_matrix_values(MATRIX))
+    self.invalidate_world_matrix(INDEX)
+
+    # the cached bounding boxes of the parent objects are outdated
+    if self.parent_indices[INDEX] >= 0:
+      self.invalidate_bb(self.parent_indices[INDEX])
+
+    # the cached ground heights below this object are outdated
+    if self.flags[INDEX] & InteractiveObjectStore.FLAG_GF_PICK:
+      TerrainHeightCache.invalidate_all()
+
+  ## Sets the world transformation of an object.
+  # @param INDEX Index of the object.
+  # @param MATRIX The new world transformation.
+  def set_world_matrix(self, INDEX, MATRIX):
+
+    _parent_index = self.parent_indices[INDEX]
+
+    if _parent_index >= 0:
+      _parent_world_mat = self.get_world_matrix(_parent_index)
+
+    elif INDEX in self.root_parent_nodes:
+      _parent_world_mat = self.root_parent_nodes[INDEX].WorldTransform.value
+
+    else:
+      _parent_world_mat = avango.gua.make_identity_mat()
+
+    # matrix is transformed into the coordinate system of the parent
+    self.set_local_matrix(INDEX, avango.gua.make_inverse_mat(_parent_world_mat) * MATRIX)
+
+  ## Resets an object to its initial local transformation.
+  # @param INDEX Index of the object.
+  def reset_object(self, INDEX):
+
+    self.set_local_matrix(INDEX, InteractiveObjectStore.make_matrix(self.home_matrices, INDEX * 16))
+    self.invalidate_bb(INDEX)
+
+  ## Reads the geometry bounding boxes of all objects added since the last call.
+  # The scenegraph cache is updated once for all of them.
+  def resolve_geometry_bbs(self):
+
+    _indices = self.unresolved_indices
+    self.unresolved_indices = []
+
+    if len(_indices) == 0:
+      return
+
+    self.SCENE.get_scenegraph().update_cache()
+
+    for _index in _indices:
+
+      _node = self.nodes[_index]
+      _world_bb = _node.BoundingBox.value
+      _min = _world_bb.Min.value
+      _max = _world_bb.Max.value
+
+      _inverse_values = InteractiveObjectStore.get_matrix_values(avango.gua.make_inverse_mat(_node.WorldTransform.value))
+      _bb = InteractiveObjectStore.transform_bb( (_min.x, _min.y, _min.z, _max.x, _max.y, _max.z), _inverse_values, 0)
+
+      if _bb == None:
+        self.flags[_index] |= InteractiveObjectStore.FLAG_GEOMETRY_BB_EMPTY
+      else:
+        self.geometry_bbs[_index * 6:_index * 6 + 6] = array.array('d', _bb)
+
+      self.flags[_index] |= InteractiveObjectStore.FLAG_GEOMETRY_BB_RESOLVED
+
+  ## Returns the bounding box of an object in local coordinates as 6 floats, None if it is empty.
+  # For objects without child objects, it is the geometry bounding box of the node. For objects
+  # with child objects, it is the union of the child boxes transformed by their local transformations.
+  # @param INDEX Index of the object.
+  def get_bb(self, INDEX):
+
+    _offset = INDEX * 6
+
+    if self.flags[INDEX] & InteractiveObjectStore.FLAG_BB_VALID:
+
+      if self.flags[INDEX] & InteractiveObjectStore.FLAG_BB_EMPTY:
+        return None
+
+      return tuple(self.bbs[_offset:_offset + 6])
+
+    if self.first_child_indices[INDEX] < 0: # geometry
+
+      if (self.flags[INDEX] & InteractiveObjectStore.FLAG_GEOMETRY_BB_RESOLVED) == 0:
+        self.resolve_geometry_bbs()
+
+      if self.flags[INDEX] & InteractiveObjectStore.FLAG_GEOMETRY_BB_EMPTY:
+        _bb = None
+      else:
+        _bb = tuple(self.geometry_bbs[_offset:_offset + 6])
+
+    else: # hierarchy
+      _bb = None
+
+      for _child_index in self.get_child_indices(INDEX):
+
+        _child_bb = self.get_bb(_child_index)
+
+        if _child_bb == None:
+          continue
+
+        _child_bb = InteractiveObjectStore.transform_bb(_child_bb, self.local_matrices, _child_index * 16)
+
+        if _bb == None:
+          _bb = _child_bb
+        else:
+          _bb = ( min(_bb[0], _child_bb[0]), min(_bb[1], _child_bb[1]), min(_bb[2], _child_bb[2])
+                , max(_bb[3], _child_bb[3]), max(_bb[4], _child_bb[4]), max(_bb[5], _child_bb[5]) )
+
+    if _bb == None:
+      self.flags[INDEX] |= InteractiveObjectStore.FLAG_BB_EMPTY
+    else:
+      self.flags[INDEX] &= ~InteractiveObjectStore.FLAG_BB_EMPTY
+      self.bbs[_offset:_offset + 6] = array.array('d', _bb)
+
+    self.flags[INDEX] |= InteractiveObjectStore.FLAG_BB_VALID
+    return _bb
+
+  ## Marks the bounding box of an object and of its ancestors as outdated.
+  # Visible bounding box visualizations are updated immediately.
+  # @param INDEX Index of the object.
+  def invalidate_bb(self, INDEX):
+
+    _index = INDEX
+
+    # the ancestors of an invalid box are invalid already
+    while _index >= 0 and self.flags[_index] & InteractiveObjectStore.FLAG_BB_VALID:
+
+      self.flags[_index] &= ~InteractiveObjectStore.FLAG_BB_VALID
+
+      _visualization = self.box_visualizations.get(_index)
+
+      if _visualization != None:
+        _visualization.update_bb_scale()
+
+      _index = self.parent_indices[_index]
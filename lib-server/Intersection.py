@@ -8,11 +8,14 @@ import avango
 import avango.gua
 import avango.script
 
-# import python libraries
-# ...
+# import framework libraries
+from PickingService import PickingService
 
 ## Helper class to determine the intersections of a ray with the objects in
 # a scene.
+#
+# The ray tests are executed once per frame by the PickingService of the
+# scenegraph, which writes the results to mf_pick_result.
 
 class Intersection(avango.script.Script):
 
@@ -51,10 +54,6 @@ class Intersection(avango.script.Script):
     # nothing will be written in mf_pick_result.
     self.activated = True
   
-    ## @var ray
-    # The spatial ray to be analyzed.
-    self.ray = avango.gua.nodes.RayNode()
-  
     ## @var picking_options
     # Picking options for the intersection process.
     if PICK_ONLY_FIRST_OBJECT:
@@ -73,23 +72,9 @@ class Intersection(avango.script.Script):
   
     # init field connections
     self.sf_pick_mat.connect_from(SF_PICK_MAT)
-  
-    self.always_evaluate(True)
-    
-  ## Evaluated every frame.
-  def evaluate(self):
-  
-    if self.activated == True:
-     
-      # set ray properties
-      self.ray.Transform.value =  self.sf_pick_mat.value * \
-                                  avango.gua.make_scale_mat(1.0, 1.0, self.pick_length)
 
-      #print self.pick_length, self.ray.Transform.value, self.ray.Transform.value.get_rotate()
-          
-      # compute picking results
-      _pick_result = self.SCENEGRAPH.ray_test(self.ray, self.picking_options, self.picking_mask)
-      self.mf_pick_result.value = _pick_result.value
+    # register the ray at the scenegraph's picking service
+    PickingService.get(self.SCENEGRAPH).add_request(self)
   
 
   ## Activate/Deactivate the intersection procedure.
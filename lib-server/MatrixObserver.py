@@ -0,0 +1,47 @@
+#!/usr/bin/python
+
+## @file
+# Contains class MatrixObserver.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+import avango.script
+from avango.script import field_has_changed
+
+## Watches a matrix field and remembers whether it has changed since the last check.
+# Used to invalidate values derived from a node's transformation only when needed.
+class MatrixObserver(avango.script.Script):
+
+  # input field
+  ## @var sf_mat
+  # The matrix field to be observed.
+  sf_mat = avango.gua.SFMatrix4()
+  sf_mat.value = avango.gua.make_identity_mat()
+
+  ## Default constructor.
+  def __init__(self):
+    self.super(MatrixObserver).__init__()
+
+    ## @var changed
+    # Boolean saying if sf_mat has changed since the last call of consume_change.
+    self.changed = True
+
+  ## Custom constructor.
+  # @param SF_MATRIX The matrix field to be observed.
+  def my_constructor(self, SF_MATRIX):
+
+    self.sf_mat.connect_from(SF_MATRIX)
+
+  ## Called whenever sf_mat changes.
+  @field_has_changed(sf_mat)
+  def sf_mat_changed(self):
+
+    self.changed = True
+
+  ## Returns if the observed field has changed since the last call and resets the flag.
+  def consume_change(self):
+
+    _changed = self.changed
+    self.changed = False
+    return _changed
@@ -0,0 +1,316 @@
+#!/usr/bin/python
+
+## @file
+# Contains classes TransformWriteCounter and NetworkMeter.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+import avango.script
+from avango.script import field_has_changed
+
+# import framework libraries
+from ConsoleIO import *
+from FrameProfiler import RingBuffer
+from NodeDistributor import NodeDistributor
+import Utilities
+
+## Counts how often the Transform field of a node is written.
+class TransformWriteCounter(avango.script.Script):
+
+  # input field
+  ## @var sf_mat
+  # The matrix field to be observed.
+  sf_mat = avango.gua.SFMatrix4()
+  sf_mat.value = avango.gua.make_identity_mat()
+
+  ## Default constructor.
+  def __init__(self):
+    self.super(TransformWriteCounter).__init__()
+
+    ## @var number_of_writes
+    # Number of writes to sf_mat since the last call of consume_writes.
+    self.number_of_writes = 0
+
+  ## Custom constructor.
+  # @param SF_MATRIX The matrix field to be observed.
+  def my_constructor(self, SF_MATRIX):
+
+    self.sf_mat.connect_from(SF_MATRIX)
+    self.number_of_writes = 0
+
+  ## Called whenever sf_mat changes.
+  @field_has_changed(sf_mat)
+  def sf_mat_changed(self):
+
+    self.number_of_writes += 1
+
+  ## Returns the number of writes since the last call and resets the counter.
+  def consume_writes(self):
+
+    _number_of_writes = self.number_of_writes
+    self.number_of_writes = 0
+    return _number_of_writes
+
+
+## Server-side meter for the field updates distributed by the NetTransform node.
+#
+# All nodes registered by a NodeDistributor are watched while the meter is installed. Every
+# frame, the writes to the Transform fields and the changes of the GroupNames and Material
+# fields are counted and sized per node path. Transform writes with an unchanged matrix are
+# reported separately, as they are distributed without any visible effect. The sizes are
+# estimates of the field payloads (64 bytes per matrix, string lengths), not network packets.
+#
+# The per-frame matrix writers of distributed nodes, e.g. heads, tools, rays, avatars, portal entries
+# and navigation matrices, write through set_transform or set_matrix. In coalescing mode, these skip
+# writes of matrices equal to the current value.
+class NetworkMeter:
+
+  ## @var matrix_element_order
+  # (row, column) indices of the matrix elements in the order compared by is_equal_matrix: translation, rotation and scale, projective row.
+  matrix_element_order = [(0, 3), (1, 3), (2, 3)] + [(_row, _column) for _row in range(3) for _column in range(3)] + [(3, 0), (3, 1), (3, 2), (3, 3)]
+
+  ## @var coalesce_writes
+  # Boolean saying if set_transform suppresses writes of identical matrices.
+  coalesce_writes = False
+
+  ## @var matrix_size
+  # Estimated number of bytes of a distributed matrix.
+  matrix_size = 64
+
+  ## Custom constructor.
+  # @param HISTORY_SIZE Number of frames to be kept for the per-frame totals.
+  def __init__(self, HISTORY_SIZE = 600):
+
+    ## @var entries
+    # List of [node, path, TransformWriteCounter, last matrix key, last group names, last material] entries of the watched nodes.
+    self.entries = []
+
+    ## @var watched_node_ids
+    # Set of the ids of the watched nodes. Nodes distributed directly and again as part of a subtree are watched once.
+    self.watched_node_ids = set()
+
+    ## @var statistics
+    # Dictionary mapping node paths to [writes, identical transform writes, bytes] summed over all recorded frames.
+    self.statistics = {}
+
+    ## @var frame_updates
+    # RingBuffer of the number of field updates per frame.
+    self.frame_updates = RingBuffer(HISTORY_SIZE)
+
+    ## @var frame_bytes
+    # RingBuffer of the estimated number of bytes per frame.
+    self.frame_bytes = RingBuffer(HISTORY_SIZE)
+
+    ## @var number_of_frames
+    # Number of frames recorded since installation or the last reset.
+    self.number_of_frames = 0
+
+    ## @var frame_trigger
+    # Triggers framewise evaluation of frame_callback method.
+    self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+  ## Makes this instance the one notified by NodeDistributors about newly distributed nodes.
+  def install(self):
+
+    NodeDistributor.network_meter = self
+
+  ## Starts watching a distributed node.
+  # @param NODE The scenegraph node to be watched.
+  def add_node(self, NODE):
+
+    if id(NODE) in self.watched_node_ids:
+      return
+
+    self.watched_node_ids.add(id(NODE))
+
+    _counter = None
+
+    if hasattr(NODE, "Transform"):
+      _counter = TransformWriteCounter()
+      _counter.my_constructor(NODE.Transform)
+      _counter.consume_writes()
+
+    self.entries.append( [NODE
+                        , NODE.Path.value
+                        , _counter
+                        , None
+                        , self.get_group_names(NODE)
+                        , self.get_material(NODE)] )
+
+  ## Stops watching distributed nodes, e.g. the nodes of an unloaded scene.
+  # @param NODES List of the scenegraph nodes not to be watched anymore.
+  def remove_nodes(self, NODES):
+
+    _removed_ids = set([id(_node) for _node in NODES])
+
+    self.entries = [_entry for _entry in self.entries if id(_entry[0]) not in _removed_ids]
+    self.watched_node_ids -= _removed_ids
+
+  ## Returns a copy of the GroupNames of a node, None if it has no such field.
+  # @param NODE The node to retrieve the group names from.
+  def get_group_names(self, NODE):
+
+    if hasattr(NODE, "GroupNames"):
+      return list(NODE.GroupNames.value)
+
+    return None
+
+  ## Returns the material of a node, None if it has no such field.
+  # @param NODE The node to retrieve the material from.
+  def get_material(self, NODE):
+
+    if hasattr(NODE, "Material"):
+      return NODE.Material.value
+
+    return None
+
+  ## Evaluated every frame. Counts the field updates of all watched nodes.
+  def frame_callback(self):
+
+    _frame_updates = 0
+    _frame_bytes = 0
+
+    for _entry in self.entries:
+
+      _node = _entry[0]
+      _writes = 0
+      _identical_writes = 0
+      _bytes = 0
+
+      if _entry[2] != None:
+
+        _transform_writes = _entry[2].consume_writes()
+
+        if _transform_writes > 0:
+
+          _key = Utilities.get_matrix_key(_node.Transform.value)
+
+          # several writes in one frame are distributed as the last value only
+          if _key == _entry[3]:
+            _identical_writes += 1
+
+          _entry[3] = _key
+          _writes += 1
+          _bytes += NetworkMeter.matrix_size
+
+      if _entry[4] != None:
+
+        _group_names = list(_node.GroupNames.value)
+
+        if _group_names != _entry[4]:
+          _entry[4] = _group_names
+          _writes += 1
+          _bytes += sum([len(_name) + 4 for _name in _group_names])
+
+      if _entry[5] != None:
+
+        _material = _node.Material.value
+
+        if _material != _entry[5]:
+          _entry[5] = _material
+          _writes += 1
+          _bytes += len(_material) + 4
+
+      if _writes > 0:
+
+        _path = _entry[1]
+
+        if _path not in self.statistics:
+          self.statistics[_path] = [0, 0, 0]
+
+        self.statistics[_path][0] += _writes
+        self.statistics[_path][1] += _identical_writes
+        self.statistics[_path][2] += _bytes
+
+        _frame_updates += _writes
+        _frame_bytes += _bytes
+
+    self.frame_updates.append(_frame_updates)
+    self.frame_bytes.append(_frame_bytes)
+    self.number_of_frames += 1
+
+  ## Clears all measurements.
+  def reset(self):
+
+    self.statistics = {}
+    self.frame_updates = RingBuffer(self.frame_updates.size)
+    self.frame_bytes = RingBuffer(self.frame_bytes.size)
+    self.number_of_frames = 0
+
+  ## Returns a list of (path, updates per frame, identical transform writes per frame, bytes per frame) rows.
+  # The rows are sorted by descending bytes per frame.
+  def get_statistics(self):
+
+    _number_of_frames = max(self.number_of_frames, 1)
+    _rows = []
+
+    for _path, _values in self.statistics.items():
+      _rows.append( (_path
+                   , float(_values[0]) / _number_of_frames
+                   , float(_values[1]) / _number_of_frames
+                   , float(_values[2]) / _number_of_frames) )
+
+    _rows.sort(key = lambda _row: -_row[3])
+    return _rows
+
+  ## Prints the per-frame totals and the nodes causing the most traffic on the console.
+  # @param NUMBER_OF_ROWS Maximum number of nodes to be printed.
+  def print_statistics(self, NUMBER_OF_ROWS = 20):
+
+    _updates = self.frame_updates.get_percentiles([50, 99])
+    _bytes = self.frame_bytes.get_percentiles([50, 99])
+
+    print_subheadline("Distributed updates over " + str(self.number_of_frames) + " frames of " + str(len(self.entries)) + " watched nodes")
+    print("updates per frame: p50 " + str(_updates[0]) + ", p99 " + str(_updates[1]))
+    print("bytes per frame:   p50 " + str(_bytes[0]) + ", p99 " + str(_bytes[1]))
+    print("{0:<64} {1:>10} {2:>10} {3:>10}".format("node", "updates", "identical", "bytes"))
+
+    for _row in self.get_statistics()[:NUMBER_OF_ROWS]:
+      print("{0:<64} {1:>10.2f} {2:>10.2f} {3:>10.1f}".format(_row[0], _row[1], _row[2], _row[3]))
+
+  ## Writes the per-node statistics to a CSV file.
+  # @param FILENAME Path of the CSV file to be written.
+  def dump_csv(self, FILENAME):
+
+    with open(FILENAME, "w") as _file:
+
+      _file.write("path,updates_per_frame,identical_writes_per_frame,bytes_per_frame\n")
+
+      for _row in self.get_statistics():
+        _file.write(",".join([str(_value) for _value in _row]) + "\n")
+
+    print_message("Network profile written to " + FILENAME + ".")
+
+  ## Writes a matrix to a node's Transform field. In coalescing mode, identical matrices are not written.
+  # @param NODE The node to be transformed.
+  # @param MATRIX The matrix to be applied.
+  @staticmethod
+  def set_transform(NODE, MATRIX):
+
+    NetworkMeter.set_matrix(NODE.Transform, MATRIX)
+
+  ## Writes a matrix to a matrix field, e.g. one a distributed Transform field is connected from. In coalescing mode, identical matrices are not written.
+  # @param SF_MATRIX The matrix field to be written.
+  # @param MATRIX The matrix to be applied.
+  @staticmethod
+  def set_matrix(SF_MATRIX, MATRIX):
+
+    if NetworkMeter.coalesce_writes and NetworkMeter.is_equal_matrix(SF_MATRIX.value, MATRIX):
+      return
+
+    SF_MATRIX.value = MATRIX
+
+  ## Returns if two matrices have equal elements.
+  # The translation is compared first and the comparison stops at the first difference, so changing matrices are mostly rejected after one element.
+  # @param MATRIX1 The first matrix to be compared.
+  # @param MATRIX2 The second matrix to be compared.
+  @staticmethod
+  def is_equal_matrix(MATRIX1, MATRIX2):
+
+    for _row, _column in NetworkMeter.matrix_element_order:
+
+      if MATRIX1.get_element(_row, _column) != MATRIX2.get_element(_row, _column):
+        return False
+
+    return True
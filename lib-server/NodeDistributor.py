@@ -0,0 +1,158 @@
+#!/usr/bin/python
+
+## @file
+# Contains class NodeDistributor.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+
+# import framework libraries
+from ConsoleIO import *
+
+# import python libraries
+import time
+
+## Registers scenegraph nodes at a NetMatrixTransform node for distribution.
+#
+# Subtrees are traversed iteratively, so deep hierarchies (e.g. point cloud scenes) do not
+# run into the recursion limit. The collected nodes are registered in chunks with a progress
+# message per chunk for large subtrees. Subtrees added after the initial registration
+# (e.g. portals, tool representations or lazily loaded scenes) are registered by passing
+# their root node, without walking the rest of the tree again. Subtrees which are removed
+# from the scenegraph, e.g. unloaded scenes, are unregistered the same way.
+class NodeDistributor:
+
+  ## @var network_meter
+  # NetworkMeter instance to be notified about distributed nodes, None if metering is disabled.
+  network_meter = None
+
+  ## Custom constructor.
+  # @param NET_TRANS_NODE The NetMatrixTransform node on which nodes are marked distributable.
+  # @param CHUNK_SIZE Number of nodes to be registered per chunk.
+  def __init__(self, NET_TRANS_NODE, CHUNK_SIZE = 1000):
+
+    ## @var NET_TRANS_NODE
+    # The NetMatrixTransform node on which nodes are marked distributable.
+    self.NET_TRANS_NODE = NET_TRANS_NODE
+
+    ## @var chunk_size
+    # Number of nodes to be registered per chunk.
+    self.chunk_size = CHUNK_SIZE
+
+    ## @var number_of_distributed_nodes
+    # Total number of nodes registered by this instance.
+    self.number_of_distributed_nodes = 0
+
+  ## Registers a single node for distribution, e.g. a node created after the initial registration.
+  # Use this instead of calling distribute_object on the nettrans node directly, so that the network meter watches the node.
+  # @param NET_TRANS_NODE The NetMatrixTransform node on which the node is marked distributable.
+  # @param NODE The node to be registered.
+  @staticmethod
+  def distribute_object(NET_TRANS_NODE, NODE):
+
+    NET_TRANS_NODE.distribute_object(NODE)
+
+    if NodeDistributor.network_meter != None:
+      NodeDistributor.network_meter.add_node(NODE)
+
+  ## Registers a node and all of its children for distribution.
+  # The nettrans node itself is never registered.
+  # @param NODE The root node of the subtree to be registered.
+  # @param VERBOSE Boolean saying if progress and timing messages are to be printed.
+  # @return The number of registered nodes.
+  def distribute_subtree(self, NODE, VERBOSE = False):
+
+    _start_time = time.time()
+    _distribute_object = self.NET_TRANS_NODE.distribute_object
+
+    _nodes_to_visit = [NODE]
+    _chunk = []
+    _number_of_nodes = 0
+    _number_of_chunks = 0
+
+    while len(_nodes_to_visit) > 0:
+
+      _node = _nodes_to_visit.pop()
+      _nodes_to_visit.extend(_node.Children.value)
+
+      # do not distribute the nettrans node itself
+      if _node != self.NET_TRANS_NODE:
+        _chunk.append(_node)
+
+      if len(_chunk) == self.chunk_size or (len(_nodes_to_visit) == 0 and len(_chunk) > 0):
+
+        for _chunk_node in _chunk:
+          _distribute_object(_chunk_node)
+
+        if NodeDistributor.network_meter != None:
+          for _chunk_node in _chunk:
+            NodeDistributor.network_meter.add_node(_chunk_node)
+
+        _number_of_nodes += len(_chunk)
+        _number_of_chunks += 1
+        _chunk = []
+
+        if VERBOSE and len(_nodes_to_visit) > 0:
+          print_message("Distributed " + str(_number_of_nodes) + " nodes (" + str(round(time.time() - _start_time, 3)) + " s) ...")
+
+    self.number_of_distributed_nodes += _number_of_nodes
+
+    if VERBOSE:
+      print_message("Distributed " + str(_number_of_nodes) + " nodes below " + NODE.Name.value + " in " + str(_number_of_chunks) + " chunks and " + str(round(time.time() - _start_time, 3)) + " s.")
+
+    return _number_of_nodes
+
+  ## Registers several subtrees for distribution, e.g. nodes created after the initial registration.
+  # @param NODES List of root nodes of the subtrees to be registered.
+  # @param VERBOSE Boolean saying if progress and timing messages are to be printed.
+  # @return The number of registered nodes.
+  def distribute_subtrees(self, NODES, VERBOSE = False):
+
+    _number_of_nodes = 0
+
+    for _node in NODES:
+      _number_of_nodes += self.distribute_subtree(_node, VERBOSE)
+
+    return _number_of_nodes
+
+  ## Unregisters a node and all of its children from distribution, so that the clients remove them.
+  # @param NODE The root node of the subtree to be unregistered.
+  # @return The number of unregistered nodes.
+  def undistribute_subtree(self, NODE):
+
+    _undistribute_object = self.NET_TRANS_NODE.undistribute_object
+
+    _nodes_to_visit = [NODE]
+    _nodes = []
+
+    while len(_nodes_to_visit) > 0:
+
+      _node = _nodes_to_visit.pop()
+      _nodes_to_visit.extend(_node.Children.value)
+
+      # the nettrans node itself is never distributed
+      if _node != self.NET_TRANS_NODE:
+        _nodes.append(_node)
+
+    for _node in _nodes:
+      _undistribute_object(_node)
+
+    if NodeDistributor.network_meter != None:
+      NodeDistributor.network_meter.remove_nodes(_nodes)
+
+    self.number_of_distributed_nodes -= len(_nodes)
+
+    return len(_nodes)
+
+  ## Unregisters several subtrees from distribution.
+  # @param NODES List of root nodes of the subtrees to be unregistered.
+  # @return The number of unregistered nodes.
+  def undistribute_subtrees(self, NODES):
+
+    _number_of_nodes = 0
+
+    for _node in NODES:
+      _number_of_nodes += self.undistribute_subtree(_node)
+
+    return _number_of_nodes
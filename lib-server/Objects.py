@@ -10,7 +10,8 @@ import avango.script
 from avango.script import field_has_changed
 
 ### import framework libraries
-from Visualization import *
+from AssetPrefetcher import *
+from InteractiveObjectStore import InteractiveObjectStore
 
 ## Abstract base class to represent a scene which is a collection of interactive objects.
 # Not to be instantiated.
@@ -37,9 +38,33 @@ class SceneObject:
     self.NET_TRANS_NODE = NET_TRANS_NODE
 
     # variables
-    ## @var objects
-    # List of InteractiveObject instances that belong to this scene.
-    self.objects = []
+    ## @var object_store
+    # InteractiveObjectStore holding the interactive objects that belong to this scene.
+    self.object_store = InteractiveObjectStore(self, InteractiveObject)
+
+    ## @var objects_by_name
+    # Dictionary mapping node names to lists of object indices in registration order.
+    self.objects_by_name = {}
+
+    ## @var objects_by_path
+    # Dictionary mapping scenegraph paths relative to scene_root to object indices.
+    self.objects_by_path = {}
+
+    ## @var asset_requests
+    # List of AssetRequest instances collected by init_geometry and init_plod during scene construction.
+    self.asset_requests = []
+
+    ## @var defer_asset_loading
+    # Boolean saying if geometry files are collected as asset requests instead of being loaded immediately.
+    self.defer_asset_loading = True
+
+    ## @var memory_estimate
+    # Estimated memory consumption of this scene in bytes, computed from the sizes of the data files of the loaded assets, including the point data of plod assets.
+    self.memory_estimate = 0
+
+    ## @var distributed
+    # Boolean saying if the nodes of this scene were distributed. Nodes created afterwards have to be distributed on creation.
+    self.distributed = False
 
     ## @var name
     # Name to be given to the scene.
@@ -141,28 +166,38 @@ class SceneObject:
   
     return self.NET_TRANS_NODE   
 
-  ## Returns a string of all concatenated pipeline values for this SceneObject.
-  def get_pipeline_value_string(self):
-    return self.background_texture + "#" + \
-           str(self.enable_bloom) + "#" + \
-           str(self.bloom_intensity) + "#" + \
-           str(self.bloom_threshold) + "#" + \
-           str(self.bloom_radius) + "#" + \
-           str(self.enable_ssao) + "#" + \
-           str(self.ssao_radius) + "#" + \
-           str(self.ssao_intensity) + "#" + \
-           str(self.enable_backface_culling) + "#" + \
-           str(self.enable_frustum_culling) + "#" + \
-           str(self.enable_fxaa) + "#" + \
-           str(round(self.ambient_color.r,3)) + "," + str(round(self.ambient_color.g,3)) + "," + str(round(self.ambient_color.b,3)) + "#" + \
-           str(self.enable_fog) + "#" + \
-           str(self.fog_start) + "#" + \
-           str(self.fog_end) + "#" + \
-           str(self.near_clip) + "#" + \
-           str(self.far_clip)
+  ## Distributes nodes created after the nodes of this scene were distributed, e.g. bounding box visualizations.
+  # Nodes created before are distributed together with the scene.
+  # @param NODES List of root nodes of the subtrees to be distributed.
+  def distribute_nodes(self, NODES):
+
+    if self.distributed == True:
+      self.SCENE_MANAGER.node_distributor.distribute_subtrees(NODES)
+
+  ## Returns a dictionary of all pipeline values for this SceneObject.
+  # Only contains plain python types, so that it can be serialized for the clients.
+  def get_pipeline_values(self):
+    return { "background_texture" : self.background_texture
+           , "enable_bloom" : bool(self.enable_bloom)
+           , "bloom_intensity" : float(self.bloom_intensity)
+           , "bloom_threshold" : float(self.bloom_threshold)
+           , "bloom_radius" : float(self.bloom_radius)
+           , "enable_ssao" : bool(self.enable_ssao)
+           , "ssao_radius" : float(self.ssao_radius)
+           , "ssao_intensity" : float(self.ssao_intensity)
+           , "enable_backface_culling" : bool(self.enable_backface_culling)
+           , "enable_frustum_culling" : bool(self.enable_frustum_culling)
+           , "enable_fxaa" : bool(self.enable_fxaa)
+           , "ambient_color" : [round(self.ambient_color.r,3), round(self.ambient_color.g,3), round(self.ambient_color.b,3)]
+           , "enable_fog" : bool(self.enable_fog)
+           , "fog_start" : float(self.fog_start)
+           , "fog_end" : float(self.fog_end)
+           , "near_clip" : float(self.near_clip)
+           , "far_clip" : float(self.far_clip) }
 
 
   ## Creates and initializes a geometry node in the scene.
+  # During scene construction, the geometry is only requested and created later in load_assets.
   # @param NAME The name of the new node.
   # @param FILENAME Path to the object file to be loaded.
   # @param MATRIX The transformation matrix of the new node.
@@ -173,23 +208,76 @@ class SceneObject:
   # @param RENDER_GROUP The render group to be associated with the new geometry.
   def init_geometry(self, NAME, FILENAME, MATRIX, MATERIAL, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, PARENT_NODE, RENDER_GROUP):
 
-    _loader = avango.gua.nodes.TriMeshLoader()
-
-    _loader_flags = "avango.gua.LoaderFlags.OPTIMIZE_GEOMETRY" # default loader flags
+    _flag_names = ["OPTIMIZE_GEOMETRY"] # default loader flags
 
     if MATERIAL == None: # no material defined --> get materials from file description
-      _loader_flags += " | avango.gua.LoaderFlags.LOAD_MATERIALS"
+      _flag_names.append("LOAD_MATERIALS")
       MATERIAL = "data/materials/White.gmd" # default material
 
     if GROUNDFOLLOWING_PICK_FLAG == True or MANIPULATION_PICK_FLAG == True:
-      _loader_flags += " | avango.gua.LoaderFlags.MAKE_PICKABLE"
+      _flag_names.append("MAKE_PICKABLE")
 
-    _node = _loader.create_geometry_from_file(NAME, FILENAME, MATERIAL, eval(_loader_flags))
-    _node.Transform.value = MATRIX
+    self.request_asset(AssetRequest("trimesh", NAME, FILENAME, tuple(_flag_names), MATRIX, MATERIAL, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, PARENT_NODE, RENDER_GROUP))
+
+  ## Queues an asset request during scene construction or creates the geometry right away afterwards.
+  # @param REQUEST The AssetRequest instance to be handled.
+  def request_asset(self, REQUEST):
+
+    if self.defer_asset_loading:
+      self.asset_requests.append(REQUEST)
+    else:
+      self.SCENE_MANAGER.asset_prefetcher.prefetch([REQUEST])
+      self.create_asset(REQUEST)
+      self.memory_estimate += AssetPrefetcher.get_data_size(REQUEST)
+
+  ## Creates the geometries of all queued asset requests in the order they were requested.
+  # The files should have been prefetched by the SceneManager's AssetPrefetcher before.
+  def load_assets(self):
+
+    for _request in self.asset_requests:
+      self.create_asset(_request)
+      self.memory_estimate += AssetPrefetcher.get_data_size(_request)
+
+    self.asset_requests = []
+    self.defer_asset_loading = False
+
+  ## Loads the geometry of an asset request and creates the interactive objects for it.
+  # @param REQUEST The AssetRequest instance to be created.
+  def create_asset(self, REQUEST):
+
+    if REQUEST.loader_type == "plod":
+
+      _loader = avango.gua.nodes.PLODLoader()
+      _loader.UploadBudget.value = 32
+      _loader.RenderBudget.value = 512
+      _loader.OutOfCoreBudget.value = 512
+
+      _loader_flags = 0
+
+      for _flag_name in REQUEST.flag_names:
+        _loader_flags = _loader_flags | getattr(avango.gua.PLODLoaderFlags, _flag_name)
+
+      _node = _loader.create_geometry_from_file(REQUEST.name, REQUEST.filename, _loader_flags)
+      _node.Transform.value = REQUEST.matrix
+      _node.ShadowMode.value = avango.gua.ShadowMode.OFF
+
+      self.init_interactive_objects(_node, REQUEST.parent_node, REQUEST.gf_pick_flag, REQUEST.man_pick_flag, REQUEST.render_group, False)
+
+    else:
+
+      _loader = avango.gua.nodes.TriMeshLoader()
+
+      _loader_flags = 0
+
+      for _flag_name in REQUEST.flag_names:
+        _loader_flags = _loader_flags | getattr(avango.gua.LoaderFlags, _flag_name)
+
+      _node = _loader.create_geometry_from_file(REQUEST.name, REQUEST.filename, REQUEST.material, _loader_flags)
+      _node.Transform.value = REQUEST.matrix
   
-    #print("LOADED", _node, _node.Name.value) #, _loader_flags)
+      #print("LOADED", _node, _node.Name.value) #, _loader_flags)
   
-    self.init_interactive_objects(_node, PARENT_NODE, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, True)
+      self.init_interactive_objects(_node, REQUEST.parent_node, REQUEST.gf_pick_flag, REQUEST.man_pick_flag, REQUEST.render_group, True)
 
   ## Creates and initializes a light node in the scene.
   # @param TYPE Type of the new light. 0 = sun light, 1 = point light, 2 = spot light
@@ -289,10 +377,10 @@ class SceneObject:
       
       _light_node.Transform.value = avango.gua.make_scale_mat(LIGHT_DIMENSIONS)
 
-      self.init_interactive_objects(_node, PARENT_NODE, False, MANIPULATION_PICK_FLAG, RENDER_GROUP, False)
+      _index = self.init_interactive_objects(_node, PARENT_NODE, False, MANIPULATION_PICK_FLAG, RENDER_GROUP, False)
 
-      _light_geometry.add_and_init_field(avango.script.SFObject(), "InteractiveObject", _node.InteractiveObject.value) # rework ??
-      _light_geometry.InteractiveObject.dont_distribute(True)
+      # picking the light geometry selects the light object
+      self.object_store.add_node_reference(_light_geometry, _index)
 
   ## Creates and initializes an interactive object responsible for grouping.
   def init_group(self, NAME, MATRIX, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, PARENT_NODE, RENDER_GROUP):
@@ -315,97 +403,181 @@ class SceneObject:
     self.init_interactive_objects(_node, PARENT_NODE, False, False, RENDER_GROUP, False)
 
   ## Creates and initializes an interactive object responsible for a point-based level-of-detail scene.
+  # During scene construction, the geometry is only requested and created later in load_assets.
   def init_plod(self, NAME, FILENAME, MATRIX, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, PARENT_NODE, RENDER_GROUP):
- 
-    _loader = avango.gua.nodes.PLODLoader()
-    _loader.UploadBudget.value = 32
-    _loader.RenderBudget.value = 512
-    _loader.OutOfCoreBudget.value = 512
-
-    _loader_flags = "avango.gua.PLODLoaderFlags.DEFAULTS" # default loader flags
 
-    _loader_flags += " | avango.gua.PLODLoaderFlags.NORMALIZE_POSITION | avango.gua.PLODLoaderFlags.NORMALIZE_SCALE"
+    _flag_names = ["DEFAULTS", "NORMALIZE_POSITION", "NORMALIZE_SCALE"] # default loader flags
     
     if GROUNDFOLLOWING_PICK_FLAG == True or MANIPULATION_PICK_FLAG == True:
-      _loader_flags += " | avango.gua.PLODLoaderFlags.MAKE_PICKABLE"      
+      _flag_names.append("MAKE_PICKABLE")
 
-    _node = _loader.create_geometry_from_file(NAME, FILENAME, eval(_loader_flags))
-    _node.Transform.value = MATRIX
-    _node.ShadowMode.value = avango.gua.ShadowMode.OFF
- 
-    self.init_interactive_objects(_node, PARENT_NODE, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, False)
+    self.request_asset(AssetRequest("plod", NAME, FILENAME, tuple(_flag_names), MATRIX, None, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, PARENT_NODE, RENDER_GROUP))
 
 
   ## Creates and initializes an interactive object.
+  # Returns the index of the object in the object store.
+  # @param PARENT_OBJECT InteractiveObject or scenegraph node to append the node to.
   def init_interactive_objects(self, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, RECURSIVE_FLAG):
 
     #print("!!!!!!!", NODE.get_type(), NODE.Name.value, len(NODE.Children.value), NODE.Path.value, RENDER_GROUP)
 
-    #_object = InteractiveObject()
-    #_object.base_constructor(self, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
+    if isinstance(PARENT_OBJECT, InteractiveObject): # interactive object
+      return self.add_interactive_objects(NODE, PARENT_OBJECT.index, None, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, RECURSIVE_FLAG)
 
-    if RECURSIVE_FLAG == True:
+    else: # scene root
+      return self.add_interactive_objects(NODE, -1, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, RECURSIVE_FLAG)
 
-      if NODE.get_type() == 'av::gua::TransformNode' and len(NODE.Children.value) > 0: # group node with children (hierarchy)
-        _object = InteractiveObject()
-        _object.base_constructor(self, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
+  ## Adds a node and, if requested, its subgraph to the object store.
+  # Returns the index of the object created for the node.
+  # @param PARENT_INDEX Index of the parent object, -1 if PARENT_NODE is used.
+  # @param PARENT_NODE Scenegraph node to append the node to if there is no parent object.
+  def add_interactive_objects(self, NODE, PARENT_INDEX, PARENT_NODE, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, RECURSIVE_FLAG):
 
-        _childs = []
-        for _child in NODE.Children.value:
-          _childs.append(_child)
+    if RECURSIVE_FLAG == True and NODE.get_type() == 'av::gua::TransformNode' and len(NODE.Children.value) > 0: # group node with children (hierarchy)
 
-        NODE.Children.value = []
+      _childs = []
+      for _child in NODE.Children.value:
+        _childs.append(_child)
 
-        for _child in _childs:
-          self.init_interactive_objects(_child, _object, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, RECURSIVE_FLAG)
+      NODE.Children.value = []
 
-      else: # geometry
-        _object = InteractiveObject()
-        _object.base_constructor(self, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
-  
+      _index = self.object_store.add_object(NODE, PARENT_INDEX, PARENT_NODE, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
+      self.register_interactive_object(_index)
+
+      for _child in _childs:
+        self.add_interactive_objects(_child, _index, None, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP, RECURSIVE_FLAG)
+
+    else: # geometry
+      _index = self.object_store.add_object(NODE, PARENT_INDEX, PARENT_NODE, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
+      self.register_interactive_object(_index)
+
+    return _index
+
+  ## Registers the name of an interactive object with this scene object.
+  # @param INDEX Index of the object in the object store.
+  def register_interactive_object(self, INDEX):
+
+    _name = self.object_store.nodes[INDEX].Name.value
+
+    if _name in self.objects_by_name:
+      self.objects_by_name[_name].append(INDEX)
     else:
-      _object = InteractiveObject()
-      _object.base_constructor(self, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
-  
+      self.objects_by_name[_name] = [INDEX]
 
-    '''
-    if NODE.get_type() == "av::gua::TriMeshNode":
-    
-      _object = GeometryObject()
-      _object.init(self, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
+  ## Stores the scenegraph path of an interactive object and its children relative to scene_root.
+  # To be called whenever the object was attached to a new parent.
+  # @param INDEX Index of the object to be indexed.
+  def index_object_path(self, INDEX):
 
-    elif NODE.get_type() == 'av::gua::SunLightNode' or NODE.get_type() == 'av::gua::PointLightNode' or NODE.get_type() == 'av::gua::SpotLightNode':
+    self.unindex_object_path(INDEX)
 
-      _object = LightObject()
-      _object.init(self, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP)
-    '''
+    _store = self.object_store
+    _name = _store.nodes[INDEX].Name.value
+    _parent_index = _store.parent_indices[INDEX]
 
-  ## Registers an interactive object with this scene object.
-  def register_interactive_object(self, INTERACTIVE_OBJECT):
+    if _parent_index >= 0:
+
+      if _store.scene_paths[_parent_index] == None:
+        _path = None
+      else:
+        _path = _store.scene_paths[_parent_index] + "/" + _name
 
-    self.objects.append(INTERACTIVE_OBJECT)
+    else:
+      _root_path = self.scene_root.Path.value
+      _parent_path = _store.root_parent_nodes[INDEX].Path.value
+
+      if _parent_path == _root_path:
+        _path = _name
+      elif _parent_path.startswith(_root_path + "/"):
+        _path = _parent_path[len(_root_path) + 1:] + "/" + _name
+      else: # not below scene root
+        _path = None
+
+    _store.scene_paths[INDEX] = _path
+
+    if _path != None:
+      self.objects_by_path[_path] = INDEX
+
+    for _child_index in _store.get_child_indices(INDEX):
+      self.index_object_path(_child_index)
+
+  ## Removes the path entries of an interactive object and its children.
+  # @param INDEX Index of the object whose path entries are to be removed.
+  def unindex_object_path(self, INDEX):
+
+    _store = self.object_store
+    _path = _store.scene_paths[INDEX]
+
+    if _path != None and self.objects_by_path.get(_path) == INDEX:
+      del self.objects_by_path[_path]
+
+    _store.scene_paths[INDEX] = None
+
+    for _child_index in _store.get_child_indices(INDEX):
+      self.unindex_object_path(_child_index)
   
   ## Searches for the interactive object with a given name and returns its instance.
+  # If several objects share the name, the first registered one is returned.
   # @param NAME The name to be searched for.
   def get_interactive_object(self, NAME):
-  
-    for _object in self.objects:
 
-      if _object.get_node().Name.value == NAME:
-        return _object
+    _objects_with_name = self.objects_by_name.get(NAME)
+
+    if _objects_with_name:
+      return self.object_store.get_object(_objects_with_name[0])
+
+    return None
 
 
   ## Gets the interactive object for a given scenegraph path.
   # @param NAME The path in the scenegraph to be searched for.
   def get_object(self, NAME):
-  
+
+    _index = self.objects_by_path.get(NAME)
+
+    if _index != None:
+      return self.object_store.get_object(_index)
+
+    # fall back to scenegraph lookup, e.g. for nodes referencing the interactive object of their parent
     _node = self.SCENEGRAPH[self.scene_root.Path.value + "/" + NAME]
 
     if _node != None:
-      
-      if _node.has_field("InteractiveObject") == True:
+      return InteractiveObjectStore.get_object_of_node(_node)
+
+  ## Returns the scenegraph nodes created for this scene below the nettrans node.
+  # These are the scene root and the bounding box visualizations created by the object store.
+  def get_top_level_nodes(self):
+
+    return [self.scene_root] + self.object_store.get_box_visualization_nodes()
+
+  ## Removes this scene from the scenegraph and from its SceneManager.
+  # The nodes are undistributed, so the clients remove them as well. The geometries loaded from
+  # file remain in guacamole's geometry database and are reused if the scene is loaded again.
+  # @return The number of undistributed nodes.
+  def unload_scene(self):
+
+    self.enable_scene(False)
+
+    _top_level_nodes = self.get_top_level_nodes()
+    _number_of_nodes = 0
 
-        return _node.InteractiveObject.value
+    if self.distributed == True:
+      _number_of_nodes = self.SCENE_MANAGER.node_distributor.undistribute_subtrees(_top_level_nodes)
+      self.distributed = False
+
+    for _node in _top_level_nodes:
+
+      if self.NET_TRANS_NODE.Children.value.count(_node) > 0:
+        self.NET_TRANS_NODE.Children.value.remove(_node)
+
+    self.objects_by_name = {}
+    self.objects_by_path = {}
+    self.object_store.clear()
+
+    if self.SCENE_MANAGER.scenes.count(self) > 0:
+      self.SCENE_MANAGER.scenes.remove(self)
+
+    return _number_of_nodes
 
   ## Enables all objects in the scene.
   # @param FLAG Boolean indicating if all objects should be reset first.
@@ -414,104 +586,49 @@ class SceneObject:
     if FLAG == True:
       self.reset()
   
-    for _object in self.objects:
-      _object.enable_object(FLAG)
+    for _index in range(self.object_store.get_number_of_objects()):
+      self.object_store.enable_object(_index, FLAG)
     
   ## Resets all objects in the scene.
   def reset(self):
   
-    for _object in self.objects:
-      _object.reset()
+    for _index in range(self.object_store.get_number_of_objects()):
+      self.object_store.reset_object(_index)
 
 
 ## Class to represent an object in a scene, associated to a scenegraph node.
+#
+# The data of the object is kept in the InteractiveObjectStore of its scene. Instances are only
+# created on demand by InteractiveObjectStore.get_object, e.g. for selected or manipulated
+# objects, and operate on the store entry of their object. They hold no state of their own,
+# so several instances for the same object behave identically.
 class InteractiveObject(avango.script.Script):
 
-  # internal fields
-  ## @var sf_highlight_flag
-  # Boolean field indicating if this object is to be highlighted.
-  sf_highlight_flag = avango.SFBool()
-
   ## Default constructor.
   def __init__(self):
     self.super(InteractiveObject).__init__()
 
-    # variables
-
-    ## @var hierarchy_level
-    # Level of this interactive object in the local hierarchy. 
-    self.hierarchy_level = 0
-
-    ## @var render_group
-    # Render group associated to this interactive object.
-    self.render_group = ""
-
-    ## @var parent_object
-    # Parent InteractiveObject if present.
-    self.parent_object = None
-
-    ## @var child_objects
-    # List of children InteractiveObjects if present.
-    self.child_objects = []
-    
-
   ## Custom constructor.
-  # @param SCENE_MANAGER Reference to the SceneManager instance which is used.
-  # @param NODE Scenegraph node for which an interactive object is to be created.
-  # @param PARENT_OBJECT Parent object of NODE.
-  # @param SCENEGRAPH Reference to the scenegraph in which the scene is existing.
-  # @param NET_TRANS_NODE Reference to the nettrans node to append the scene to.
-  # @param GROUNDFOLLOWING_PICK_FLAG Boolean indicating if the new geometry should be pickable for GroundFollowing purposes.
-  # @param MANIPULATION_PICK_FLAG Boolean indicating if the new geometry should be pickable for manipulation purposes.
-  def base_constructor(self, SCENE, NODE, PARENT_OBJECT, GROUNDFOLLOWING_PICK_FLAG, MANIPULATION_PICK_FLAG, RENDER_GROUP):
+  # @param STORE The InteractiveObjectStore holding the data of the object.
+  # @param INDEX The index of the object in the store.
+  def base_constructor(self, STORE, INDEX):
 
     # references
+    ## @var STORE
+    # Reference to the InteractiveObjectStore holding the data of this object.
+    self.STORE = STORE
+
     ## @var SCENE
     # Reference to the SceneObject instance this interactive object is belonging to.
-    self.SCENE = SCENE
-
-    self.SCENE.register_interactive_object(self)
+    self.SCENE = STORE.SCENE
 
-    # update variables    
-    self.parent_object = PARENT_OBJECT
-    self.render_group = RENDER_GROUP
+    ## @var index
+    # Index of this object in the store.
+    self.index = INDEX
 
     ## @var node
     # Scenegraph node associated with this interactive object.
-    self.node = NODE
-        
-    self.node.add_and_init_field(avango.script.SFObject(), "InteractiveObject", self)
-    self.node.InteractiveObject.dont_distribute(True)
-
-    ## @var home_mat
-    # Initial transformation of the handled scenegraph node.
-    self.home_mat = self.node.Transform.value
-
-    ## @var gf_pick_flag
-    # Boolean indicating if the new geometry should be pickable for GroundFollowing purposes.
-    self.gf_pick_flag = GROUNDFOLLOWING_PICK_FLAG
-
-    ## @var man_pick_flag
-    # Boolean indicating if the new geometry should be pickable for manipulation purposes.
-    self.man_pick_flag = MANIPULATION_PICK_FLAG
-
-    if self.parent_object.get_type() == "Objects::InteractiveObject": # interactive object
-      #print("append to IO")
-      self.parent_object.append_child_object(self)
-
-    else: # scene root
-      #print("append to scene root")
-      self.parent_object.Children.value.append(self.node)
-    
-    #print("new object", self, self.hierarchy_level, self.node, self.node.Name.value, self.node.Transform.value.get_translate(), self.parent_object)
-
-    # init sub classes
-    ## @var bb_vis
-    # Instance of BoundingBoxVisualization to make the bounding box of this object visible.
-    self.bb_vis = BoundingBoxVisualization()
-    self.bb_vis.my_constructor(self, self.SCENE.get_scenegraph(), self.SCENE.get_net_trans_node(), self.get_hierarchy_material())
-
-    self.enable_object(True)
+    self.node = STORE.nodes[INDEX]
 
 
   ## Returns the node member.
@@ -519,64 +636,39 @@ class InteractiveObject(avango.script.Script):
     
     return self.node
 
+  ## Returns the level of this object in the local hierarchy.
+  def get_hierarchy_level(self):
+
+    return self.STORE.levels[self.index]
+
   ## Enables or disables this object.
   # @param FLAG Boolean indicating the activation or deactivation process.
   def enable_object(self, FLAG):
   
-    if FLAG == True: # enable object
-      self.node.GroupNames.value = [self.render_group] # set geometry visible
+    self.STORE.enable_object(self.index, FLAG)
 
-      if self.gf_pick_flag == True:
-        self.node.GroupNames.value.append("gf_pick_group")
-
-      if self.man_pick_flag == True:
-        self.node.GroupNames.value.append("man_pick_group")
-      
-      #for _child in self.node.Children.value:
-      #  _child.GroupNames.value = [] # set geometry visible
-    
-      #self.enable_highlight(True)
-    
-    else: # disable object
-      self.node.GroupNames.value = ["do_not_display_group"] # set geometry invisible
-      
-      self.enable_highlight(False)
-      
-      #for _child in self.transform.Children.value:
-      #  _child.GroupNames.value = ["invisible_group"] # set geometry invisible
-
-  ## Enables or disables the highlight for this object.
+  ## Enables or disables the highlight for this object and its subgraph.
   # @param FLAG Boolean indicating the activation or deactivation process.
   def enable_highlight(self, FLAG):
       
-    self.sf_highlight_flag.value = FLAG
-        
-    # highlight/dehighlight subgraph
-    for _child_object in self.child_objects:
-      _child_object.enable_highlight(FLAG)
+    self.STORE.enable_highlight(self.index, FLAG)
 
   ## Appends another object as a child of this object.
   # @param OBJECT The object to be appended as a child.
   def append_child_object(self, OBJECT):
 
-    self.child_objects.append(OBJECT)
-
-    self.get_node().Children.value.append(OBJECT.get_node())
-
-    OBJECT.hierarchy_level = self.hierarchy_level + 1
+    self.STORE.append_child(self.index, OBJECT.index)
 
   ## Removes another object as a child of this object.
   # @param OBJECT The object to be removed as a child.
   def remove_child_object(self, OBJECT):
 
-    if self.child_objects.count(OBJECT) > 0:
-
-      self.child_objects.remove(OBJECT)
+    self.STORE.remove_child(self.index, OBJECT.index)
 
-      self.node.Children.value.remove(OBJECT.get_node())
-
-      OBJECT.hierarchy_level = 0
+  ## Returns the child objects of this object.
+  def get_child_objects(self):
 
+    return [self.STORE.get_object(_child_index) for _child_index in self.STORE.get_child_indices(self.index)]
 
   ## Gets the transformation of the handled scenegraph node.
   def get_local_transform(self):
@@ -591,61 +683,42 @@ class InteractiveObject(avango.script.Script):
   ## Sets the transformation of the handled scenegraph node.
   def set_local_transform(self, MATRIX):
 
-    self.node.Transform.value = MATRIX
+    self.STORE.set_local_matrix(self.index, MATRIX)
 
   ## Sets the world ransformation of the handled scenegraph node.
   def set_world_transform(self, MATRIX):
 
-    _parent_type = self.parent_object.get_type()
-
-    if _parent_type == "Objects::InteractiveObject": # interactive object    
-      _parent_world_transform = self.parent_object.get_world_transform()
-  
-      _mat = avango.gua.make_inverse_mat(_parent_world_transform) * MATRIX # matrix is transformed into world coordinate system of parent object in scenegraph
-  
-      self.set_local_transform(_mat)
-    
-    elif _parent_type == "av::gua::TransformNode": # scene root
-      _mat = avango.gua.make_inverse_mat(self.parent_object.Transform.value) * MATRIX # matrix is transformed into scene root coordinate system
-      
-      self.set_local_transform(_mat)
+    self.STORE.set_world_matrix(self.index, MATRIX)
 
   ## Resets the interactive object to the initial matrix.
   def reset(self):
       
-    self.set_local_transform(self.home_mat)
-
-    self.bb_vis.calc_bb()
+    self.STORE.reset_object(self.index)
 
   ## Returns the material string belonging to this object's hierarchy level.
   def get_hierarchy_material(self):
   
-    return self.SCENE.get_scene_manager().get_hierarchy_material(self.hierarchy_level)
+    return self.SCENE.get_scene_manager().get_hierarchy_material(self.get_hierarchy_level())
     
   
   ## Gets the parent object of this interactive object or returns None if there isn't any.
   def get_parent_object(self):
     
-    if self.parent_object.get_type() == "Objects::InteractiveObject": # interactive object
-      
-      return self.parent_object
+    _parent_index = self.STORE.parent_indices[self.index]
+
+    if _parent_index >= 0: # interactive object
+      return self.STORE.get_object(_parent_index)
 
     else: # scene root
-    
       return None
 
-  ## Returns all objects which are located at this or a higher hierarchy level.
-  # @param HIERARCHY_LEVEL The hierarchy level to be started from.
+  ## Returns the object at a given hierarchy level among this object and its ancestors, None if there is none.
+  # @param HIERARCHY_LEVEL The hierarchy level to be searched for.
   def get_higher_hierarchical_object(self, HIERARCHY_LEVEL):
 
-    if self.hierarchy_level == HIERARCHY_LEVEL:
-      return self
-    
-    else:
-    
-      if self.parent_object.get_type() == "Objects::InteractiveObject": # interactive object
-        return self.parent_object.get_higher_hierarchical_object(HIERARCHY_LEVEL)
+    _index = self.STORE.get_ancestor_at_level(self.index, HIERARCHY_LEVEL)
 
-      else: # scene root
-        return None
+    if _index >= 0:
+      return self.STORE.get_object(_index)
 
+    return None
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+
+## @file
+# Contains class PickingService.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+import avango.script
+
+# import python libraries
+# ...
+
+## Central service performing the ray tests of the framework on a scenegraph.
+#
+# Continuous ray requests, i.e. Intersection instances, are registered once and executed
+# together in the service's frame callback, grouped by picking mask. Their results are written
+# to the mf_pick_result fields of the requests. Immediate ray tests, e.g. of the RayPointer or
+# the TerrainHeightCache, are performed by ray_test.
+#
+# All results are kept until the next frame callback, keyed by picking mask, picking options
+# and ray matrix. Identical rays within a frame, like the tool representations of a tool on
+# the same navigation, are thereby tested against the scenegraph only once.
+class PickingService:
+
+  ## @var services
+  # Dictionary mapping scenegraph names to the PickingService instances.
+  services = {}
+
+  ## Returns the PickingService of a scenegraph, which is created on the first call.
+  # @param SCENEGRAPH The scenegraph to perform the ray tests on.
+  @staticmethod
+  def get(SCENEGRAPH):
+
+    _name = SCENEGRAPH.Name.value
+
+    if _name not in PickingService.services:
+      PickingService.services[_name] = PickingService(SCENEGRAPH)
+
+    return PickingService.services[_name]
+
+  ## Custom constructor. Use PickingService.get to obtain the service of a scenegraph.
+  # @param SCENEGRAPH The scenegraph to perform the ray tests on.
+  def __init__(self, SCENEGRAPH):
+
+    ## @var SCENEGRAPH
+    # Reference to the scenegraph to perform the ray tests on.
+    self.SCENEGRAPH = SCENEGRAPH
+
+    ## @var requests
+    # Dictionary mapping picking masks to lists of the registered Intersection instances.
+    self.requests = {}
+
+    ## @var results
+    # Dictionary mapping (picking mask, picking options, ray matrix elements) to the MFPickResult fields of the current frame.
+    self.results = {}
+
+    ## @var ray
+    # The ray node used for all ray tests.
+    self.ray = avango.gua.nodes.RayNode()
+
+    ## @var number_of_ray_requests
+    # Number of rays requested so far.
+    self.number_of_ray_requests = 0
+
+    ## @var number_of_ray_tests
+    # Number of ray tests performed on the scenegraph so far.
+    self.number_of_ray_tests = 0
+
+    ## @var frame_trigger
+    # Triggers the execution of the registered requests once per frame.
+    self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+  ## Registers an Intersection to be executed every frame.
+  # @param INTERSECTION The Intersection instance providing sf_pick_mat and receiving mf_pick_result.
+  def add_request(self, INTERSECTION):
+
+    self.requests.setdefault(INTERSECTION.picking_mask, []).append(INTERSECTION)
+
+  ## Unregisters an Intersection.
+  # @param INTERSECTION The Intersection instance to be removed.
+  def remove_request(self, INTERSECTION):
+
+    _requests = self.requests.get(INTERSECTION.picking_mask, [])
+
+    if INTERSECTION in _requests:
+      _requests.remove(INTERSECTION)
+
+  ## Returns the intersections of a ray with the objects in the scene as MFPickResult field.
+  # The returned field is shared by all identical requests of the frame and must not be modified.
+  # @param RAY_MAT Transformation of the ray, which points along -z and is scaled to its length.
+  # @param PICKING_OPTIONS Picking options of the ray test.
+  # @param PICKING_MASK Picking mask of the ray test.
+  def ray_test(self, RAY_MAT, PICKING_OPTIONS, PICKING_MASK):
+
+    self.number_of_ray_requests += 1
+
+    _key = (PICKING_MASK, PICKING_OPTIONS, tuple(RAY_MAT.get_element(_i // 4, _i % 4) for _i in range(16)))
+
+    try:
+      return self.results[_key]
+    except KeyError:
+      pass
+
+    self.number_of_ray_tests += 1
+
+    self.ray.Transform.value = RAY_MAT
+    _pick_result = self.SCENEGRAPH.ray_test(self.ray, PICKING_OPTIONS, PICKING_MASK)
+
+    self.results[_key] = _pick_result
+    return _pick_result
+
+  ## Callback: evaluated every frame. Discards the results of the last frame and executes the registered requests.
+  def frame_callback(self):
+
+    self.results.clear()
+
+    for _picking_mask, _requests in self.requests.items():
+      for _intersection in _requests:
+
+        if _intersection.activated == False:
+          continue
+
+        _ray_mat = _intersection.sf_pick_mat.value * avango.gua.make_scale_mat(1.0, 1.0, _intersection.pick_length)
+        _intersection.mf_pick_result.value = self.ray_test(_ray_mat, _intersection.picking_options, _picking_mask).value
@@ -13,7 +13,9 @@ from avango.script import field_has_changed
 from DisplayGroup import *
 from PortalCameraNavigation import *
 from TrackingReader import *
+from TrackingRecorder import DeviceSensorFactory
 from Tool import *
+from NetworkMeter import NetworkMeter
 import Utilities
 from VirtualDisplay import *
 
@@ -145,8 +147,9 @@ class PortalCameraRepresentation(ToolRepresentation):
   def frame_callback(self):
 
     # update sf_entry_matrix
-    self.sf_entry_matrix.value = self.compute_world_transform(self.tool_transform_node) * \
-                                 avango.gua.make_trans_mat(0.0, self.TOOL_INSTANCE.portal_height/2, 0.0)
+    NetworkMeter.set_matrix(self.sf_entry_matrix
+                          , self.compute_world_transform(self.tool_transform_node) * \
+                            avango.gua.make_trans_mat(0.0, self.TOOL_INSTANCE.portal_height/2, 0.0))
 
     # base class evaluate
     self.perform_tool_node_transformation()
@@ -399,8 +402,7 @@ class PortalCamera(Tool):
 
     ## @var device_sensor
     # Device sensor for the PortalCamera's button inputs.
-    self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor.Station.value = CAMERA_DEVICE_STATION
+    self.device_sensor = DeviceSensorFactory.create(CAMERA_DEVICE_STATION)
 
     # init field connections
     self.sf_focus_button.connect_from(self.device_sensor.Button0)
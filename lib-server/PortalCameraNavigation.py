@@ -11,6 +11,7 @@ from avango.script import field_has_changed
 # import framework libraries
 from Navigation import *
 from PortalCamera import *
+from NetworkMeter import NetworkMeter
 
 ## Special type of Navigation associated to a PortalCamera.
 # Allows moving and rotating by moving the device when a button is pressed and
@@ -75,7 +76,7 @@ class PortalCameraNavigation(Navigation):
       self.portal_cam.set_current_shot_scale(self.portal_cam.current_shot.sf_scale.value * 1.005)
 
     # update nav mat
-    self.sf_nav_mat.value = self.sf_abs_mat.value * avango.gua.make_scale_mat(self.sf_scale.value)
+    NetworkMeter.set_matrix(self.sf_nav_mat, self.sf_abs_mat.value * avango.gua.make_scale_mat(self.sf_scale.value))
 
 
   ## Sets sf_abs_mat and sf_scale.
@@ -14,6 +14,11 @@ import avango.daemon
 from Tool import *
 import Utilities
 from TrackingReader import TrackingTargetReader
+from TrackingRecorder import DeviceSensorFactory
+from PickingService import PickingService
+from Frustum import Frustum
+from InteractiveObjectStore import InteractiveObjectStore
+from NetworkMeter import NetworkMeter
 from scene_config import *
 from SceneManager import *
 import Utilities
@@ -99,9 +104,10 @@ class RayPointerRepresentation(ToolRepresentation):
   # @param NEW_RAY_DISTANCE The new distance of the ray to be set.
   def set_ray_distance(self, NEW_RAY_DISTANCE):
 
-    self.ray_geometry.Transform.value = avango.gua.make_trans_mat(0.0, 0.0, NEW_RAY_DISTANCE * -0.5) * \
-                                        avango.gua.make_rot_mat(-90.0, 1, 0, 0) * \
-                                        avango.gua.make_scale_mat(self.TOOL_INSTANCE.ray_thickness, NEW_RAY_DISTANCE, self.TOOL_INSTANCE.ray_thickness)
+    NetworkMeter.set_transform(self.ray_geometry
+                             , avango.gua.make_trans_mat(0.0, 0.0, NEW_RAY_DISTANCE * -0.5) * \
+                               avango.gua.make_rot_mat(-90.0, 1, 0, 0) * \
+                               avango.gua.make_scale_mat(self.TOOL_INSTANCE.ray_thickness, NEW_RAY_DISTANCE, self.TOOL_INSTANCE.ray_thickness))
 
   ## Resets the ray length to the maximum.
   def reset_ray_distance(self):
@@ -113,7 +119,7 @@ class RayPointerRepresentation(ToolRepresentation):
   def show_intersection_geometry_at(self, MATRIX, NEW_RAY_DISTANCE):
 
     self.intersection_point_geometry.GroupNames.value.remove("do_not_display_group")
-    self.intersection_point_geometry.Transform.value = MATRIX * avango.gua.make_scale_mat(self.intersection_sphere_size)
+    NetworkMeter.set_transform(self.intersection_point_geometry, MATRIX * avango.gua.make_scale_mat(self.intersection_sphere_size))
     self.set_ray_distance(NEW_RAY_DISTANCE)
 
   ## Hides the intersection geometry and resets the ray distance.
@@ -258,10 +264,6 @@ class RayPointer(Tool):
     # Offset to be applied during the dragging process.
     self.dragging_offset = None
 
-    ## @var ray_node
-    # Ray node for intersection
-    self.ray_node = avango.gua.nodes.RayNode()
-    
     ## @var picking_options
     # Picking options for intersection
     self.picking_options = avango.gua.PickingOptions.PICK_ONLY_FIRST_OBJECT \
@@ -280,8 +282,7 @@ class RayPointer(Tool):
     
     ## @var device_sensor
     # Device sensor capturing the pointer's button input values.
-    self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.device_sensor.Station.value = POINTER_DEVICE_STATION
+    self.device_sensor = DeviceSensorFactory.create(POINTER_DEVICE_STATION)
     
     ### init field connections ###
     self.sf_pointer_button0.connect_from(self.device_sensor.Button0)
@@ -305,11 +306,10 @@ class RayPointer(Tool):
   # @param MATRIX The matrix to shoot the pick ray from.
   def compute_pick_result(self, MATRIX):
 
-    self.ray_node.Transform.value = MATRIX * avango.gua.make_scale_mat(1.0, 1.0, self.ray_length)
+    _ray_mat = MATRIX * avango.gua.make_scale_mat(1.0, 1.0, self.ray_length)
 
-    _pick_result = scenegraphs[0].ray_test(self.ray_node, self.picking_options, self.picking_mask)
-    
-    return _pick_result
+    # identical rays of several tool representations are only tested once per frame
+    return PickingService.get(scenegraphs[0]).ray_test(_ray_mat, self.picking_options, self.picking_mask)
 
 
   ## Computes the pick result of a matrix with the scene.
@@ -354,11 +354,9 @@ class RayPointer(Tool):
   
     _tool_world_mat.set_translate(_test)
 
-    self.ray_node.Transform.value = _tool_world_mat * avango.gua.make_scale_mat(1.0, 1.0, self.ray_length)
+    _ray_mat = _tool_world_mat * avango.gua.make_scale_mat(1.0, 1.0, self.ray_length)
 
-    _pick_result = scenegraphs[0].ray_test(self.ray_node, self.picking_options, self.picking_mask)
-    
-    return _pick_result
+    return PickingService.get(scenegraphs[0]).ray_test(_ray_mat, self.picking_options, self.picking_mask)
 
     
   def isect_line_plane_v3(self, p0, p1, p_co, p_no, epsilon=0.000001):
@@ -397,6 +395,9 @@ class RayPointer(Tool):
     _candidate_list = []
     self.primary_tool_representations = []
 
+    # user representations whose frustums were updated in this call
+    _updated_user_representations = []
+
     # only go on if a user is assigned to the ray
     if self.assigned_user != None:
 
@@ -436,45 +437,40 @@ class RayPointer(Tool):
             _user_head_world_mat = _user_repr.head.WorldTransform.value
             _user_nav_mat = _user_repr.view_transform_node.Transform.value
 
-            # pick is visible when visible in one of the display group's screens
-            #print(_user_repr.screens)
-            _visible = False
-
-            for _screen in _user_repr.screens:
-
-              _visible = Utilities.is_inside_frustum(_pick_world_position
-                                                   , _user_repr
-                                                   , _screen)
+            if _user_repr not in _updated_user_representations:
+              Frustum.update_all(_user_repr.frustums)
+              _updated_user_representations.append(_user_repr)
 
-              if _visible == True:
-                # append to candidate list if visible
-                _tool_world_transform = _tool_repr.tool_transform_node.WorldTransform.value
+            # pick is visible when visible in one of the display group's screens
+            _visible = Frustum.is_inside_any(_pick_world_position, _user_repr.frustums)
 
-                _intersection_in_nav_space = avango.gua.make_inverse_mat(_tool_world_transform) * \
-                                             (avango.gua.make_trans_mat(_pick_world_position) * \
-                                             avango.gua.make_scale_mat(_user_nav_mat.get_scale() * -1))
+            if _visible == True:
+              # append to candidate list if visible
+              _tool_world_transform = _tool_repr.tool_transform_node.WorldTransform.value
 
-                # if a virtual proxy geometry is hit, just shorten the ray, without adding it to the candidate list
-                if "virtual_proxy" in _pick_result.Object.value.GroupNames.value:
+              _intersection_in_nav_space = avango.gua.make_inverse_mat(_tool_world_transform) * \
+                                           (avango.gua.make_trans_mat(_pick_world_position) * \
+                                           avango.gua.make_scale_mat(_user_nav_mat.get_scale() * -1))
 
-                  # if the tool representations intersects a virtual display, the ones of other users
-                  # do so as well (when they have the same navigation), so get all tool representations
-                  # at display group (as all of them have to be shortened)
-                  _tool_reprs_at_display_group = []
+              # if a virtual proxy geometry is hit, just shorten the ray, without adding it to the candidate list
+              if "virtual_proxy" in _pick_result.Object.value.GroupNames.value:
 
-                  for _tool_repr_2 in self.tool_representations:
-                    if _tool_repr_2.DISPLAY_GROUP == _tool_repr.DISPLAY_GROUP:
+                # if the tool representations intersects a virtual display, the ones of other users
+                # do so as well (when they have the same navigation), so get all tool representations
+                # at display group (as all of them have to be shortened)
+                _tool_reprs_at_display_group = []
 
-                      _ray_length = abs(_intersection_in_nav_space.get_translate().z)
-                      _tool_repr_2.hide_intersection_geometry()
-                      _tool_repr_2.set_ray_distance(_ray_length)
-                      self.primary_tool_representations.append(_tool_repr_2)
+                for _tool_repr_2 in self.tool_representations:
+                  if _tool_repr_2.DISPLAY_GROUP == _tool_repr.DISPLAY_GROUP:
 
-                else:
+                    _ray_length = abs(_intersection_in_nav_space.get_translate().z)
+                    _tool_repr_2.hide_intersection_geometry()
+                    _tool_repr_2.set_ray_distance(_ray_length)
+                    self.primary_tool_representations.append(_tool_repr_2)
 
-                  _candidate_list.append( (_pick_result, _tool_repr, _intersection_in_nav_space) )
+              else:
 
-                break
+                _candidate_list.append( (_pick_result, _tool_repr, _intersection_in_nav_space) )
 
     return _candidate_list
 
@@ -609,13 +605,11 @@ class RayPointer(Tool):
       
       _node = PICK_RESULT.Object.value
       
-      if _node.has_field("InteractiveObject") == True:
-        _object = _node.InteractiveObject.value
+      if _node.has_field("InteractiveObjectIndex") == True:
+        # only the script of the selected hierarchy level is created
+        _object = InteractiveObjectStore.get_object_of_node(_node, self.hierarchy_selection_level)
         #print _object
         
-        if self.hierarchy_selection_level >= 0:          
-          _object = _object.get_higher_hierarchical_object(self.hierarchy_selection_level)
-        
         if _object == None:
           # evtl. disable highlight of prior object
           if self.highlighted_object != None:
@@ -660,9 +654,10 @@ class RayPointer(Tool):
         _hit_node = _pick_result.Object.value
 
         # retrieve InteractiveObject instance
-        if _hit_node.has_field("InteractiveObject"):
+        _object = InteractiveObjectStore.get_object_of_node(_hit_node)
+
+        if _object != None:
 
-          _object = _hit_node.InteractiveObject.value
           self.dragged_interactive_object = _object
           self.dragging_tool_representation = _hit_tool_repr
           self.dragging_offset = avango.gua.make_inverse_mat(self.dragging_tool_representation.get_world_transform()) * self.dragged_interactive_object.get_world_transform()
@@ -12,14 +12,20 @@ import avango.daemon
 
 # import framework libraries
 from ApplicationManager import *
+from AssetPrefetcher import *
+from NodeDistributor import NodeDistributor
 from Scene import *
+from TerrainHeightCache import TerrainHeightCache
 from ConsoleIO import *
+from TrackingRecorder import DeviceSensorFactory
 
 from scene_config import scenegraphs
 from scene_config import scenes
 from scene_config import enable_key_bindings
+from scene_config import scene_memory_budget
 
 # import python libraries
+import json
 import math
 import time
 
@@ -222,10 +228,37 @@ class SceneManager(avango.script.Script):
     # Number of the currently active (displayed) scene.
     self.active_scene = None
 
+    ## @var scene_names
+    # Class names of the scenes in the configuration file. The scene ids are the indices in this list.
+    self.scene_names = scenes
+
+    ## @var loaded_scenes
+    # Dictionary mapping scene ids to the SceneObject instances which are currently loaded.
+    self.loaded_scenes = {}
+
+    ## @var scene_usage
+    # List of loaded scene ids, ordered from least recently to most recently activated.
+    self.scene_usage = []
+
+    ## @var memory_budget
+    # Maximum size of the data files of all loaded scenes in bytes before least recently used scenes are unloaded. Plod scenes count their point data files (.lod) as well.
+    self.memory_budget = scene_memory_budget * (1 << 20)
+
+    ## @var node_distributor
+    # NodeDistributor instance registering the nodes of scenes loaded after construction.
+    self.node_distributor = NodeDistributor(self.NET_TRANS_NODE)
+
+    ## @var distribute_loaded_scenes
+    # Boolean saying if newly loaded scenes have to be distributed. False during construction, as main distributes all nodes afterwards.
+    self.distribute_loaded_scenes = False
+
+    ## @var asset_prefetcher
+    # AssetPrefetcher instance reading the data files requested by a scene in parallel before its geometries are loaded.
+    self.asset_prefetcher = AssetPrefetcher()
+
     ## @var keyboard_sensor
     # Device sensor representing the keyboard attached to the computer.
-    self.keyboard_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.keyboard_sensor.Station.value = "device-keyboard0"
+    self.keyboard_sensor = DeviceSensorFactory.create("device-keyboard0")
 
     # init field connections
     if enable_key_bindings:
@@ -250,14 +283,22 @@ class SceneManager(avango.script.Script):
     self.pipeline_info_node = avango.gua.nodes.TransformNode()
     _pipeline_value_node.Children.value.append(self.pipeline_info_node)
 
-    # init scenes according to configuration file
-    _scene_id = 0
+    ## @var pipeline_values
+    # Dictionary of the pipeline values lastly written to pipeline_info_node.
+    self.pipeline_values = None
 
-    for _scene_name in scenes:
-      exec("self.scene_" + str(_scene_id) + " = " + str(_scene_name) + "(self, self.SCENEGRAPH, self.NET_TRANS_NODE)")
-      _scene_id += 1
+    ## @var pipeline_values_version
+    # Version number of pipeline_values. Increased whenever the pipeline values change.
+    self.pipeline_values_version = 0
 
+    # scenes according to configuration file are created on their first activation
     self.activate_scene(0) # activate first scene
+
+    # the scenes loaded so far are distributed by main together with all other nodes
+    for _scene in self.loaded_scenes.values():
+      _scene.distributed = True
+
+    self.distribute_loaded_scenes = True
         
 
   # callbacks
@@ -340,30 +381,114 @@ class SceneManager(avango.script.Script):
 
 
   # functions
-  ## Sets one of the loaded scene to the active (displayed) one.
+  ## Sets one of the configured scenes to the active (displayed) one. The scene is loaded if necessary.
   # @param ID The scene id to be activated.
   def activate_scene(self, ID):
     
+    if ID >= len(self.scene_names):
+      return
+
     # disable all scenes
     for _scene in self.scenes:
       _scene.enable_scene(False)
   
-    if ID < len(self.scenes):
-      self.active_scene = self.scenes[ID]
-      self.active_scene.enable_scene(True)
-      self.pipeline_info_node.Name.value = self.active_scene.get_pipeline_value_string()
-
-      SceneManager.current_near_clip = self.active_scene.near_clip
-      SceneManager.current_far_clip = self.active_scene.far_clip
-
-      # reset all navigations to starting position
-      for _workspace in ApplicationManager.all_workspaces:
-        for _display_group in _workspace.display_groups:
-          for _nav in _display_group.navigations:
-            _nav.reset()
-  
-      print("Switching to Scene: " + self.active_scene.name)
-  
+    self.active_scene = self.load_scene(ID)
+
+    self.scene_usage.remove(ID)
+    self.scene_usage.append(ID)
+
+    self.active_scene.enable_scene(True)
+    self.update_pipeline_values()
+
+    # the ground heights of the previous scene are not valid anymore
+    TerrainHeightCache.invalidate_all()
+
+    SceneManager.current_near_clip = self.active_scene.near_clip
+    SceneManager.current_far_clip = self.active_scene.far_clip
+
+    # reset all navigations to starting position
+    for _workspace in ApplicationManager.all_workspaces:
+      for _display_group in _workspace.display_groups:
+        for _nav in _display_group.navigations:
+          _nav.reset()
+
+    print("Switching to Scene: " + self.active_scene.name)
+
+    self.apply_memory_budget()
+
+  ## Creates the scene with a given id from the configuration file if it is not loaded yet.
+  # @param ID The scene id to be loaded.
+  def load_scene(self, ID):
+
+    if ID in self.loaded_scenes:
+      return self.loaded_scenes[ID]
+
+    _start_time = time.time()
+
+    # scene names must match a class name in Scene.py
+    _scene = globals()[self.scene_names[ID]](self, self.SCENEGRAPH, self.NET_TRANS_NODE)
+    setattr(self, "scene_" + str(ID), _scene)
+
+    # read the data files of the scene in parallel, then create the geometries
+    self.asset_prefetcher.prefetch(_scene.asset_requests)
+    _scene.load_assets()
+
+    if self.distribute_loaded_scenes:
+      self.node_distributor.distribute_subtrees(_scene.get_top_level_nodes(), VERBOSE = True)
+      _scene.distributed = True
+
+    self.loaded_scenes[ID] = _scene
+    self.scene_usage.append(ID)
+
+    print_message("Loaded scene " + _scene.name + " (" + str(_scene.memory_estimate / (1 << 20)) + " MB) in " + str(round(time.time() - _start_time, 3)) + " s.")
+
+    return _scene
+
+  ## Unloads a loaded scene. The active scene cannot be unloaded.
+  # @param ID The scene id to be unloaded.
+  def unload_scene(self, ID):
+
+    if ID not in self.loaded_scenes or self.loaded_scenes[ID] == self.active_scene:
+      return
+
+    _scene = self.loaded_scenes[ID]
+    _number_of_nodes = _scene.unload_scene()
+
+    del self.loaded_scenes[ID]
+    self.scene_usage.remove(ID)
+    delattr(self, "scene_" + str(ID))
+
+    print_message("Unloaded scene " + _scene.name + " (" + str(_number_of_nodes) + " nodes undistributed).")
+
+  ## Unloads least recently used scenes until the loaded scenes fit into the memory budget.
+  def apply_memory_budget(self):
+
+    _memory_usage = sum([_scene.memory_estimate for _scene in self.loaded_scenes.values()])
+
+    for _id in list(self.scene_usage):
+
+      if _memory_usage <= self.memory_budget:
+        break
+
+      if self.loaded_scenes[_id] == self.active_scene:
+        continue
+
+      _memory_usage -= self.loaded_scenes[_id].memory_estimate
+      self.unload_scene(_id)
+
+  ## Writes the pipeline values of the active scene to pipeline_info_node if they have changed.
+  # The values are encoded as a versioned JSON payload, clients apply only the values that differ from their current ones.
+  def update_pipeline_values(self):
+
+    _pipeline_values = self.active_scene.get_pipeline_values()
+
+    if _pipeline_values == self.pipeline_values:
+      return
+
+    self.pipeline_values = _pipeline_values
+    self.pipeline_values_version += 1
+    self.pipeline_info_node.Name.value = json.dumps({"version" : self.pipeline_values_version, "values" : _pipeline_values}, sort_keys = True)
+
   ## Prints all the nodes of the active scene on the console.
   def print_active_scene(self):
   
@@ -388,13 +513,15 @@ class SceneManager(avango.script.Script):
     # print interactive objects
     if self.active_scene != None:
       
-      for _object in self.active_scene.objects:
-        _node = _object.node
+      _store = self.active_scene.object_store
+
+      for _index in range(_store.get_number_of_objects()):
+        _node = _store.nodes[_index]
          
         print "\n"
         print _node.Name.value
         print _node.Path.value
-        print _object.hierarchy_level
+        print _store.levels[_index]
         print _node.Transform.value
     '''
   
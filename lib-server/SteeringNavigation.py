@@ -13,6 +13,7 @@ from Device           import *
 from GroundFollowing  import *
 from InputMapping     import InputMapping
 from Navigation       import *
+from NetworkMeter     import NetworkMeter
 import Utilities
 from scene_config import scenegraphs
 
@@ -262,5 +263,5 @@ class SteeringNavigation(Navigation):
       _device_pos = self.device.sf_station_mat.value.get_translate()
       self.trace.update(self.sf_abs_mat.value * avango.gua.make_trans_mat(_device_pos.x, 0, _device_pos.z))
 
-    # update sf_nav_mat
-    self.sf_nav_mat.value = self.sf_abs_mat.value * avango.gua.make_scale_mat(self.sf_scale.value)
+    # update sf_nav_mat (the platform nodes are connected from it)
+    NetworkMeter.set_matrix(self.sf_nav_mat, self.sf_abs_mat.value * avango.gua.make_scale_mat(self.sf_scale.value))
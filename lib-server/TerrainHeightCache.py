@@ -0,0 +1,175 @@
+#!/usr/bin/python
+
+## @file
+# Contains class TerrainHeightCache.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+
+# import framework libraries
+from PickingService import PickingService
+
+# import python libraries
+import math
+import time
+
+## Sparse grid of ground heights sampled by vertical ray tests.
+#
+# Samples are keyed by the scale level of the navigation (the rounded binary logarithm of the
+# scale), the cell indices of the world x and z coordinates and the index of a height band,
+# all in units of the cell size of the scale level. A sample holds the first surface below the
+# top of its band, so lookups from different heights within a band share the same samples.
+# The ground height at a position is interpolated bilinearly between the four surrounding samples.
+#
+# An exact ray test is performed instead if a sample found no ground, if the samples differ by
+# more than one cell size (walls and edges) or if a sample lies above the ray start, as the
+# ray from the actual start would not have hit that surface. Moving ground-followable objects
+# invalidates the cache; no samples are stored until the scene has been static for settle_time.
+class TerrainHeightCache:
+
+  ## @var instances
+  # List of all created caches, used to invalidate them on scene changes.
+  instances = []
+
+  ## @var settle_time
+  # Time in seconds after an invalidation during which exact ray tests are performed.
+  settle_time = 0.5
+
+  ## Custom constructor.
+  # @param SCENEGRAPH The scenegraph to be sampled.
+  # @param PICK_MASK Picking mask of the ray tests.
+  # @param PICK_LENGTH Length of the ray tests in meters.
+  # @param CELL_SIZE Distance of the samples in meters at scale 1.0. Caching is disabled for values <= 0.
+  # @param MAX_SAMPLES Number of samples at which the cache is cleared.
+  def __init__(self, SCENEGRAPH, PICK_MASK, PICK_LENGTH, CELL_SIZE, MAX_SAMPLES = 65536):
+
+    ## @var SCENEGRAPH
+    # Reference to the scenegraph to be sampled.
+    self.SCENEGRAPH = SCENEGRAPH
+
+    ## @var pick_mask
+    # Picking mask of the ray tests.
+    self.pick_mask = PICK_MASK
+
+    ## @var pick_length
+    # Length of the ray tests in meters.
+    self.pick_length = PICK_LENGTH
+
+    ## @var cell_size
+    # Distance of the samples in meters at scale 1.0.
+    self.cell_size = CELL_SIZE
+
+    ## @var max_samples
+    # Number of samples at which the cache is cleared.
+    self.max_samples = MAX_SAMPLES
+
+    ## @var samples
+    # Dictionary mapping (scale level, x index, band index, z index) to the sampled ground height, None if no ground was hit.
+    self.samples = {}
+
+    ## @var invalidation_time
+    # Time of the last invalidation.
+    self.invalidation_time = 0.0
+
+    ## @var number_of_ray_tests
+    # Number of ray tests performed by this cache.
+    self.number_of_ray_tests = 0
+
+    ## @var picking_options
+    # Picking options for the ray tests.
+    self.picking_options = avango.gua.PickingOptions.PICK_ONLY_FIRST_OBJECT \
+                         | avango.gua.PickingOptions.GET_WORLD_POSITIONS
+
+    ## @var ray_orientation_mat
+    # Rotation of the ray's -z axis onto the world's -y axis.
+    self.ray_orientation_mat = avango.gua.make_rot_mat(-90.0, 1.0, 0.0, 0.0)
+
+    TerrainHeightCache.instances.append(self)
+
+  ## Invalidates all created caches.
+  @staticmethod
+  def invalidate_all():
+
+    for _cache in TerrainHeightCache.instances:
+      _cache.invalidate()
+
+  ## Removes all samples and suspends the caching for settle_time.
+  def invalidate(self):
+
+    self.samples.clear()
+    self.invalidation_time = time.time()
+
+  ## Performs a vertical ray test and returns the height of the first surface below a position, None if nothing was hit.
+  # @param X The x coordinate of the ray start.
+  # @param START_Y The height of the ray start.
+  # @param Z The z coordinate of the ray start.
+  def ray_test(self, X, START_Y, Z):
+
+    self.number_of_ray_tests += 1
+
+    _ray_mat = avango.gua.make_trans_mat(X, START_Y, Z) * \
+               self.ray_orientation_mat * \
+               avango.gua.make_scale_mat(1.0, 1.0, self.pick_length)
+
+    _pick_result = PickingService.get(self.SCENEGRAPH).ray_test(_ray_mat, self.picking_options, self.pick_mask)
+
+    if len(_pick_result.value) == 0:
+      return None
+
+    return START_Y - _pick_result.value[0].Distance.value * self.pick_length
+
+  ## Returns a sample, which is measured by a ray test from the top of its band on a miss.
+  # @param KEY The key (scale level, x index, band index, z index) of the sample.
+  # @param CELL The cell size of the scale level.
+  def get_sample(self, KEY, CELL):
+
+    try:
+      return self.samples[KEY]
+    except KeyError:
+      pass
+
+    if len(self.samples) >= self.max_samples:
+      self.samples.clear()
+
+    _height = self.ray_test(KEY[1] * CELL, (KEY[2] + 1) * CELL, KEY[3] * CELL)
+    self.samples[KEY] = _height
+    return _height
+
+  ## Returns the height of the ground below a position, None if no ground was found.
+  # @param POSITION The start position of the ray in world coordinates.
+  # @param SCALE The scaling factor of the navigation.
+  def get_ground_height(self, POSITION, SCALE):
+
+    if self.cell_size <= 0.0 or time.time() - self.invalidation_time < TerrainHeightCache.settle_time:
+      return self.ray_test(POSITION.x, POSITION.y, POSITION.z)
+
+    _level = int(round(math.log(max(SCALE, 0.0001), 2)))
+    _cell = self.cell_size * math.pow(2.0, _level)
+
+    _x = POSITION.x / _cell
+    _z = POSITION.z / _cell
+    _ix = int(math.floor(_x))
+    _iz = int(math.floor(_z))
+    _band = int(math.floor(POSITION.y / _cell))
+
+    _h00 = self.get_sample((_level, _ix, _band, _iz), _cell)
+    _h10 = self.get_sample((_level, _ix + 1, _band, _iz), _cell)
+    _h01 = self.get_sample((_level, _ix, _band, _iz + 1), _cell)
+    _h11 = self.get_sample((_level, _ix + 1, _band, _iz + 1), _cell)
+
+    _heights = [_h00, _h10, _h01, _h11]
+
+    if _heights.count(None) == 4:
+      return None
+
+    if _heights.count(None) > 0 or \
+       max(_heights) - min(_heights) > _cell or \
+       max(_heights) > POSITION.y:
+      return self.ray_test(POSITION.x, POSITION.y, POSITION.z)
+
+    _u = _x - _ix
+    _v = _z - _iz
+
+    return (_h00 * (1.0 - _u) + _h10 * _u) * (1.0 - _v) + \
+           (_h01 * (1.0 - _u) + _h11 * _u) * _v
@@ -15,6 +15,9 @@ from ApplicationManager import *
 from DisplayGroup import *
 from VisibilityHandler import *
 from TrackingReader import TrackingTargetReader
+from ChangeTracker import ChangeTracker
+from Frustum import Frustum
+from NetworkMeter import NetworkMeter
 import Utilities
 
 ## Geometric representation of a Tool in a DisplayGroup. 
@@ -56,6 +59,10 @@ class ToolRepresentation(avango.script.Script):
     # Placeholder for scenegraph nodes which are relevant for the transformation policy.
     self.dependent_nodes = []
 
+    ## @var transform_inputs
+    # ChangeTracker for the inputs of the tool node transformation. Unchanged inputs skip the recomputation.
+    self.transform_inputs = ChangeTracker()
+
     _transform_node_name = ""
 
     if IN_VIRTUAL_DISPLAY:
@@ -88,6 +95,7 @@ class ToolRepresentation(avango.script.Script):
   def add_dependent_node(self, NODE):
 
     self.dependent_nodes.append(NODE)
+    self.transform_inputs.reset()
 
   ## Determines whether this ToolRepresentation is responsible for a virtual display group.
   def is_in_virtual_display(self):
@@ -102,21 +110,13 @@ class ToolRepresentation(avango.script.Script):
   ## Update active flag. Has to be evaluated every frame.
   def update_active_flag(self):
 
-    _screens_to_check = self.USER_REPRESENTATION.screens
+    _frustums_to_check = self.USER_REPRESENTATION.frustums
+    _tool_world_pos = self.get_world_transform().get_translate()
 
     ## condition 1: check if tool representation is inside according frustum ##
-    _tool_repr_in_frustum = False
-
-    # iterate over every screen of user representation
-    for _screen in _screens_to_check:
-      _visible = Utilities.is_inside_frustum(POINT = self.get_world_transform().get_translate()
-                                           , USER_REPRESENTATION = self.USER_REPRESENTATION
-                                           , SCREEN = _screen)
-
-      # if visible in one screen's frustum, the check was successful
-      if _visible == True:
-        _tool_repr_in_frustum = True
-        break
+    # the check is successful if the tool is visible in the cached frustum of one screen of the user representation
+    Frustum.update_all(_frustums_to_check)
+    _tool_repr_in_frustum = Frustum.is_inside_any(_tool_world_pos, _frustums_to_check)
 
     ## condition 2: check if tool representation intersects according frustum ##
     # implementation will be postponed
@@ -138,16 +138,25 @@ class ToolRepresentation(avango.script.Script):
   ## Transforms the tool node according to the display group offset and the tracking matrix.
   def perform_physical_tool_node_transformation(self):
 
-    self.tool_transform_node.Transform.value = self.DISPLAY_GROUP.offset_to_workspace * self.TOOL_INSTANCE.tracking_reader.sf_abs_mat.value
+    _tracking_changed = self.transform_inputs.has_matrix_changed("tracking", self.TOOL_INSTANCE.tracking_reader.sf_abs_mat)
+    _offset_changed = self.transform_inputs.has_value_changed("offset", Utilities.get_matrix_key(self.DISPLAY_GROUP.offset_to_workspace))
+
+    if _tracking_changed or _offset_changed:
+      NetworkMeter.set_transform(self.tool_transform_node, self.DISPLAY_GROUP.offset_to_workspace * self.TOOL_INSTANCE.tracking_reader.sf_abs_mat.value)
 
   ## Transforms the tool node according to the tool - portal entry relation.
   def perform_virtual_tool_node_transformation(self):
 
+    # untransformed tracking data of tool
+    _tool_world_mat = self.dependent_nodes[0].WorldTransform.value
+
+    _entry_changed = self.transform_inputs.has_value_changed("entry", self.DISPLAY_GROUP.get_entry_version())
+    _tool_changed = self.transform_inputs.has_value_changed("tool", Utilities.get_matrix_key(_tool_world_mat))
+
     # we just need one tool representation per virtual display group
     # thus we can use self.DISPLAY_GROUP.displays[0] for the transformation
-    self.tool_transform_node.Transform.value = self.DISPLAY_GROUP.screen_nodes[0].Transform.value * \
-                                               avango.gua.make_inverse_mat(self.DISPLAY_GROUP.entry_node.Transform.value) * \
-                                               self.dependent_nodes[0].WorldTransform.value # untransformed tracking data of tool
+    if _entry_changed or _tool_changed:
+      NetworkMeter.set_transform(self.tool_transform_node, self.DISPLAY_GROUP.get_screen_to_entry_mat() * _tool_world_mat)
 
   ## Appends a string to the GroupNames field of this ToolRepresentation's visualization.
   # @param STRING The string to be appended.
@@ -238,21 +247,7 @@ class Tool(VisibilityHandler2D):
 
     _assigned_user_before = self.assigned_user
 
-    _closest_user = None
-    _closest_distance = 1000
-
-    for _user in self.WORKSPACE_INSTANCE.users:
-
-      if _user.is_active:
-
-
-        _dist = Utilities.compute_point_to_line_distance( self.tracking_reader.sf_abs_vec.value
-                                                        , _user.headtracking_reader.sf_abs_vec.value
-                                                        , avango.gua.Vec3(0, -1, 0) )
-
-        if _dist < _closest_distance:
-          _closest_distance = _dist
-          _closest_user = _user
+    _closest_user = self.WORKSPACE_INSTANCE.user_position_grid.get_closest_user_to_tool(self)
 
     if _closest_user != self.assigned_user:
       self.assign_user(_closest_user)
@@ -8,6 +8,7 @@ import avango
 import avango.gua
 
 # import framework libraries
+from NodeDistributor import NodeDistributor
 import Utilities
 from scene_config import scenegraphs
 
@@ -17,6 +18,10 @@ import time
 ## Class which handles the creation and updating of the trace lines.
 #
 # Is used by Navigation instances to draw the trace of their movement.
+# The line segment nodes are created and distributed when they are drawn for the first time, so
+# navigations which are not moved have no segment nodes. Once num_lines segments exist, they are
+# used as a ring buffer: each new segment overwrites the transformation of the oldest one. Only the
+# segments drawn since the last clear are collapsed when clearing.
 class Trace:
 
   ## Default constructor.
@@ -36,9 +41,17 @@ class Trace:
     self.distance_trigger = LINE_DISTANCE / NUM_LINES
     
     ## @var lines
-    # A list of scene graph nodes where each respresents a line segment.
+    # A list of scene graph nodes where each respresents a line segment. Grows up to num_lines entries while drawing.
     self.lines  = []
 
+    ## @var trace_material
+    # The material string used for the line segments.
+    self.trace_material = 'data/materials/' + TRACE_MATERIAL + '.gmd'
+
+    ## @var group_names
+    # List of the strings appended to the GroupNames of the line segments, applied to segments created later as well.
+    self.group_names = []
+
     ## @var line_thickness
     # Thickness of the trace lines in meters.
     self.line_thickness = 0.1
@@ -47,24 +60,16 @@ class Trace:
     # A transform node that is the parent of all line segments. It groups the line segments in the scene graph as the given identifier is added to its name and therefore allows multiple instances of this class.
     self.transform_node = avango.gua.nodes.TransformNode(Name = 'nav_trace_' + str(IDENTIFIER))
     #self.transform_node = avango.gua.nodes.TransformNode(Name = 'nav_trace_' + str(0))
-    scenegraphs[0]["/net"].distribute_object(self.transform_node)
+    NodeDistributor.distribute_object(scenegraphs[0]["/net"], self.transform_node)
     scenegraphs[0]["/net"].Children.value.append(self.transform_node)
 
-    # create each line segment node by loading the geometry and appending it to the parent node
-    _loader = avango.gua.nodes.TriMeshLoader()
-    for i in range(self.num_lines):
-      _line = _loader.create_geometry_from_file('line_geometry_' + str(i), 'data/objects/cube.obj', 'data/materials/' + TRACE_MATERIAL + '.gmd', avango.gua.LoaderFlags.DEFAULTS)
-      _line.Transform.value = avango.gua.make_scale_mat(0, 0, 0)
-      _line.ShadowMode.value = avango.gua.ShadowMode.OFF
-      scenegraphs[0]["/net"].distribute_object(_line)
-      self.lines.append(_line)
-
-    # append all line segments to the transform_node that groups the tracing lines of different platforms.
-    self.transform_node.Children.value = self.lines
-
     ## @var crrnt_idx
-    # The index of the current point in the list of lines.
-    self.crrnt_idx = 0
+    # The index of the current point in the list of lines, -1 before the first segment is drawn.
+    self.crrnt_idx = -1
+
+    ## @var num_drawn_lines
+    # The number of line segments drawn since the last clear, at most num_lines.
+    self.num_drawn_lines = 0
 
     ## @var crrnt_point
     # The end point of the last drawn line segment that is used as start point for the next line segment. It is initialized with the translation of the INITIAL_MATRIX parameter.
@@ -73,9 +78,23 @@ class Trace:
   ## Appends a string to the GroupNames field of all line segments.
   def append_to_group_names(self, STRING):
 
+    self.group_names.append(STRING)
+
     for _line in self.lines:
       _line.GroupNames.value.append(STRING)
 
+  ## Creates and distributes the next line segment node and appends it to the transform_node.
+  def create_line_segment(self):
+
+    _loader = avango.gua.nodes.TriMeshLoader()
+
+    _line = _loader.create_geometry_from_file('line_geometry_' + str(len(self.lines)), 'data/objects/cube.obj', self.trace_material, avango.gua.LoaderFlags.DEFAULTS)
+    _line.ShadowMode.value = avango.gua.ShadowMode.OFF
+    _line.GroupNames.value = list(self.group_names)
+    self.transform_node.Children.value.append(_line)
+    NodeDistributor.distribute_object(scenegraphs[0]["/net"], _line)
+    self.lines.append(_line)
+
 
   ## Calculates the transformation matrix of a line segment node in the scene graph.
   def calc_transform_mat(self, START_VEC, END_VEC):
@@ -93,11 +112,12 @@ class Trace:
 
   ## Clears the traces and starts drawing again from the current position.
   def clear(self, CURRENT_MAT):
-    _clear_transform_mat = self.calc_transform_mat(CURRENT_MAT.get_translate(), CURRENT_MAT.get_translate())
 
-    for _line in self.lines:
-      _line.Transform.value = _clear_transform_mat
+    # collapse the drawn line segments, going back from the current one
+    for _i in range(self.num_drawn_lines):
+      self.lines[(self.crrnt_idx - _i) % self.num_lines].Transform.value = avango.gua.make_scale_mat(0, 0, 0)
 
+    self.num_drawn_lines = 0
     self.crrnt_point = CURRENT_MAT.get_translate()
 
   ## Update function that updates the point list whenever the time_offset was reached.
@@ -109,8 +129,12 @@ class Trace:
       # increase index counter
       self.crrnt_idx = (self.crrnt_idx + 1) % self.num_lines
 
+      if self.crrnt_idx == len(self.lines):
+        self.create_line_segment()
+
       # set line segment's transform matrix
       self.lines[self.crrnt_idx].Transform.value = self.calc_transform_mat(self.crrnt_point, ABS_MAT.get_translate())
+      self.num_drawn_lines = min(self.num_drawn_lines + 1, self.num_lines)
       
       # set current position as new start point for the next line segment
       self.crrnt_point = ABS_MAT.get_translate()
@@ -11,6 +11,7 @@ import avango.daemon
 from avango.script import field_has_changed
 
 # import framework libraries
+from TrackingRecorder import DeviceSensorFactory
 import Utilities
 
 # import python libraries
@@ -55,8 +56,7 @@ class TrackingTargetReader(TrackingReader):
     
     ## @var tracking_sensor
     # A device sensor to capture the tracking values.
-    self.tracking_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-    self.tracking_sensor.Station.value = TARGET_NAME
+    self.tracking_sensor = DeviceSensorFactory.create(TARGET_NAME)
 
     self.tracking_sensor.TransmitterOffset.value = avango.gua.make_trans_mat(0.0, 0.043, 1.6)
     self.tracking_sensor.ReceiverOffset.value = avango.gua.make_identity_mat()
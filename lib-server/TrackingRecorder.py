@@ -0,0 +1,530 @@
+#!/usr/bin/python
+
+## @file
+# Contains classes TrackingLog, TrackingRecorder, ReplaySensorBase, ReplaySensor, TrackingReplay and DeviceSensorFactory.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+import avango.script
+import avango.daemon
+from avango.script import field_has_changed
+
+# import framework libraries
+from ConsoleIO import *
+
+# import python libraries
+import mmap
+import struct
+import time
+
+## Memory-mapped binary log of device station samples.
+#
+# The file starts with a header (magic, version, record size, number of stations, start time,
+# number of records) followed by a table of station names and the fixed-size records. Each
+# record holds the time relative to the start of the recording, the index of the station, the
+# station matrix without transmitter and receiver offsets, the buttons as a bitmask and the
+# values. The number of records in the header is updated by commit, so a log remains readable
+# if the recording process is killed.
+class TrackingLog:
+
+  ## @var magic
+  # Identifier at the beginning of every tracking log.
+  magic = b"NVFTRK01"
+
+  ## @var version
+  # Version of the file layout.
+  version = 1
+
+  ## @var header_struct
+  # Layout of the header: magic, version, record size, number of stations, start time, number of records.
+  header_struct = struct.Struct("<8sHHHxxdQ")
+
+  ## @var record_struct
+  # Layout of a record: time, station index, 16 matrix elements, button bitmask, values.
+  record_struct = struct.Struct("<dHxx16fI8f")
+
+  ## @var max_stations
+  # Maximum number of stations in a log.
+  max_stations = 64
+
+  ## @var station_name_size
+  # Number of bytes reserved for each station name.
+  station_name_size = 64
+
+  ## @var number_of_buttons
+  # Number of Button fields stored per record.
+  number_of_buttons = 32
+
+  ## @var number_of_values
+  # Number of Value fields stored per record.
+  number_of_values = 8
+
+  ## @var records_offset
+  # Byte offset of the first record in the file.
+  records_offset = header_struct.size + max_stations * station_name_size
+
+  ## @var chunk_size
+  # Number of records the file is grown by when it is full.
+  chunk_size = 4096
+
+  ## Custom constructor. Opens an existing log for reading or creates a new one for writing.
+  # @param FILENAME Path of the log file.
+  # @param WRITE Boolean saying if a new log is to be created.
+  def __init__(self, FILENAME, WRITE = False):
+
+    ## @var filename
+    # Path of the log file.
+    self.filename = FILENAME
+
+    ## @var writable
+    # Boolean saying if this log was created for writing.
+    self.writable = WRITE
+
+    ## @var station_names
+    # List of the station names in the order of their indices.
+    self.station_names = []
+
+    if WRITE:
+
+      ## @var file
+      # The opened log file.
+      self.file = open(FILENAME, "w+b")
+      self.file.truncate(TrackingLog.records_offset + TrackingLog.chunk_size * TrackingLog.record_struct.size)
+
+      ## @var mmap
+      # Memory map of the log file.
+      self.mmap = mmap.mmap(self.file.fileno(), 0)
+
+      ## @var start_time
+      # Time in seconds since the epoch at which the recording was started.
+      self.start_time = time.time()
+
+      ## @var number_of_records
+      # Number of records in the log.
+      self.number_of_records = 0
+
+      ## @var capacity
+      # Number of records fitting into the currently mapped file.
+      self.capacity = TrackingLog.chunk_size
+
+      self.commit()
+
+    else:
+
+      self.file = open(FILENAME, "rb")
+      self.mmap = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+
+      _magic, _version, _record_size, _number_of_stations, self.start_time, self.number_of_records = \
+        TrackingLog.header_struct.unpack_from(self.mmap, 0)
+
+      if _magic != TrackingLog.magic or _version != TrackingLog.version or _record_size != TrackingLog.record_struct.size:
+        self.close()
+        raise ValueError("Unsupported tracking log " + FILENAME)
+
+      # records beyond the end of a truncated file are ignored
+      _available_records = (len(self.mmap) - TrackingLog.records_offset) // TrackingLog.record_struct.size
+      self.number_of_records = min(self.number_of_records, _available_records)
+      self.capacity = _available_records
+
+      for _i in range(_number_of_stations):
+        _offset = TrackingLog.header_struct.size + _i * TrackingLog.station_name_size
+        _name = self.mmap[_offset : _offset + TrackingLog.station_name_size]
+        self.station_names.append(_name.rstrip(b"\0").decode("utf-8"))
+
+  ## Adds a station to the name table and returns its index.
+  # @param STATION_NAME The name of the station to be added.
+  def add_station(self, STATION_NAME):
+
+    if STATION_NAME in self.station_names:
+      return self.station_names.index(STATION_NAME)
+
+    if len(self.station_names) == TrackingLog.max_stations:
+      raise ValueError("Tracking log " + self.filename + " is limited to " + str(TrackingLog.max_stations) + " stations")
+
+    _name = STATION_NAME.encode("utf-8")[:TrackingLog.station_name_size]
+    _offset = TrackingLog.header_struct.size + len(self.station_names) * TrackingLog.station_name_size
+    self.mmap[_offset : _offset + TrackingLog.station_name_size] = _name.ljust(TrackingLog.station_name_size, b"\0")
+
+    self.station_names.append(STATION_NAME)
+    self.commit()
+    return len(self.station_names) - 1
+
+  ## Appends a record to the log. The file is grown by chunk_size records when it is full.
+  # @param TIMESTAMP Time in seconds relative to the start of the recording.
+  # @param STATION_INDEX Index of the station in the name table.
+  # @param MATRIX_VALUES The 16 matrix elements in row-major order.
+  # @param BUTTONS Bitmask of the button states.
+  # @param VALUES List of number_of_values floats.
+  def write_record(self, TIMESTAMP, STATION_INDEX, MATRIX_VALUES, BUTTONS, VALUES):
+
+    if self.number_of_records == self.capacity:
+      self.capacity += TrackingLog.chunk_size
+      self.mmap.flush()
+      self.mmap.resize(TrackingLog.records_offset + self.capacity * TrackingLog.record_struct.size)
+
+    TrackingLog.record_struct.pack_into(self.mmap
+                                      , TrackingLog.records_offset + self.number_of_records * TrackingLog.record_struct.size
+                                      , TIMESTAMP
+                                      , STATION_INDEX
+                                      , *MATRIX_VALUES
+                                      , BUTTONS
+                                      , *VALUES)
+    self.number_of_records += 1
+
+  ## Writes the current number of stations and records to the header.
+  def commit(self):
+
+    TrackingLog.header_struct.pack_into(self.mmap
+                                      , 0
+                                      , TrackingLog.magic
+                                      , TrackingLog.version
+                                      , TrackingLog.record_struct.size
+                                      , len(self.station_names)
+                                      , self.start_time
+                                      , self.number_of_records)
+
+  ## Returns the record at an index as a tuple (time, station index, matrix values, buttons, values).
+  # @param INDEX The index of the record to be read.
+  def read_record(self, INDEX):
+
+    _fields = TrackingLog.record_struct.unpack_from(self.mmap, TrackingLog.records_offset + INDEX * TrackingLog.record_struct.size)
+    return (_fields[0], _fields[1], _fields[2:18], _fields[18], _fields[19:])
+
+  ## Returns the time of the record at an index without unpacking the rest of it.
+  # @param INDEX The index of the record.
+  def read_timestamp(self, INDEX):
+
+    return struct.unpack_from("<d", self.mmap, TrackingLog.records_offset + INDEX * TrackingLog.record_struct.size)[0]
+
+  ## Closes the log. Logs opened for writing are truncated to the records written.
+  def close(self):
+
+    if self.mmap == None:
+      return
+
+    if self.writable:
+      self.commit()
+      self.mmap.flush()
+      self.mmap.close()
+      self.file.truncate(TrackingLog.records_offset + self.number_of_records * TrackingLog.record_struct.size)
+    else:
+      self.mmap.close()
+
+    self.mmap = None
+    self.file.close()
+
+
+## Returns the 16 elements of a matrix in row-major order.
+# @param MATRIX The matrix to be flattened.
+def get_matrix_values(MATRIX):
+
+  return tuple(MATRIX.get_element(_i // 4, _i % 4) for _i in range(16))
+
+## Creates a matrix from 16 elements in row-major order.
+# @param VALUES The matrix elements.
+def make_matrix_from_values(VALUES):
+
+  _mat = avango.gua.make_identity_mat()
+
+  for _i in range(16):
+    _mat.set_element(_i // 4, _i % 4, VALUES[_i])
+
+  return _mat
+
+
+## Records the stations of DeviceSensors to a TrackingLog.
+#
+# The registered sensors are sampled once per frame. A record is only written for a station if
+# its matrix, buttons or values changed since the last record, while all records of a frame
+# share the same time. The matrices are stored without the transmitter and receiver offsets of
+# the sensor, as those are set by the framework and applied again on replay.
+class TrackingRecorder:
+
+  ## Custom constructor.
+  # @param FILENAME Path of the log file to be written.
+  def __init__(self, FILENAME):
+
+    ## @var log
+    # The TrackingLog the samples are written to.
+    self.log = TrackingLog(FILENAME, WRITE = True)
+
+    ## @var entries
+    # List of [sensor, station index, button fields, value fields, last sample] entries of the recorded stations.
+    self.entries = []
+
+    ## @var frame_trigger
+    # Triggers the sampling of the sensors once per frame.
+    self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+    print_message("Recording device stations to " + FILENAME)
+
+  ## Registers a DeviceSensor to be recorded. Only the first sensor of each station is sampled.
+  # @param SENSOR The DeviceSensor to be recorded.
+  # @param STATION_NAME The name of the station the sensor reads.
+  def add_sensor(self, SENSOR, STATION_NAME):
+
+    if self.log.mmap == None or STATION_NAME in self.log.station_names:
+      return
+
+    _station_index = self.log.add_station(STATION_NAME)
+    _button_fields = [getattr(SENSOR, "Button" + str(_i)) for _i in range(TrackingLog.number_of_buttons)]
+    _value_fields = [getattr(SENSOR, "Value" + str(_i)) for _i in range(TrackingLog.number_of_values)]
+
+    self.entries.append([SENSOR, _station_index, _button_fields, _value_fields, None])
+
+  ## Callback: evaluated every frame. Writes the changed stations to the log.
+  def frame_callback(self):
+
+    _timestamp = time.time() - self.log.start_time
+
+    for _entry in self.entries:
+
+      _sensor = _entry[0]
+
+      _raw_mat = avango.gua.make_inverse_mat(_sensor.TransmitterOffset.value) * \
+                 _sensor.Matrix.value * \
+                 avango.gua.make_inverse_mat(_sensor.ReceiverOffset.value)
+
+      _buttons = 0
+
+      for _i, _field in enumerate(_entry[2]):
+        if _field.value:
+          _buttons |= 1 << _i
+
+      _sample = (get_matrix_values(_raw_mat), _buttons, tuple(_field.value for _field in _entry[3]))
+
+      if _sample != _entry[4]:
+        self.log.write_record(_timestamp, _entry[1], _sample[0], _sample[1], _sample[2])
+        _entry[4] = _sample
+
+    self.log.commit()
+
+  ## Stops the recording and closes the log.
+  def close(self):
+
+    if self.log.mmap == None:
+      return
+
+    self.frame_trigger.Active.value = False
+    self.log.close()
+    print_message("Recorded " + str(self.log.number_of_records) + " station samples to " + self.log.filename)
+
+
+## Base class of ReplaySensor, the replacement for a DeviceSensor which is fed by a TrackingReplay.
+# Provides the Station, Matrix, TransmitterOffset and ReceiverOffset fields read by the framework.
+# Matrix is recomputed from the replayed station matrix and the offsets.
+class ReplaySensorBase(avango.script.Script):
+
+  ## @var Station
+  # The name of the replayed station.
+  Station = avango.SFString()
+
+  ## @var Matrix
+  # The station matrix with transmitter and receiver offsets applied.
+  Matrix = avango.gua.SFMatrix4()
+  Matrix.value = avango.gua.make_identity_mat()
+
+  ## @var TransmitterOffset
+  # Transmitter offset applied to the replayed matrix.
+  TransmitterOffset = avango.gua.SFMatrix4()
+  TransmitterOffset.value = avango.gua.make_identity_mat()
+
+  ## @var ReceiverOffset
+  # Receiver offset applied to the replayed matrix.
+  ReceiverOffset = avango.gua.SFMatrix4()
+  ReceiverOffset.value = avango.gua.make_identity_mat()
+
+  ## Default constructor.
+  def __init__(self):
+    self.super(ReplaySensorBase).__init__()
+
+    ## @var raw_mat
+    # The last replayed station matrix without offsets.
+    self.raw_mat = avango.gua.make_identity_mat()
+
+    ## @var buttons
+    # Bitmask of the last replayed button states.
+    self.buttons = 0
+
+    ## @var button_fields
+    # List of the ButtonN fields.
+    self.button_fields = [getattr(self, "Button" + str(_i)) for _i in range(TrackingLog.number_of_buttons)]
+
+    ## @var value_fields
+    # List of the ValueN fields.
+    self.value_fields = [getattr(self, "Value" + str(_i)) for _i in range(TrackingLog.number_of_values)]
+
+  ## Called whenever TransmitterOffset changes.
+  @field_has_changed(TransmitterOffset)
+  def transmitter_offset_changed(self):
+    self.update_matrix()
+
+  ## Called whenever ReceiverOffset changes.
+  @field_has_changed(ReceiverOffset)
+  def receiver_offset_changed(self):
+    self.update_matrix()
+
+  ## Computes Matrix from the replayed station matrix and the offsets.
+  def update_matrix(self):
+    self.Matrix.value = self.TransmitterOffset.value * self.raw_mat * self.ReceiverOffset.value
+
+  ## Applies a replayed record. Buttons and values are only written when they changed.
+  # @param MATRIX_VALUES The 16 elements of the station matrix in row-major order.
+  # @param BUTTONS Bitmask of the button states.
+  # @param VALUES List of the values.
+  def apply_record(self, MATRIX_VALUES, BUTTONS, VALUES):
+
+    self.raw_mat = make_matrix_from_values(MATRIX_VALUES)
+    self.update_matrix()
+
+    _changed_buttons = BUTTONS ^ self.buttons
+    self.buttons = BUTTONS
+
+    if _changed_buttons != 0:
+      for _i, _field in enumerate(self.button_fields):
+        if _changed_buttons & (1 << _i):
+          _field.value = bool(BUTTONS & (1 << _i))
+
+    for _field, _value in zip(self.value_fields, VALUES):
+      if _field.value != _value:
+        _field.value = _value
+
+
+## ReplaySensorBase extended by the ButtonN and ValueN fields.
+# The class is created with type, as the fields of a script have to be present on class creation.
+ReplaySensor = type("ReplaySensor"
+                   , (ReplaySensorBase,)
+                   , dict([("Button" + str(_i), avango.SFBool()) for _i in range(TrackingLog.number_of_buttons)] +
+                          [("Value" + str(_i), avango.SFFloat()) for _i in range(TrackingLog.number_of_values)]))
+
+
+## Feeds the records of a TrackingLog to ReplaySensors.
+#
+# With a positive speed, the records are replayed in real time scaled by the speed factor. With
+# a speed of 0, the records of one recorded frame are replayed per rendered frame, which makes
+# profiling runs independent of the frame rate.
+class TrackingReplay:
+
+  ## Custom constructor.
+  # @param FILENAME Path of the log file to be replayed.
+  # @param SPEED Factor by which the replay is accelerated, 0 replays one recorded frame per frame.
+  # @param LOOP Boolean saying if the replay restarts at the end of the log.
+  def __init__(self, FILENAME, SPEED = 1.0, LOOP = True):
+
+    ## @var log
+    # The TrackingLog to be replayed.
+    self.log = TrackingLog(FILENAME)
+
+    ## @var speed
+    # Factor by which the replay is accelerated, 0 replays one recorded frame per frame.
+    self.speed = SPEED
+
+    ## @var loop
+    # Boolean saying if the replay restarts at the end of the log.
+    self.loop = LOOP
+
+    ## @var sensors
+    # Dictionary mapping the station indices of the log to lists of ReplaySensors.
+    self.sensors = {}
+
+    ## @var next_record
+    # Index of the next record to be replayed.
+    self.next_record = 0
+
+    ## @var start_time
+    # Time in seconds since the epoch at which the current pass through the log was started.
+    self.start_time = None
+
+    ## @var frame_trigger
+    # Triggers the replay of the records once per frame.
+    self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+    print_message("Replaying " + str(self.log.number_of_records) + " station samples from " + FILENAME)
+
+  ## Creates a ReplaySensor for a station.
+  # @param STATION_NAME The name of the station to be replayed.
+  def create_sensor(self, STATION_NAME):
+
+    _sensor = ReplaySensor()
+    _sensor.Station.value = STATION_NAME
+
+    if STATION_NAME in self.log.station_names:
+      self.sensors.setdefault(self.log.station_names.index(STATION_NAME), []).append(_sensor)
+    else:
+      print_warning("Station " + STATION_NAME + " is not contained in " + self.log.filename + ".")
+
+    return _sensor
+
+  ## Applies the record at an index to the sensors of its station.
+  # @param INDEX The index of the record to be applied.
+  def apply_record(self, INDEX):
+
+    _timestamp, _station_index, _matrix_values, _buttons, _values = self.log.read_record(INDEX)
+
+    for _sensor in self.sensors.get(_station_index, []):
+      _sensor.apply_record(_matrix_values, _buttons, _values)
+
+  ## Callback: evaluated every frame. Applies the records which are due.
+  def frame_callback(self):
+
+    if self.log.number_of_records == 0:
+      return
+
+    _now = time.time()
+
+    if self.next_record == self.log.number_of_records:
+
+      if not self.loop:
+        self.frame_trigger.Active.value = False
+        print_message("Tracking replay of " + self.log.filename + " finished.")
+        return
+
+      self.next_record = 0
+      self.start_time = None
+
+    if self.start_time == None:
+      self.start_time = _now
+
+    if self.speed > 0.0:
+      _replay_time = (_now - self.start_time) * self.speed
+    else:
+      _replay_time = self.log.read_timestamp(self.next_record)
+
+    while self.next_record < self.log.number_of_records and self.log.read_timestamp(self.next_record) <= _replay_time:
+      self.apply_record(self.next_record)
+      self.next_record += 1
+
+
+## Creates the DeviceSensors of the framework.
+# If a TrackingReplay is set, ReplaySensors are created instead. If a TrackingRecorder is set,
+# the created sensors are registered with it.
+class DeviceSensorFactory:
+
+  ## @var recorder
+  # TrackingRecorder the created sensors are registered with, None if not recording.
+  recorder = None
+
+  ## @var replay
+  # TrackingReplay creating the sensors, None if the daemon stations are read.
+  replay = None
+
+  ## Creates a sensor reading a station.
+  # @param STATION_NAME The name of the station as chosen in daemon.
+  # @param DEVICE_SERVICE The DeviceService to be used, a new one is created if None.
+  @staticmethod
+  def create(STATION_NAME, DEVICE_SERVICE = None):
+
+    if DeviceSensorFactory.replay != None:
+      return DeviceSensorFactory.replay.create_sensor(STATION_NAME)
+
+    if DEVICE_SERVICE == None:
+      DEVICE_SERVICE = avango.daemon.DeviceService()
+
+    _sensor = avango.daemon.nodes.DeviceSensor(DeviceService = DEVICE_SERVICE)
+    _sensor.Station.value = STATION_NAME
+
+    if DeviceSensorFactory.recorder != None:
+      DeviceSensorFactory.recorder.add_sensor(_sensor, STATION_NAME)
+
+    return _sensor
@@ -15,6 +15,10 @@ from Intersection import *
 from TrackingReader import *
 from VisibilityHandler import *
 from ConsoleIO import *
+from Frustum import Frustum
+from VisibilityResolver import VisibilityResolver
+from ChangeTracker import ChangeTracker
+from NetworkMeter import NetworkMeter
 import Utilities
 
 # import math libraries
@@ -54,14 +58,30 @@ class UserRepresentation:
     # List of screen nodes for each display of the display group.
     self.screens = []
 
+    ## @var frustums
+    # List of cached Frustum instances for the screen nodes of this UserRepresentation.
+    self.frustums = []
+
     ## @var dependent_nodes
     # Placeholder for scenegraph nodes which are relevant for the transformation policy.
     self.dependent_nodes = []
 
+    ## @var portal_id_parents
+    # Tuple of the physical navigation node and the portal node the ids in is_foreign_portal were parsed from, None if not parsed yet.
+    self.portal_id_parents = None
+
+    ## @var is_foreign_portal
+    # Boolean saying if the physical user of this representation is in another workspace or display group than the portal.
+    self.is_foreign_portal = False
+
     ## @var execute_transformation_policy
     # Boolean indicating if the transformation policy is evaluated every frame.
     self.execute_transformation_policy = True
 
+    ## @var transform_inputs
+    # ChangeTracker for the inputs of the head transformation. Unchanged inputs skip the recomputation.
+    self.transform_inputs = ChangeTracker()
+
     ## create user representation nodes ##
 
     ## @var stereo_display_group
@@ -121,6 +141,14 @@ class UserRepresentation:
     
     return False
 
+  ## Returns the group name under which this UserRepresentation's avatar is visible in other display groups.
+  def get_visibility_group_name(self):
+
+    if self.is_in_virtual_display():
+      return self.view_transform_node.Parent.value.Name.value + "_" + self.head.Name.value
+
+    return self.view_transform_node.Name.value
+
 
   ## Evaluated every frame.
   def frame_callback(self):
@@ -135,15 +163,9 @@ class UserRepresentation:
 
         # activate thumbnail mode when scale is too small
         # make sure not to switch off own PortalCameraRepresentations
-        _physical_nav_node = self.dependent_nodes[0].Parent.value
-        _physical_nav_scale = _physical_nav_node.Transform.value.get_scale()
+        _physical_nav_scale = self.dependent_nodes[0].Parent.value.Transform.value.get_scale()
 
-        _physical_user_w_id = _physical_nav_node.Name.value.split("_")[0].replace("w", "")
-        _physical_user_dg_id = _physical_nav_node.Name.value.split("_")[1].replace("dg", "")
-        _portal_w_id = self.view_transform_node.Parent.value.Name.value.split("_")[2].replace("w", "")
-        _portal_dg_id = self.view_transform_node.Parent.value.Name.value.split("_")[3].replace("dg", "")
-
-        if _physical_nav_scale.x > 30.0 and (_physical_user_w_id != _portal_w_id or _physical_user_dg_id != _portal_dg_id):
+        if _physical_nav_scale.x > 30.0 and self.is_viewing_foreign_portal():
           self.thumbnail_mode = True
           self.make_default_viewing_setup()
 
@@ -153,16 +175,10 @@ class UserRepresentation:
       self.perform_virtual_user_head_transformation()
 
       # same check as performed above
-      _physical_nav_node = self.dependent_nodes[0].Parent.value
-      _physical_nav_scale = _physical_nav_node.Transform.value.get_scale()
-
-      _physical_user_w_id = _physical_nav_node.Name.value.split("_")[0].replace("w", "")
-      _physical_user_dg_id = _physical_nav_node.Name.value.split("_")[1].replace("dg", "")
-      _portal_w_id = self.view_transform_node.Parent.value.Name.value.split("_")[2].replace("w", "")
-      _portal_dg_id = self.view_transform_node.Parent.value.Name.value.split("_")[3].replace("dg", "")
+      _physical_nav_scale = self.dependent_nodes[0].Parent.value.Transform.value.get_scale()
 
       # remain in thumbnail mode
-      if _physical_nav_scale.x > 30.0 and (_physical_user_w_id != _portal_w_id or _physical_user_dg_id != _portal_dg_id):
+      if _physical_nav_scale.x > 30.0 and self.is_viewing_foreign_portal():
         self.make_default_viewing_setup()
       
       # deactive thumbnail mode
@@ -174,18 +190,51 @@ class UserRepresentation:
 
         self.thumbnail_mode = False
 
+  ## Checks if the physical user of this representation is in another workspace or display group than the portal.
+  # The ids are parsed from the node names only when the physical navigation node or the portal node has changed.
+  def is_viewing_foreign_portal(self):
+
+    _physical_nav_node = self.dependent_nodes[0].Parent.value
+    _portal_node = self.view_transform_node.Parent.value
+
+    if self.portal_id_parents == None or \
+       self.portal_id_parents[0] != _physical_nav_node or \
+       self.portal_id_parents[1] != _portal_node:
+
+      _physical_nav_name_parts = _physical_nav_node.Name.value.split("_")
+      _portal_name_parts = _portal_node.Name.value.split("_")
+
+      _physical_user_w_id = _physical_nav_name_parts[0].replace("w", "")
+      _physical_user_dg_id = _physical_nav_name_parts[1].replace("dg", "")
+      _portal_w_id = _portal_name_parts[2].replace("w", "")
+      _portal_dg_id = _portal_name_parts[3].replace("dg", "")
+
+      self.is_foreign_portal = _physical_user_w_id != _portal_w_id or _physical_user_dg_id != _portal_dg_id
+      self.portal_id_parents = (_physical_nav_node, _portal_node)
+
+    return self.is_foreign_portal
+
   ## Transforms the head node according to the display group offset and the tracking matrix.
   def perform_physical_user_head_transformation(self):
-    self.head.Transform.value = self.DISPLAY_GROUP.offset_to_workspace * self.USER.headtracking_reader.sf_abs_mat.value
+
+    _tracking_changed = self.transform_inputs.has_matrix_changed("tracking", self.USER.headtracking_reader.sf_abs_mat)
+    _offset_changed = self.transform_inputs.has_value_changed("offset", Utilities.get_matrix_key(self.DISPLAY_GROUP.offset_to_workspace))
+
+    if _tracking_changed or _offset_changed:
+      NetworkMeter.set_transform(self.head, self.DISPLAY_GROUP.offset_to_workspace * self.USER.headtracking_reader.sf_abs_mat.value)
 
   ## Transforms the head according to the head - portal entry relation.
   def perform_virtual_user_head_transformation(self):
 
+    _head_world_mat = self.dependent_nodes[0].WorldTransform.value
+
+    _entry_changed = self.transform_inputs.has_value_changed("entry", self.DISPLAY_GROUP.get_entry_version())
+    _head_changed = self.transform_inputs.has_value_changed("head", Utilities.get_matrix_key(_head_world_mat))
+
     # express in coordinate system of first virtual display of group
     # the remaining screens are given via their screen offset transformation
-    self.head.Transform.value = self.DISPLAY_GROUP.screen_nodes[0].Transform.value * \
-                                avango.gua.make_inverse_mat(self.DISPLAY_GROUP.entry_node.Transform.value) * \
-                                self.dependent_nodes[0].WorldTransform.value
+    if _entry_changed or _head_changed:
+      NetworkMeter.set_transform(self.head, self.DISPLAY_GROUP.get_screen_to_entry_mat() * _head_world_mat)
 
 
   ## Deactivates the evaluation of the transformation policy and assigns fixed matrices
@@ -194,6 +243,7 @@ class UserRepresentation:
 
     self.execute_transformation_policy = False
     self.head.Transform.value = avango.gua.make_trans_mat(0.0, 0.0, 1.5)
+    self.transform_inputs.invalidate()
     self.left_eye.Transform.value = avango.gua.make_identity_mat()
     self.right_eye.Transform.value = avango.gua.make_identity_mat()
 
@@ -241,6 +291,7 @@ class UserRepresentation:
     _screen = DISPLAY_INSTANCE.create_screen_node("screen_" + str(len(self.screens)))
     self.view_transform_node.Children.value.append(_screen)
     self.screens.append(_screen)
+    self.frustums.append(Frustum(self, _screen))
 
     _loader = avango.gua.nodes.TriMeshLoader()
 
@@ -264,12 +315,28 @@ class UserRepresentation:
   def add_existing_screen_node(self, SCREEN_NODE):
 
     self.screens.append(SCREEN_NODE)
+    self.frustums.append(Frustum(self, SCREEN_NODE))
+
+  ## Returns the cached Frustum instance belonging to a screen node of this UserRepresentation.
+  # @param SCREEN The screen node to retrieve the frustum for.
+  def get_frustum(self, SCREEN):
+
+    for _frustum in self.frustums:
+      if _frustum.SCREEN == SCREEN:
+        return _frustum
+
+    # screen node was not added via add_screen_node_for or add_existing_screen_node
+    _frustum = Frustum(self, SCREEN)
+    self.frustums.append(_frustum)
+    return _frustum
 
   ## Adds a scenegraph node to the list of dependent nodes.
   # @param NODE The node to be added.
   def add_dependent_node(self, NODE):
 
     self.dependent_nodes.append(NODE)
+    self.portal_id_parents = None
+    self.transform_inputs.reset()
 
 
   ## Connects a specific navigation of the display group to the user.
@@ -358,6 +425,10 @@ class User(VisibilityHandler2D):
 
     self.table_constructor(AVATAR_VISIBILITY_TABLE)
 
+    ## @var visibility_resolver
+    # VisibilityResolver instance computing the avatar group names from visibility_table.
+    self.visibility_resolver = VisibilityResolver(self.visibility_table)
+
     # flags 
     ## @var is_vip
     # Boolean indicating if this user has vip status.
@@ -449,6 +520,7 @@ class User(VisibilityHandler2D):
   def change_visiblity_table(self, VISIBILITY_TABLE):
 
     self.visibility_table = VISIBILITY_TABLE
+    self.visibility_resolver.set_visibility_table(VISIBILITY_TABLE)
 
     for _display_group in self.WORKSPACE_INSTANCE.display_groups:
       self.handle_correct_visibility_groups_for(_display_group)
@@ -523,58 +595,14 @@ class User(VisibilityHandler2D):
   # @param DISPLAY_GROUP The DisplayGroup to be handled.
   def handle_correct_visibility_groups_for(self, DISPLAY_GROUP):
 
-    # All UserRepresentation instances at DISPLAY_GROUP
-    # normally, this list should just contain one user representation
+    # normally, the user has just one user representation at DISPLAY_GROUP
     # in case of portals, however, a display group may have more than one user representation
-    _user_representations_at_display_group = []
+    for _user_repr_at_display_group in self.user_representations:
 
-    for _user_repr in self.user_representations:
-      
-      if _user_repr.DISPLAY_GROUP == DISPLAY_GROUP:
-        _user_representations_at_display_group.append(_user_repr)
-        
-    # for all found user representations in the given display group
-    for _user_repr_at_display_group in _user_representations_at_display_group:
-
-      # display group instance belonging to DISPLAY_GROUP
-      _handled_display_group_instance = _user_repr_at_display_group.DISPLAY_GROUP
-
-      _all_user_reprs_at_display_group = []
-
-      for _user_repr in ApplicationManager.all_user_representations:
-        if _user_repr.DISPLAY_GROUP == _handled_display_group_instance:
-          _all_user_reprs_at_display_group.append(_user_repr)
-
-      ## determine which group names have to be added to the user representations ##
-      _user_visible_for = []
-
-      # when video avatars are enabled, do not make josephs visible
-      if ApplicationManager.current_avatar_mode == "JOSEPH":
-        
-        # append all names of user representations which are not on same navigation
-        for _user_repr in _all_user_reprs_at_display_group:
-
-          if _user_repr.connected_navigation_id != _user_repr_at_display_group.connected_navigation_id:
-            _user_visible_for.append(_user_repr.view_transform_node.Name.value)
-
-        # check for all user representations outside the handled display group
-        for _user_repr in ApplicationManager.all_user_representations:
-          if _user_repr.DISPLAY_GROUP != _handled_display_group_instance:
-
-            # consider visibility table
-            _handled_display_group_tag = _handled_display_group_instance.visibility_tag
-            _user_repr_display_group_tag = _user_repr.DISPLAY_GROUP.visibility_tag
-            
-            try:
-              _visible = self.visibility_table[_user_repr_display_group_tag][_handled_display_group_tag]
-            except:
-              _visible = False
-            
-            if _visible:
-              if _user_repr.is_in_virtual_display():
-                _user_visible_for.append(_user_repr.view_transform_node.Parent.value.Name.value + "_" + _user_repr.head.Name.value)
-              else:
-                _user_visible_for.append(_user_repr.view_transform_node.Name.value)
+      if _user_repr_at_display_group.DISPLAY_GROUP != DISPLAY_GROUP:
+        continue
+
+      _user_visible_for = self.visibility_resolver.resolve_group_names(_user_repr_at_display_group)
 
       # apply the obtained group names to the user representation
       if len(_user_visible_for) == 0:
@@ -584,5 +612,4 @@ class User(VisibilityHandler2D):
 
       else:
 
-        for _string in _user_visible_for:
-          _user_repr_at_display_group.set_avatar_group_names(_user_visible_for)
\ No newline at end of file
+        _user_repr_at_display_group.set_avatar_group_names(_user_visible_for)
@@ -0,0 +1,265 @@
+#!/usr/bin/python
+
+## @file
+# Contains class UserPositionGrid.
+
+# import avango-guacamole libraries
+import avango
+import avango.gua
+
+# import python libraries
+import math
+
+## Spatial index over the head positions of all users in a Workspace.
+#
+# Once per frame, the users' head positions are snapshotted into a uniform grid on the
+# ground plane (XZ). Proximity queries only consider users in the grid cells around the
+# query point. As the line to ground through a user's head is vertical, the distance
+# between a point and this line equals their distance on the ground plane. Closest user queries
+# of several points, e.g. of all tools, are grouped by grid cell and search the cells around each
+# cell once, visiting only the border cells of each ring.
+class UserPositionGrid:
+
+  ## Custom constructor.
+  # @param WORKSPACE_INSTANCE The Workspace instance whose users are indexed.
+  # @param CELL_SIZE Edge length of a grid cell in meters.
+  def __init__(self, WORKSPACE_INSTANCE, CELL_SIZE = 1.0):
+
+    ## @var WORKSPACE_INSTANCE
+    # The Workspace instance whose users are indexed.
+    self.WORKSPACE_INSTANCE = WORKSPACE_INSTANCE
+
+    ## @var cell_size
+    # Edge length of a grid cell in meters.
+    self.cell_size = CELL_SIZE
+
+    ## @var valid
+    # Boolean saying if the snapshot was taken in the current frame.
+    self.valid = False
+
+    ## @var cells
+    # Dictionary mapping (column, row) cell indices to lists of (x, z, user) entries.
+    self.cells = {}
+
+    ## @var number_of_entries
+    # Number of users stored in the current snapshot.
+    self.number_of_entries = 0
+
+    ## @var tool_closest_users
+    # List of the closest active users for all tools of the workspace in the current snapshot, None if not computed yet.
+    self.tool_closest_users = None
+
+  ## Marks the snapshot as outdated. To be called once per frame.
+  def invalidate(self):
+
+    self.valid = False
+    self.tool_closest_users = None
+
+  ## Returns the grid cell indices of a position on the ground plane.
+  # @param X The x coordinate of the position.
+  # @param Z The z coordinate of the position.
+  def get_cell(self, X, Z):
+
+    return (int(math.floor(X / self.cell_size)), int(math.floor(Z / self.cell_size)))
+
+  ## Snapshots the head positions of all users if not done in the current frame.
+  def update(self):
+
+    if self.valid:
+      return
+
+    self.cells = {}
+    self.number_of_entries = 0
+
+    for _user in self.WORKSPACE_INSTANCE.users:
+
+      _pos = _user.headtracking_reader.sf_abs_vec.value
+      _cell = self.get_cell(_pos.x, _pos.z)
+
+      if _cell in self.cells:
+        self.cells[_cell].append( (_pos.x, _pos.z, _user) )
+      else:
+        self.cells[_cell] = [ (_pos.x, _pos.z, _user) ]
+
+      self.number_of_entries += 1
+
+    self.valid = True
+
+  ## Computes a list of users whose line to ground is closer than DISTANCE to a point.
+  # The users are returned in the order of their ids.
+  # @param POINT The point to compute the proximity to.
+  # @param DISTANCE The tolerance distance to be applied.
+  def get_users_in_range(self, POINT, DISTANCE):
+
+    self.update()
+
+    _x = POINT.x
+    _z = POINT.z
+    _squared_distance = DISTANCE * DISTANCE
+
+    _min_cell = self.get_cell(_x - DISTANCE, _z - DISTANCE)
+    _max_cell = self.get_cell(_x + DISTANCE, _z + DISTANCE)
+
+    _users_in_range = []
+
+    for _column in range(_min_cell[0], _max_cell[0] + 1):
+      for _row in range(_min_cell[1], _max_cell[1] + 1):
+
+        for _entry in self.cells.get( (_column, _row), [] ):
+
+          if (_entry[0] - _x) ** 2 + (_entry[1] - _z) ** 2 < _squared_distance:
+            _users_in_range.append(_entry[2])
+
+    _users_in_range.sort(key = lambda _user: _user.id)
+    return _users_in_range
+
+  ## Returns the grid cell indices on the border of a square ring of cells around a center cell.
+  # @param CENTER The (column, row) indices of the center cell.
+  # @param RING The Chebyshev distance of the ring cells to the center cell in cells.
+  def get_ring_cells(self, CENTER, RING):
+
+    if RING == 0:
+      return [CENTER]
+
+    _min_column = CENTER[0] - RING
+    _max_column = CENTER[0] + RING
+    _min_row = CENTER[1] - RING
+    _max_row = CENTER[1] + RING
+
+    _cells = []
+
+    for _column in range(_min_column, _max_column + 1):
+      _cells.append( (_column, _min_row) )
+      _cells.append( (_column, _max_row) )
+
+    for _row in range(_min_row + 1, _max_row):
+      _cells.append( (_min_column, _row) )
+      _cells.append( (_max_column, _row) )
+
+    return _cells
+
+  ## Returns the entries of the active users which may be closest to a point in a grid cell.
+  # The rings of cells around the cell are searched until the first active user is found at ring R. A point in the cell is
+  # at most (R + 1) * sqrt(2) cells away from this user, so the rings up to that distance plus one ring hold all candidates.
+  # Once a ring's border has more cells than the snapshot, the occupied cells are scanned instead.
+  # @param CELL The (column, row) indices of the cell.
+  # @param MAX_DISTANCE Users farther away than this distance from all points of the cell are not returned.
+  def get_candidates(self, CELL, MAX_DISTANCE):
+
+    _candidates = []
+    _last_ring = None
+    _visited_entries = 0
+    _ring = 0
+
+    # search the borders of the rings while they have less cells than the snapshot
+    while _visited_entries < self.number_of_entries and 8 * _ring <= len(self.cells):
+
+      # users outside of this ring are at least (_ring - 1) cells away
+      if (_ring - 1) * self.cell_size > MAX_DISTANCE or (_last_ring != None and _ring > _last_ring):
+        return _candidates
+
+      for _cell in self.get_ring_cells(CELL, _ring):
+
+        for _entry in self.cells.get(_cell, []):
+
+          _visited_entries += 1
+
+          if _entry[2].is_active:
+            _candidates.append(_entry)
+
+      if _last_ring == None and len(_candidates) > 0:
+        _last_ring = int(math.ceil((_ring + 1) * math.sqrt(2.0))) + 1
+
+      _ring += 1
+
+    if _visited_entries == self.number_of_entries:
+      return _candidates
+
+    # sparse snapshot: scan the occupied cells outside of the searched rings
+    _outer_cells = []
+
+    for _cell, _entries in self.cells.items():
+
+      _cell_ring = max(abs(_cell[0] - CELL[0]), abs(_cell[1] - CELL[1]))
+
+      if _cell_ring >= _ring and (_cell_ring - 1) * self.cell_size <= MAX_DISTANCE:
+        _outer_cells.append( (_cell_ring, _entries) )
+
+    _outer_cells.sort(key = lambda _outer_cell: _outer_cell[0])
+
+    for _cell_ring, _entries in _outer_cells:
+
+      if _last_ring != None and _cell_ring > _last_ring:
+        break
+
+      for _entry in _entries:
+
+        if _entry[2].is_active:
+          _candidates.append(_entry)
+
+      if _last_ring == None and len(_candidates) > 0:
+        _last_ring = int(math.ceil((_cell_ring + 1) * math.sqrt(2.0))) + 1
+
+    return _candidates
+
+  ## Returns the active user whose line to ground is closest to a point, None if there is none.
+  # On equal distances, the user with the lower id is preferred.
+  # @param POINT The point to compute the proximity to.
+  # @param MAX_DISTANCE Users farther away than this distance are not considered.
+  def get_closest_user(self, POINT, MAX_DISTANCE = 1000.0):
+
+    return self.get_closest_users([POINT], MAX_DISTANCE)[0]
+
+  ## Returns the closest active users for a list of points in one pass over the current snapshot.
+  # The points are grouped by grid cell and the candidate users are searched once per cell.
+  # On equal distances, the user with the lower id is preferred.
+  # @param POINTS List of points to compute the proximities to.
+  # @param MAX_DISTANCE Users farther away than this distance are not considered.
+  def get_closest_users(self, POINTS, MAX_DISTANCE = 1000.0):
+
+    self.update()
+
+    _closest_users = [None for _point in POINTS]
+    _points_by_cell = {}
+
+    for _index, _point in enumerate(POINTS):
+
+      _cell = self.get_cell(_point.x, _point.z)
+
+      if _cell in _points_by_cell:
+        _points_by_cell[_cell].append(_index)
+      else:
+        _points_by_cell[_cell] = [_index]
+
+    for _cell, _indices in _points_by_cell.items():
+
+      _candidates = self.get_candidates(_cell, MAX_DISTANCE)
+
+      for _index in _indices:
+
+        _x = POINTS[_index].x
+        _z = POINTS[_index].z
+        _closest_key = (MAX_DISTANCE * MAX_DISTANCE, -1)
+
+        for _entry in _candidates:
+
+          _key = ( (_entry[0] - _x) ** 2 + (_entry[1] - _z) ** 2, _entry[2].id )
+
+          if _key < _closest_key:
+            _closest_key = _key
+            _closest_users[_index] = _entry[2]
+
+    return _closest_users
+
+  ## Returns the closest active user to a tool of the workspace.
+  # The assignments of all tools are computed together on the first request in a frame.
+  # @param TOOL_INSTANCE The Tool instance to retrieve the closest user for.
+  def get_closest_user_to_tool(self, TOOL_INSTANCE):
+
+    self.update()
+
+    if self.tool_closest_users == None:
+      _tool_positions = [_tool.tracking_reader.sf_abs_vec.value for _tool in self.WORKSPACE_INSTANCE.tools]
+      self.tool_closest_users = self.get_closest_users(_tool_positions)
+
+    return self.tool_closest_users[TOOL_INSTANCE.id]
@@ -72,6 +72,78 @@ def get_yaw(MATRIX):
   except:
     return 0
 
+## Returns the normalized rotation of the upper 3x3 part of a matrix as quaternion elements (x, y, z, w).
+# Only reads single matrix elements and does not create any quaternion or vector objects.
+# @param MATRIX The matrix to extract the rotation from.
+def get_rotation_quat_elements(MATRIX):
+
+  _m00 = MATRIX.get_element(0, 0)
+  _m01 = MATRIX.get_element(0, 1)
+  _m02 = MATRIX.get_element(0, 2)
+  _m10 = MATRIX.get_element(1, 0)
+  _m11 = MATRIX.get_element(1, 1)
+  _m12 = MATRIX.get_element(1, 2)
+  _m20 = MATRIX.get_element(2, 0)
+  _m21 = MATRIX.get_element(2, 1)
+  _m22 = MATRIX.get_element(2, 2)
+
+  _trace = _m00 + _m11 + _m22
+
+  # choose the numerically most stable case
+  if _trace > 0.0:
+    _s = math.sqrt(_trace + 1.0) * 2.0
+    _qw = 0.25 * _s
+    _qx = (_m21 - _m12) / _s
+    _qy = (_m02 - _m20) / _s
+    _qz = (_m10 - _m01) / _s
+  elif _m00 > _m11 and _m00 > _m22:
+    _s = math.sqrt(max(1.0 + _m00 - _m11 - _m22, 1e-12)) * 2.0
+    _qw = (_m21 - _m12) / _s
+    _qx = 0.25 * _s
+    _qy = (_m01 + _m10) / _s
+    _qz = (_m02 + _m20) / _s
+  elif _m11 > _m22:
+    _s = math.sqrt(max(1.0 + _m11 - _m00 - _m22, 1e-12)) * 2.0
+    _qw = (_m02 - _m20) / _s
+    _qx = (_m01 + _m10) / _s
+    _qy = 0.25 * _s
+    _qz = (_m12 + _m21) / _s
+  else:
+    _s = math.sqrt(max(1.0 + _m22 - _m00 - _m11, 1e-12)) * 2.0
+    _qw = (_m10 - _m01) / _s
+    _qx = (_m02 + _m20) / _s
+    _qy = (_m12 + _m21) / _s
+    _qz = 0.25 * _s
+
+  _length = math.sqrt(_qx * _qx + _qy * _qy + _qz * _qz + _qw * _qw)
+
+  if _length == 0.0:
+    return 0.0, 0.0, 0.0, 1.0
+
+  return _qx / _length, _qy / _length, _qz / _length, _qw / _length
+
+## Extracts the yaw (head) rotation in radians from the elements of a rotation quaternion, in the same way as get_euler_angles.
+# @param QX The x element of the quaternion.
+# @param QY The y element of the quaternion.
+# @param QZ The z element of the quaternion.
+# @param QW The w element of the quaternion.
+def get_yaw_from_quat_elements(QX, QY, QZ, QW):
+
+  _unit = QX * QX + QY * QY + QZ * QZ + QW * QW
+  _test = (QX * QY) + (QZ * QW)
+
+  if _test > (0.49999 * _unit): # singularity at north pole
+    _yaw = 2.0 * math.atan2(QX, QW)
+  elif _test < (-0.49999 * _unit): # singularity at south pole
+    _yaw = -2.0 * math.atan2(QX, QW)
+  else:
+    _yaw = math.atan2(2.0 * QY * QW - 2.0 * QX * QZ, 1.0 - 2.0 * QY * QY - 2.0 * QZ * QZ)
+
+  if _yaw < 0.0:
+    _yaw += 2.0 * math.pi
+
+  return _yaw
+
 
 ## Returns the rotation matrix of the rotation between two input vectors.
 # @param VEC1 First vector.
@@ -127,70 +199,30 @@ def compute_point_plane_distance(N, D, POINT):
   return N.x * POINT.x + N.y * POINT.y + N.z * POINT.z + D
 
 
+## Returns a hashable tuple describing the affine part of a matrix. Used to cheaply detect matrix changes.
+# @param MATRIX The matrix to create the key for.
+def get_matrix_key(MATRIX):
+
+  _origin = MATRIX * avango.gua.Vec3(0.0, 0.0, 0.0)
+  _x_axis = MATRIX * avango.gua.Vec3(1.0, 0.0, 0.0)
+  _y_axis = MATRIX * avango.gua.Vec3(0.0, 1.0, 0.0)
+  _z_axis = MATRIX * avango.gua.Vec3(0.0, 0.0, 1.0)
+
+  return (_origin.x, _origin.y, _origin.z
+        , _x_axis.x, _x_axis.y, _x_axis.z
+        , _y_axis.x, _y_axis.y, _y_axis.z
+        , _z_axis.x, _z_axis.y, _z_axis.z)
+
+
 ## Checks if a point is inside the viewing frustum of a user.
+# The frustum is cached in the UserRepresentation and only rebuilt when the head or screen transformation changes.
+# Meant for single tests, per-frame callers update the frustums once and use Frustum.points_inside_frustums.
 # @param POINT The point to be checked.
 # @param USER_REPRESENTATION The UserRepresentation instance to which SCREEN is belonging to.
 # @param SCREEN The screen to create the viewing frustum for. 
 def is_inside_frustum(POINT, USER_REPRESENTATION, SCREEN):
 
-  _user_head_world_pos = USER_REPRESENTATION.head.WorldTransform.value.get_translate()
-  _screen_world_mat = SCREEN.WorldTransform.value
-
-  # if user representation is in virtual display, start intersecting from the virtual display plane
-  if USER_REPRESENTATION.is_in_virtual_display():
-    _head_in_screen_pos = avango.gua.make_inverse_mat(_screen_world_mat) * _user_head_world_pos
-    _near_clip = abs(_head_in_screen_pos.z)
-  else:
-    _near_clip = SceneManager.current_near_clip
-
-  _far_clip = SceneManager.current_far_clip
-
-
-  # head space (but with nav orientation)
-  _head_mat = SCREEN.WorldTransform.value
-  _head_mat.set_translate(_user_head_world_pos)
-      
-  _point = avango.gua.make_inverse_mat(_head_mat) * POINT # point in head space
-  _depth = abs(_point.z)
-  if (_depth < _near_clip) or (_depth > _far_clip): # point in front of near plane or behind far plane --> outside frustum
-    return False
-
-      
-  # compute screen corner points
-  _screen_width = SCREEN.Width.value
-  _screen_height = SCREEN.Height.value
-  
-  _tl_world_pos = _screen_world_mat * avango.gua.Vec3(-_screen_width * 0.5, _screen_height * 0.5, 0.0)
-  _tr_world_pos = _screen_world_mat * avango.gua.Vec3(_screen_width * 0.5, _screen_height * 0.5, 0.0)
-  _bl_world_pos = _screen_world_mat * avango.gua.Vec3(-_screen_width * 0.5, -_screen_height * 0.5, 0.0)
-  _br_world_pos = _screen_world_mat * avango.gua.Vec3(_screen_width * 0.5, -_screen_height * 0.5, 0.0)
-
-  _tl_world_pos = avango.gua.Vec3(_tl_world_pos.x, _tl_world_pos.y, _tl_world_pos.z)
-  _tr_world_pos = avango.gua.Vec3(_tr_world_pos.x, _tr_world_pos.y, _tr_world_pos.z)    
-  _bl_world_pos = avango.gua.Vec3(_bl_world_pos.x, _bl_world_pos.y, _bl_world_pos.z)
-  _br_world_pos = avango.gua.Vec3(_br_world_pos.x, _br_world_pos.y, _br_world_pos.z)
-  
-  ## compute lateral planes ##
-  _left_plane = compute_plane(_bl_world_pos, _tl_world_pos, _user_head_world_pos)
-  _distance = compute_point_plane_distance(_left_plane[0], _left_plane[1], POINT)
-  if _distance < 0.0: # point in front of left plane --> outside frustum
-    return False
-
-  _right_plane = compute_plane(_tr_world_pos, _br_world_pos, _user_head_world_pos)
-  _distance = compute_point_plane_distance(_right_plane[0], _right_plane[1], POINT)
-  if _distance < 0.0: # point in front of right plane --> outside frustum
-    return False
-
-  _top_plane = compute_plane(_tl_world_pos, _tr_world_pos, _user_head_world_pos)
-  _distance = compute_point_plane_distance(_top_plane[0], _top_plane[1], POINT)
-  if _distance < 0.0: # point in front of top plane --> outside frustum
-    return False
-
-  _bottom_plane = compute_plane(_br_world_pos, _bl_world_pos, _user_head_world_pos)
-  _distance = compute_point_plane_distance(_bottom_plane[0], _bottom_plane[1], POINT)
-  if _distance < 0.0: # point in front of bottom plane plane --> outside frustum
-    return False
-
-  return True    
-    
+  _frustum = USER_REPRESENTATION.get_frustum(SCREEN)
+  _frustum.update()
 
+  return _frustum.contains(POINT)
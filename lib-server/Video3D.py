@@ -10,6 +10,7 @@ import avango.gua
 # import framework libraries
 from ConsoleIO import *
 from VisibilityHandler import *
+from NetworkMeter import NetworkMeter
 from scene_config import scenegraphs
 
 ## Geometric representation of a Video3D object in a Navigation.
@@ -65,8 +66,9 @@ class Video3DRepresentation:
   ## Callback: evaluated every frame
   def frame_callback(self):
 
-    self.video_node.Transform.value = self.NAVIGATION_INSTANCE.sf_nav_mat.value * \
-                                      self.VIDEO_3D_INSTANCE.offset
+    NetworkMeter.set_transform(self.video_node
+                             , self.NAVIGATION_INSTANCE.sf_nav_mat.value * \
+                               self.VIDEO_3D_INSTANCE.offset)
 
 
 ###############################################################################################
@@ -0,0 +1,132 @@
+#!/usr/bin/python
+
+## @file
+# Contains class VisibilityResolver.
+
+# import framework libraries
+from ApplicationManager import *
+
+## Resolves the avatar GroupNames of UserRepresentations from a visibility table.
+#
+# The visibility table is flattened into a (display group tag, display group tag, avatar mode)
+# lookup. All UserRepresentations are indexed by display group, and the group names contributed
+# by other display groups are cached per (display group, avatar mode). A navigation switch
+# therefore only recomputes the names depending on the navigations at the affected display group.
+class VisibilityResolver:
+
+  ## @var indexed_representations
+  # Copy of ApplicationManager.all_user_representations the index was built from.
+  indexed_representations = []
+
+  ## @var representations_by_display_group
+  # Dictionary mapping DisplayGroup instances to the lists of UserRepresentations at them.
+  representations_by_display_group = {}
+
+  ## @var index_version
+  # Number increased whenever the index was rebuilt. Used to invalidate derived caches.
+  index_version = 0
+
+  ## Custom constructor.
+  # @param VISIBILITY_TABLE A matrix containing visibility rules according to the DisplayGroups' visibility tags.
+  def __init__(self, VISIBILITY_TABLE):
+
+    ## @var tag_visibility
+    # Dictionary mapping (own tag, observing tag, avatar mode) keys to visibility booleans.
+    self.tag_visibility = {}
+
+    ## @var external_group_names
+    # Dictionary mapping (DisplayGroup, avatar mode) keys to the group names contributed by all other display groups.
+    self.external_group_names = {}
+
+    ## @var external_group_names_version
+    # Index version external_group_names were computed for.
+    self.external_group_names_version = -1
+
+    self.set_visibility_table(VISIBILITY_TABLE)
+
+  ## Flattens a visibility table and invalidates all cached group names.
+  # @param VISIBILITY_TABLE A matrix containing visibility rules according to the DisplayGroups' visibility tags.
+  def set_visibility_table(self, VISIBILITY_TABLE):
+
+    self.tag_visibility = {}
+
+    for _own_tag, _row in VISIBILITY_TABLE.items():
+      for _observing_tag, _visible in _row.items():
+
+        # when video avatars are enabled, do not make josephs visible
+        self.tag_visibility[(_own_tag, _observing_tag, "JOSEPH")] = _visible
+        self.tag_visibility[(_own_tag, _observing_tag, "VIDEO")] = False
+
+    self.external_group_names = {}
+
+  ## Returns if representations at display groups with OWN_TAG are visible at display groups with OBSERVING_TAG.
+  # @param OWN_TAG Visibility tag of the display group the representation is located at.
+  # @param OBSERVING_TAG Visibility tag of the observing display group.
+  # @param AVATAR_MODE The avatar mode, "JOSEPH" or "VIDEO".
+  def is_visible(self, OWN_TAG, OBSERVING_TAG, AVATAR_MODE):
+
+    return self.tag_visibility.get((OWN_TAG, OBSERVING_TAG, AVATAR_MODE), False)
+
+  ## Returns the list of UserRepresentations at a display group.
+  # The index is rebuilt when representations were added or removed.
+  # @param DISPLAY_GROUP The DisplayGroup to retrieve the UserRepresentations for.
+  @staticmethod
+  def get_user_representations_at(DISPLAY_GROUP):
+
+    if VisibilityResolver.indexed_representations != ApplicationManager.all_user_representations:
+
+      VisibilityResolver.indexed_representations = list(ApplicationManager.all_user_representations)
+      VisibilityResolver.representations_by_display_group = {}
+
+      for _user_repr in VisibilityResolver.indexed_representations:
+        VisibilityResolver.representations_by_display_group.setdefault(_user_repr.DISPLAY_GROUP, []).append(_user_repr)
+
+      VisibilityResolver.index_version += 1
+
+    return VisibilityResolver.representations_by_display_group.get(DISPLAY_GROUP, [])
+
+  ## Returns the group names all UserRepresentations outside a display group contribute if visible from it.
+  # @param DISPLAY_GROUP The observing DisplayGroup.
+  # @param AVATAR_MODE The avatar mode, "JOSEPH" or "VIDEO".
+  def get_external_group_names(self, DISPLAY_GROUP, AVATAR_MODE):
+
+    VisibilityResolver.get_user_representations_at(DISPLAY_GROUP)
+
+    if self.external_group_names_version != VisibilityResolver.index_version:
+      self.external_group_names = {}
+      self.external_group_names_version = VisibilityResolver.index_version
+
+    _key = (DISPLAY_GROUP, AVATAR_MODE)
+
+    if _key not in self.external_group_names:
+
+      _group_names = []
+
+      for _user_repr in VisibilityResolver.indexed_representations:
+
+        if _user_repr.DISPLAY_GROUP != DISPLAY_GROUP and self.is_visible(_user_repr.DISPLAY_GROUP.visibility_tag, DISPLAY_GROUP.visibility_tag, AVATAR_MODE):
+          _group_names.append(_user_repr.get_visibility_group_name())
+
+      self.external_group_names[_key] = _group_names
+
+    return self.external_group_names[_key]
+
+  ## Computes the avatar group names of a UserRepresentation.
+  # @param USER_REPRESENTATION The UserRepresentation to compute the group names for.
+  def resolve_group_names(self, USER_REPRESENTATION):
+
+    _avatar_mode = ApplicationManager.current_avatar_mode
+
+    if _avatar_mode != "JOSEPH":
+      return []
+
+    _display_group = USER_REPRESENTATION.DISPLAY_GROUP
+
+    # names of user representations at the same display group which are not on same navigation
+    _group_names = [_user_repr.view_transform_node.Name.value
+                    for _user_repr in VisibilityResolver.get_user_representations_at(_display_group)
+                    if _user_repr.connected_navigation_id != USER_REPRESENTATION.connected_navigation_id]
+
+    _group_names.extend(self.get_external_group_names(_display_group, _avatar_mode))
+
+    return _group_names
@@ -6,6 +6,7 @@
 # import avango-guacamole libraries
 import avango
 import avango.gua
+import avango.script
 
 # import framework libraries
 from ConsoleIO import *
@@ -13,6 +14,7 @@ from DisplayGroup import *
 from PortalCamera import *
 from RayPointer import *
 from User import *
+from UserPositionGrid import *
 from Video3D import *
 import Utilities
 
@@ -61,6 +63,19 @@ class Workspace:
     # Instance of Video3D capturing this workspace if it was associated.
     self.video_3D = None
 
+    ## @var user_position_grid
+    # Spatial index over the users' head positions to answer proximity queries.
+    self.user_position_grid = UserPositionGrid(self)
+
+    ## @var frame_trigger
+    # Triggers framewise evaluation of frame_callback method.
+    self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+  ## Evaluated every frame.
+  def frame_callback(self):
+
+    # head positions are snapshotted again on the next proximity query
+    self.user_position_grid.invalidate()
 
 
   ## Computes a list of users whose tracking targets are not farer away than DISTANCE from a user, taking the line to ground.
@@ -68,19 +83,7 @@ class Workspace:
   # @param DISTANCE The tolerance distance to be applied.
   def get_all_users_in_range(self, POINT, DISTANCE):
 
-    _users_in_range = []
-
-    for _user in self.users:
-
-      if Utilities.compute_point_to_line_distance(POINT, _user.headtracking_reader.sf_abs_vec.value, avango.gua.Vec3(0, -1, 0)) < DISTANCE:
-        _users_in_range.append(_user)
-        #print "In range", _user.id, Utilities.compute_point_to_line_distance(POINT, _user.headtracking_reader.sf_abs_vec.value, avango.gua.Vec3(0, -1, 0))
-
-      else:
-        pass
-        #print "not in range", _user.id, Utilities.compute_point_to_line_distance(POINT, _user.headtracking_reader.sf_abs_vec.value, avango.gua.Vec3(0, -1, 0))
-
-    return _users_in_range
+    return self.user_position_grid.get_users_in_range(POINT, DISTANCE)
 
 
   ## Creates a DisplayGroup instance and adds it to this workspace.
@@ -10,8 +10,20 @@ import avango.gua
 # import framework libraries
 from SceneManager import *
 from ApplicationManager import *
+from NodeDistributor import NodeDistributor
+from FrameProfiler import FrameProfiler
+from NetworkMeter import NetworkMeter
+from TrackingRecorder import DeviceSensorFactory
+from TrackingRecorder import TrackingRecorder
+from TrackingRecorder import TrackingReplay
 
 from scene_config import scenegraphs
+from scene_config import enable_frame_profiler
+from scene_config import enable_network_meter
+from scene_config import coalesce_distributed_writes
+from scene_config import tracking_record_file
+from scene_config import tracking_replay_file
+from scene_config import tracking_replay_speed
 
 # import python libraries
 import sys
@@ -38,6 +50,26 @@ def start():
   avango.gua.load_shading_models_from("data/materials")
   avango.gua.load_materials_from("data/materials")
 
+  # instrument the framework classes before any instances are created
+  if enable_frame_profiler:
+    frame_profiler = FrameProfiler()
+    frame_profiler.install()
+    ApplicationManager.frame_profiler = frame_profiler
+
+  # watch the distributed field updates
+  NetworkMeter.coalesce_writes = coalesce_distributed_writes
+
+  if enable_network_meter:
+    network_meter = NetworkMeter()
+    network_meter.install()
+    ApplicationManager.network_meter = network_meter
+
+  # record or replay the device stations read by the devices and tracking readers
+  if tracking_replay_file != None:
+    DeviceSensorFactory.replay = TrackingReplay(tracking_replay_file, SPEED = tracking_replay_speed)
+  elif tracking_record_file != None:
+    DeviceSensorFactory.recorder = TrackingRecorder(tracking_record_file)
+
   # initialize application manager
   application_manager = ApplicationManager()
   application_manager.my_constructor(WORKSPACE_CONFIG = workspace_config, START_CLIENTS = start_clients)
@@ -51,25 +83,12 @@ def start():
   #                               , [ application_manager.navigation_list[0]])
 
   ## distribute all nodes in the scenegraph
-  distribute_all_nodes(scenegraphs[0]["/net"], scenegraphs[0]["/net"])
+  node_distributor = NodeDistributor(scenegraphs[0]["/net"])
+  node_distributor.distribute_subtree(scenegraphs[0]["/net"], VERBOSE = True)
 
   # run application loop
   application_manager.run(locals(), globals())
 
-## Registers a scenegraph node and all of its children at a NetMatrixTransform node for distribution.
-# @param NET_TRANS_NODE The NetMatrixTransform node on which all nodes should be marked distributable.
-# @param PARENT_NODE The node that should be registered distributable with all of its children.
-def distribute_all_nodes(NET_TRANS_NODE, NODE):
-
-  # do not distribute the nettrans node itself
-  if NODE != NET_TRANS_NODE:
-    NET_TRANS_NODE.distribute_object(NODE)
-    #print "distribute", NODE, NODE.Name.value, NODE.Path.value
-
-  # iterate over children and make them distributable
-  for _child in NODE.Children.value:
-    distribute_all_nodes(NET_TRANS_NODE, _child)
-
 
 if __name__ == '__main__':
   start()